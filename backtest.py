@@ -1,16 +1,26 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
+import os
 import warnings
-from scrapeCNNData import fetch_fear_greed_data
-warnings.filterwarnings('ignore')
+from collections import OrderedDict
+from dataCache import load_fear_greed_data
+from dataFetch import fetch_concurrently
+from scrapeCNNData import FEAR_GREED_URL
+from priceStore import PriceStore
+from timeline import CATEGORIES, FEAR_GREED_THRESHOLDS, MarketTimeline, categorize
+from schedules import Schedule, purchase_periods, schedule_dates, weekly_dates
+from simulation import simulate_batch, simulate_summary
+from strategies import ConsistentDCA, FearGreedCashBuffer, run_strategies
+from results import BacktestResult
+from instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from metrics import compute_metrics
+from reports import amounts_by_date, draw_report
 
 class FearGreedBacktester:
     def __init__(self):
         # Configuration variables - modify these as needed
-        self.WEEKLY_BUDGET = 500  # Total weekly investment budget for both strategies
+        self.WEEKLY_BUDGET = 500  # Total weekly investment budget for both strategies (prorated for other schedules)
         
         # Fear/Greed investment multipliers (percentage of weekly budget)
         self.INVESTMENT_MULTIPLIERS = {
@@ -20,9 +30,13 @@ class FearGreedBacktester:
             'Greed': 0.5,            # Invest 50% of weekly budget (save cash)
             'Extreme Greed': 0.2     # Invest 20% of weekly budget (save most cash)
         }
+
+        # Fear/greed category upper bounds (inclusive), e.g. values <= 24 are Extreme Fear
+        self.FEAR_GREED_THRESHOLDS = FEAR_GREED_THRESHOLDS
         
         # Trading configuration
         self.PURCHASE_DAY = 1  # 0=Monday, 1=Tuesday, 2=Wednesday, 3=Thursday, 4=Friday, 5=Saturday, 6=Sunday
+        self.PURCHASE_SCHEDULE = None  # None for weekly on PURCHASE_DAY, or a Schedule / 'monthly:15', 'daily', 'month_end', ...
         self.START_DATE = '2020-01-01'  # Backtest start date
         self.END_DATE = 'present'       # Backtest end date ('present' for current date or specific date like '2024-12-31')
         self.INITIAL_CASH = 0       # Starting cash balance for both strategies
@@ -31,119 +45,268 @@ class FearGreedBacktester:
         self.TRANSACTION_FEE = 0  # Fee per transaction (e.g., $0.50)
         self.EXPENSE_RATIO = 0.0003  # Annual expense ratio (0.03% for SPY)
 
+        # Data cache configuration
+        self.CACHE_DIR = '.cache'     # Directory for the local fear/greed data cache
+        self.CACHE_TTL = 24 * 3600    # Seconds before cached fear/greed data is refreshed
+        self.OFFLINE = False          # Only use cached data, never hit the network
+        self.FEAR_GREED_URL = FEAR_GREED_URL  # Fear/greed data endpoint
+        self.USE_PRICE_STORE = True   # Keep downloaded prices in a memory-mapped store under CACHE_DIR
+        self.TIMELINE_CACHE_SIZE = 8  # Number of prepared market timelines kept in memory
+        self.INSTRUMENT = False       # Record per-phase timings and cache hit/miss counters
+
         self._fear_greed_df = None
         self._sp500_df = None
-        
+        self._sp500_range = None
+        self._price_store = None
+        self._timeline_cache = OrderedDict()
+        self._instrumentation = Instrumentation()
+
+    @property
+    def instrumentation(self):
+        """Per-phase timings and cache counters (a no-op recorder unless INSTRUMENT is True)"""
+        return self._instrumentation if self.INSTRUMENT else NULL_INSTRUMENTATION
+
+    def set_data(self, fear_greed_df, sp500_df):
+        """Use the given fear/greed and price DataFrames instead of fetching them"""
+        self._fear_greed_df = fear_greed_df
+        self._sp500_df = sp500_df
+        self._sp500_range = None  # Covers any date range
+        self._timeline_cache.clear()
+
+    def _resolve_end_date(self, end_date):
+        """Turn 'present' into today's date"""
+        if end_date == 'present':
+            return datetime.now().strftime('%Y-%m-%d')
+        return end_date
+
     def get_fear_greed_data(self):
         if self._fear_greed_df is not None:
+            self.instrumentation.count('fear_greed_memory_hit')
             return self._fear_greed_df
-        data = fetch_fear_greed_data()
+        self.instrumentation.count('fear_greed_memory_miss')
+        with self.instrumentation.phase('fetch_fear_greed'):
+            data = load_fear_greed_data(self.CACHE_DIR, ttl=self.CACHE_TTL, offline=self.OFFLINE,
+                                        instrumentation=self.instrumentation, url=self.FEAR_GREED_URL)
+        if data is None:
+            return None
+        dates, values = data
         # Convert to DataFrame
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['date'])
-        df['value'] = pd.to_numeric(df['value'])
+        df = pd.DataFrame({'date': pd.to_datetime(dates), 'value': values})
         df = df.sort_values('date').reset_index(drop=True)
+        self._fear_greed_df = df
         return df
 
     def get_sp500_data(self, start_date, end_date):
-        if self._sp500_df is not None:
-            return self._sp500_df
-
         """Fetch S&P 500 data using yfinance with fallback options"""
         # Handle 'present' end date
-        if end_date == 'present':
-            end_date = datetime.now().strftime('%Y-%m-%d')
-        
+        end_date = self._resolve_end_date(end_date)
+
+        # Only reuse the cached prices if they were fetched for this date range
+        if self._sp500_df is not None and self._sp500_range in (None, (start_date, end_date)):
+            self.instrumentation.count('sp500_memory_hit')
+            return self._sp500_df
+        self.instrumentation.count('sp500_memory_miss')
+        with self.instrumentation.phase('fetch_sp500'):
+            return self._download_sp500_data(start_date, end_date)
+
+    def _download_sp500_data(self, start_date, end_date):
+        """Load S&P 500 prices, trying each fallback ticker in turn"""
         # Try multiple tickers as fallbacks
         tickers_to_try = ['SPY', 'VOO']
         
         for ticker in tickers_to_try:
-            try:
-                # Add retry logic and different parameters
+            result_df = self.get_ticker_prices(ticker, start_date, end_date)
+            if result_df is not None:
+                self._sp500_df = result_df
+                self._sp500_range = (start_date, end_date)
+                return result_df
+        
+        print("All ticker downloads failed. You may need to:")
+        print("1. Check your internet connection")
+        print("2. Try again later (yfinance sometimes has temporary issues)")
+        print("3. Install/update yfinance: pip install --upgrade yfinance")
+        return None
+
+    @property
+    def price_store(self):
+        """Memory-mapped price store under CACHE_DIR (None if USE_PRICE_STORE is off)"""
+        if not self.USE_PRICE_STORE:
+            return None
+        root = os.path.join(self.CACHE_DIR, 'prices')
+        if self._price_store is None or self._price_store.root != root:
+            self._price_store = PriceStore(root)
+        return self._price_store
+
+    def get_ticker_prices(self, ticker, start_date, end_date):
+        """
+        Daily prices for one ticker between start_date and end_date
+
+        Served from the local price store when it already covers the range.
+        Otherwise only the dates from the last stored day on are downloaded and
+        appended (or the whole range if it starts earlier). The last stored day
+        is downloaded again: if its adjusted close changed, a dividend or split
+        was adjusted for since the last refresh, and the whole history is
+        downloaded again and replaces the stored one. A requested range counts
+        as covered even when it has no rows (e.g. only holidays).
+
+        Returns:
+            DataFrame: 'date' and 'price' columns, or None
+        """
+        store = self.price_store
+        if store is None:
+            downloaded = self.download_ticker_prices(ticker, start_date, end_date)
+            return downloaded if downloaded is not None and len(downloaded) > 0 else None
+
+        start_date = pd.Timestamp(start_date).strftime('%Y-%m-%d')
+        end_date = pd.Timestamp(end_date).strftime('%Y-%m-%d')
+        covered = store.covered_range(ticker)
+
+        if covered is not None and covered[0] <= start_date and end_date <= covered[1]:
+            self.instrumentation.count('price_store_hit')
+        elif self.OFFLINE:
+            if covered is None:
+                print(f"Offline mode: no stored prices for {ticker}")
+                return None
+            self.instrumentation.count('price_store_hit')
+        else:
+            self.instrumentation.count('price_store_miss')
+            append = covered is not None and covered[0] <= start_date
+            fetch_start = start_date
+            last_date = last_price = None
+            if append:
+                stored_dates, stored_prices = store.load(ticker)
+                fetch_start = covered[1]
+                if len(stored_dates) > 0:
+                    last_date, last_price = stored_dates[-1], float(stored_prices[-1])
+                    fetch_start = str(last_date)[:10]  # One row of overlap
+            fetch_end = max(end_date, covered[1]) if covered is not None else end_date
+            downloaded = self.download_ticker_prices(ticker, fetch_start, fetch_end)
+            if downloaded is None:
+                if not append:
+                    return None
+            else:
+                dates = self._column_values(downloaded, 'date', dtype='datetime64[ns]')
+                prices = self._column_values(downloaded, 'price')
+                if last_date is not None:
+                    overlap = prices[dates == last_date]
+                    if len(overlap) == 0 or not np.isclose(overlap[0], last_price, rtol=1e-6, atol=0):
+                        # Adjusted closes were restated, the stored history no longer matches
+                        self.instrumentation.count('price_store_restated')
+                        fetch_start = covered[0]
+                        downloaded = self.download_ticker_prices(ticker, fetch_start, fetch_end)
+                        if downloaded is None:
+                            return None
+                        dates = self._column_values(downloaded, 'date', dtype='datetime64[ns]')
+                        prices = self._column_values(downloaded, 'price')
+                        append = False
+                store.write(ticker, dates, prices, fetch_start, fetch_end, replace=not append)
+
+        dates, prices = store.load(ticker, start_date, end_date)
+        if len(dates) == 0:
+            print(f"{ticker} has no stored prices between {start_date} and {end_date}")
+            return None
+        return pd.DataFrame({'date': dates, 'price': prices})
+
+    def download_ticker_prices(self, ticker, start_date, end_date):
+        """
+        Download daily adjusted closes for one ticker with yfinance
+
+        Returns:
+            DataFrame: 'date' and 'price' columns (empty if the range has no prices), or None on failure
+        """
+        import yfinance as yf  # Only loaded when prices are actually downloaded
+
+        try:
+            # Add retry logic and different parameters
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')  # yfinance's deprecation chatter
                 sp500 = yf.download(
-                    ticker, 
-                    start=start_date, 
-                    end=end_date, 
+                    ticker,
+                    start=start_date,
+                    end=end_date,
                     progress=False,
                     timeout=30,
                     threads=False
                 )
+            
+            if sp500.empty:
+                print(f"{ticker} returned empty data")
+                return pd.DataFrame({'date': pd.to_datetime([]), 'price': np.array([], dtype=float)})
+            
+            sp500 = sp500.reset_index()
+            
+            # Check if we have the required columns
+            if 'Date' not in sp500.columns:
+                print(f"{ticker} missing Date column")
+                return None
                 
-                if sp500.empty:
-                    print(f"{ticker} returned empty data")
-                    continue
-                
-                sp500 = sp500.reset_index()
-                
-                # Check if we have the required columns
-                if 'Date' not in sp500.columns:
-                    print(f"{ticker} missing Date column")
-                    continue
-                    
-                if 'Adj Close' not in sp500.columns:
-                    if 'Close' in sp500.columns:
-                        sp500['Adj Close'] = sp500['Close']
-                    else:
-                        print(f"{ticker} missing price columns")
-                        continue
-                
-                sp500['Date'] = pd.to_datetime(sp500['Date'])
-                result_df = sp500[['Date', 'Adj Close']].rename(columns={'Date': 'date', 'Adj Close': 'price'})
-                
-                # Remove any NaN values
-                result_df = result_df.dropna()
-                
-                if len(result_df) > 0:
-                    self._sp500_df = result_df
-                    return result_df
+            if 'Adj Close' not in sp500.columns:
+                if 'Close' in sp500.columns:
+                    sp500['Adj Close'] = sp500['Close']
                 else:
-                    print(f"{ticker} had no valid data after cleaning")
-                    continue
-                    
-            except Exception as e:
-                print(f"Error fetching {ticker}: {e}")
-                continue
-        
-        print("All ticker downloads failed. You may need to:")
-        print("1. Check your internet connection")
-        print("2. Try again later (yfinance sometimes has temporary issues)")
-        print("3. Install/update yfinance: pip install --upgrade yfinance")
-        return None
+                    print(f"{ticker} missing price columns")
+                    return None
+            
+            sp500['Date'] = pd.to_datetime(sp500['Date'])
+            result_df = sp500[['Date', 'Adj Close']].rename(columns={'Date': 'date', 'Adj Close': 'price'})
+            
+            # Remove any NaN values
+            result_df = result_df.dropna()
+            
+            if len(result_df) == 0:
+                print(f"{ticker} had no valid data after cleaning")
+            return result_df
+                
+        except Exception as e:
+            print(f"Error fetching {ticker}: {e}")
+            return None
     
     def classify_fear_greed(self, value):
-        """Classify fear/greed value into categories"""
-        if value <= 24:
-            return 'Extreme Fear'
-        elif value <= 44:
-            return 'Fear'
-        elif value <= 55:
-            return 'Neutral'
-        elif value <= 75:
-            return 'Greed'
-        else:
-            return 'Extreme Greed'
+        """Classify fear/greed value into categories using FEAR_GREED_THRESHOLDS"""
+        for category, upper_bound in zip(CATEGORIES, self.FEAR_GREED_THRESHOLDS):
+            if value <= upper_bound:
+                return category
+        return CATEGORIES[-1]
     
     def get_purchase_dates(self, start_date, end_date, day_of_week):
         """Generate all purchase dates based on day of week"""
-        dates = []
-        current_date = pd.to_datetime(start_date)
-        
-        # Handle 'present' end date
-        if end_date == 'present':
-            end_date = pd.to_datetime(datetime.now().strftime('%Y-%m-%d'))
-        else:
-            end_date = pd.to_datetime(end_date)
-        
-        # Find first occurrence of the specified day
-        while current_date.weekday() != day_of_week:
-            current_date += timedelta(days=1)
-        
-        # Generate weekly dates
-        while current_date <= end_date:
-            dates.append(current_date)
-            current_date += timedelta(days=7)
-        
-        return dates
+        start_date = pd.to_datetime(start_date)
+        end_date = pd.to_datetime(self._resolve_end_date(end_date))
+        return pd.DatetimeIndex(weekly_dates(start_date, end_date, day_of_week))
+
+    def get_purchase_schedule(self):
+        """
+        The active purchase Schedule (weekly on PURCHASE_DAY unless PURCHASE_SCHEDULE is set)
+
+        Weekly and biweekly schedules without a day (e.g. 'weekly') buy on PURCHASE_DAY.
+        """
+        if self.PURCHASE_SCHEDULE is None:
+            return Schedule('weekly', day=self.PURCHASE_DAY)
+        schedule = self.PURCHASE_SCHEDULE
+        if isinstance(schedule, str):
+            schedule = Schedule.parse(schedule)
+        if schedule.day is None and schedule.kind in ('weekly', 'biweekly'):
+            schedule = schedule._replace(day=self.PURCHASE_DAY)
+        return schedule
+
+    def simulation_settings(self):
+        """Budget and cost keyword arguments of simulate_batch/simulate_summary for this backtester"""
+        return {
+            'weekly_budget': self.WEEKLY_BUDGET,
+            'initial_cash': self.INITIAL_CASH,
+            'transaction_fee': self.TRANSACTION_FEE,
+            'expense_ratio': self.EXPENSE_RATIO,
+        }
+
+    def get_schedule_dates(self, start_date, end_date, price_df):
+        """Purchase dates for the active schedule, snapped to the trading days in price_df"""
+        start_date = pd.to_datetime(start_date)
+        end_date = pd.to_datetime(self._resolve_end_date(end_date))
+        schedule = self.get_purchase_schedule()
+        if schedule.kind == 'weekly':
+            return self.get_purchase_dates(start_date, end_date, schedule.day)
+        trading_days = self._column_values(price_df, 'date', dtype='datetime64[ns]')
+        return pd.DatetimeIndex(schedule_dates(schedule, start_date, end_date, trading_days))
     
     def get_most_recent_fear_greed(self, target_date, fear_greed_df):
         """Get the most recent fear/greed value before or on target date"""
@@ -165,12 +328,63 @@ class FearGreedBacktester:
         # Get the price as a scalar value, not a Series
         price = available_dates.iloc[-1]['price']
         return float(price)  # Ensure it's a scalar float
-    
-    def run_backtest(self):
-        """Run the complete backtest comparing both strategies"""
-        # Get data
-        fear_greed_df = self.get_fear_greed_data()
-        sp500_df = self.get_sp500_data(self.START_DATE, self.END_DATE)
+
+    def _column_values(self, df, column, dtype=float):
+        """Get a DataFrame column as a flat numpy array (handles yfinance's multi-level columns)"""
+        values = np.asarray(df[column].to_numpy(), dtype=dtype)
+        if values.ndim > 1:
+            values = values[:, 0]
+        return values
+
+    def align_purchase_dates(self, purchase_dates, fear_greed_df, sp500_df):
+        """
+        Resolve the fear/greed value and S&P 500 price for every purchase date in one pass
+
+        Uses the same "most recent on or before the purchase date" rule as
+        get_most_recent_fear_greed and get_sp500_price, but with a sorted search
+        over the whole schedule instead of a DataFrame filter per date.
+
+        Returns:
+            tuple: (dates, fear_greed_values, prices) for the purchase dates that have
+            both a fear/greed value and a price available
+        """
+        dates = pd.DatetimeIndex(purchase_dates)
+        targets = dates.to_numpy(dtype='datetime64[ns]')
+
+        fg_dates = self._column_values(fear_greed_df, 'date', dtype='datetime64[ns]')
+        fg_values = self._column_values(fear_greed_df, 'value')
+        price_dates = self._column_values(sp500_df, 'date', dtype='datetime64[ns]')
+        prices = self._column_values(sp500_df, 'price')
+
+        # Index of the last row dated on or before each purchase date (-1 if none)
+        fg_idx = np.searchsorted(fg_dates, targets, side='right') - 1
+        price_idx = np.searchsorted(price_dates, targets, side='right') - 1
+
+        valid = (fg_idx >= 0) & (price_idx >= 0)
+        return dates[valid], fg_values[fg_idx[valid]], prices[price_idx[valid]]
+
+    def get_timeline(self):
+        """
+        Get the market timeline for the current START_DATE, END_DATE and purchase schedule
+
+        Timelines are kept in an LRU cache keyed on exactly those settings, so
+        repeated backtests with new multipliers skip all data preparation. A
+        change of FEAR_GREED_THRESHOLDS only re-buckets the cached timeline.
+        """
+        key = (self.START_DATE, self._resolve_end_date(self.END_DATE), self.get_purchase_schedule())
+        if key in self._timeline_cache:
+            self._timeline_cache.move_to_end(key)
+            self.instrumentation.count('timeline_cache_hit')
+            return self._timeline_cache[key].with_thresholds(self.FEAR_GREED_THRESHOLDS)
+        self.instrumentation.count('timeline_cache_miss')
+
+        # Get data (fetched concurrently so a cold start waits for the slower of the two)
+        data = fetch_concurrently({
+            'fear_greed': self.get_fear_greed_data,
+            'sp500': lambda: self.get_sp500_data(self.START_DATE, self.END_DATE)
+        })
+        fear_greed_df = data['fear_greed']
+        sp500_df = data['sp500']
         
         if fear_greed_df is None:
             print("Failed to fetch fear/greed data")
@@ -185,108 +399,223 @@ class FearGreedBacktester:
             return None
         
         # Generate purchase dates
-        purchase_dates = self.get_purchase_dates(self.START_DATE, self.END_DATE, self.PURCHASE_DAY)
-        
+        with self.instrumentation.phase('purchase_dates'):
+            purchase_dates = self.get_schedule_dates(self.START_DATE, self.END_DATE, sp500_df)
+
+        # Resolve fear/greed values and prices for every purchase date at once
+        with self.instrumentation.phase('alignment'):
+            dates, fear_greed_values, prices = self.align_purchase_dates(purchase_dates, fear_greed_df, sp500_df)
+            timeline = MarketTimeline(dates, prices, fear_greed_values,
+                                      category_codes=categorize(fear_greed_values), price_data=sp500_df)
+
+        self._timeline_cache[key] = timeline
+        while len(self._timeline_cache) > self.TIMELINE_CACHE_SIZE:
+            self._timeline_cache.popitem(last=False)
+        return timeline.with_thresholds(self.FEAR_GREED_THRESHOLDS)
+
+    def run_multi_ticker_backtest(self, tickers, max_workers=8):
+        """
+        Run DCA and the fear/greed strategy on several tickers in one vectorized pass
+
+        Prices are loaded concurrently (through the price store cache) with at most
+        max_workers downloads at a time, then every ticker is aligned to the same
+        purchase schedule. Only purchase dates where every ticker has a price are
+        used, so all tickers are compared over identical weeks.
+
+        Returns:
+            DataFrame: One row per ticker with final values, returns and cash buffer stats
+        """
+        fear_greed_df = self.get_fear_greed_data()
+        if fear_greed_df is None:
+            print("Failed to fetch fear/greed data")
+            return None
+
+        end_date = self._resolve_end_date(self.END_DATE)
+        with self.instrumentation.phase('fetch_tickers'):
+            price_dfs = fetch_concurrently(
+                {ticker: (lambda ticker=ticker: self.get_ticker_prices(ticker, self.START_DATE, end_date))
+                 for ticker in tickers},
+                max_workers=max_workers)
+
+        loaded = [ticker for ticker in tickers if price_dfs[ticker] is not None]
+        for ticker in tickers:
+            if price_dfs[ticker] is None:
+                print(f"Skipping {ticker}: no price data")
+        if len(loaded) == 0:
+            return None
+
+        with self.instrumentation.phase('alignment'):
+            purchase_dates = self.get_schedule_dates(self.START_DATE, self.END_DATE, price_dfs[loaded[0]])
+            targets = purchase_dates.to_numpy(dtype='datetime64[ns]')
+
+            fg_dates = self._column_values(fear_greed_df, 'date', dtype='datetime64[ns]')
+            fg_idx = np.searchsorted(fg_dates, targets, side='right') - 1
+            valid = fg_idx >= 0
+
+            # Most recent price on or before each purchase date, one column per ticker
+            prices = np.empty((len(targets), len(loaded)))
+            for column, ticker in enumerate(loaded):
+                price_dates = self._column_values(price_dfs[ticker], 'date', dtype='datetime64[ns]')
+                price_idx = np.searchsorted(price_dates, targets, side='right') - 1
+                valid &= price_idx >= 0
+                prices[:, column] = self._column_values(price_dfs[ticker], 'price')[np.maximum(price_idx, 0)]
+
+            fear_greed_values = self._column_values(fear_greed_df, 'value')[fg_idx[valid]]
+            prices = prices[valid]
+            category_codes = categorize(fear_greed_values, self.FEAR_GREED_THRESHOLDS)
+
+        if len(prices) == 0:
+            print("No purchase dates with data for every ticker")
+            return None
+
+        multipliers = np.tile([self.INVESTMENT_MULTIPLIERS[category] for category in CATEGORIES],
+                              (len(loaded), 1))
+        with self.instrumentation.phase('batch_kernel'):
+            result = simulate_batch(prices, category_codes, multipliers,
+                                    period_weeks=purchase_periods(targets[valid]), **self.simulation_settings())
+
+        return pd.DataFrame({
+            'weeks': result.total_weeks,
+            'first_date': purchase_dates[valid][0],
+            'budget_received': result.budget_received,
+            'dca_final_value': result.dca_final_value,
+            'fg_final_value': result.fg_final_value,
+            'dca_return_pct': result.dca_return_pct,
+            'fg_return_pct': result.fg_return_pct,
+            'excess_return': result.excess_return,
+            'fg_purchases': result.fg_purchases,
+            'fg_final_cash': result.fg_final_cash,
+            'cash_min': result.cash_min,
+            'cash_max': result.cash_max,
+            'cash_mean': result.cash_mean,
+        }, index=pd.Index(loaded, name='ticker'))
+
+    def run_backtest_batch(self, multipliers, thresholds=None):
+        """
+        Run the backtest for many multiplier sets in one pass over the timeline
+
+        Args:
+            multipliers: (N x 5) array of [extreme_fear, fear, neutral, greed, extreme_greed]
+                multipliers, or a list of INVESTMENT_MULTIPLIERS style dicts
+            thresholds: Optional (N x 4) array of category thresholds to pair with each
+                multiplier set (default: FEAR_GREED_THRESHOLDS for all of them)
+
+        Returns:
+            BatchResult: Final values, excess return vs DCA and cash buffer stats for all N sets
+        """
+        timeline = self.get_timeline()
+        if timeline is None:
+            return None
+
+        category_codes = timeline.category_codes
+        if thresholds is not None:
+            category_codes = timeline.buckets.codes_batch(thresholds)
+
+        with self.instrumentation.phase('batch_kernel'):
+            return simulate_batch(timeline.prices, category_codes, multipliers, period_weeks=timeline.period_weeks,
+                                  **self.simulation_settings())
+
+    def run_strategies(self, strategies=None):
+        """
+        Run several strategies side by side in one pass over the timeline
+
+        Args:
+            strategies: Strategy instances (see strategies.py), default consistent DCA
+                and the fear/greed cash buffer with INVESTMENT_MULTIPLIERS
+
+        Returns:
+            DataFrame: Final figures per strategy, indexed by strategy name
+        """
+        timeline = self.get_timeline()
+        if timeline is None:
+            return None
+        if strategies is None:
+            strategies = [ConsistentDCA(), FearGreedCashBuffer(self.INVESTMENT_MULTIPLIERS)]
+
+        with self.instrumentation.phase('strategies'):
+            results = run_strategies(timeline, strategies, **self.simulation_settings())
+
+        return pd.DataFrame({
+            'final_value': [r.final_value for r in results],
+            'return_pct': [r.return_pct for r in results],
+            'total_invested': [r.total_invested for r in results],
+            'purchases': [r.purchases for r in results],
+            'final_cash': [r.final_cash for r in results],
+            'cash_min': [r.cash_min for r in results],
+            'cash_max': [r.cash_max for r in results],
+            'cash_mean': [r.cash_mean for r in results],
+        }, index=pd.Index([r.name for r in results], name='strategy'))
+
+    def _simulate_history(self, timeline):
+        """Simulate both strategies over the timeline, recording per-week numpy columns"""
+        # Per-week columns, one entry per purchase date in the timeline
+        total_weeks = len(timeline)
+        columns = {name: np.zeros(total_weeks) for name in BacktestResult.COLUMNS}
+        columns['dca_bought'] = np.zeros(total_weeks, dtype=bool)
+        columns['fg_bought'] = np.zeros(total_weeks, dtype=bool)
+
         # Initialize tracking variables for BOTH strategies
         # Strategy 1: Consistent DCA
         dca_cash = float(self.INITIAL_CASH)
         dca_shares = 0.0
-        dca_history = []
-        dca_transactions = []
         dca_total_budget_received = 0.0
         
         # Strategy 2: Fear/Greed with cash buffer
         fg_cash_buffer = float(self.INITIAL_CASH)  # This is the "bank" for timing the market
         fg_shares = 0.0
-        fg_history = []
-        fg_transactions = []
-        fg_cash_stats = []  # Track cash buffer over time
         fg_total_budget_received = 0.0
         
-        # Week counting and categorization
-        total_weeks = 0
-        fear_greed_week_counts = {
-            'Extreme Fear': 0,
-            'Fear': 0,
-            'Neutral': 0,
-            'Greed': 0,
-            'Extreme Greed': 0
-        }
-        
         dca_successful_purchases = 0
         fg_successful_purchases = 0
         
-        for date in purchase_dates:
-            # Get fear/greed value
-            fear_greed_value = self.get_most_recent_fear_greed(date, fear_greed_df)
-            if fear_greed_value is None:
-                continue
-            
-            # Get S&P 500 price
-            sp500_price = self.get_sp500_price(date, sp500_df)
-            if sp500_price is None:
-                continue
-            
-            # Ensure all values are scalars
-            fear_greed_value = float(fear_greed_value)
-            sp500_price = float(sp500_price)
+        for week, (sp500_price, category_code, period) in enumerate(zip(timeline.prices.tolist(),
+                                                                        timeline.category_codes.tolist(),
+                                                                        timeline.period_weeks.tolist())):
+            fear_greed_category = CATEGORIES[category_code]
             
-            # Count this week and categorize
-            total_weeks += 1
-            fear_greed_category = self.classify_fear_greed(fear_greed_value)
-            fear_greed_week_counts[fear_greed_category] += 1
-            
-            # Both strategies receive the same weekly budget
-            weekly_budget = float(self.WEEKLY_BUDGET)
-            dca_total_budget_received += weekly_budget
-            fg_total_budget_received += weekly_budget
+            # Both strategies receive the same budget, prorated to the weeks since the last purchase date
+            budget = float(self.WEEKLY_BUDGET) * period
+            dca_total_budget_received += budget
+            fg_total_budget_received += budget
             
             # === STRATEGY 1: CONSISTENT DCA ===
-            # Add weekly budget to DCA cash and always invest it
-            dca_cash += weekly_budget
+            # Add the budget to DCA cash and always invest it
+            dca_cash += budget
             
-            if dca_cash >= weekly_budget + self.TRANSACTION_FEE:
-                effective_investment = weekly_budget - self.TRANSACTION_FEE
+            if dca_cash >= budget + self.TRANSACTION_FEE:
+                effective_investment = budget - self.TRANSACTION_FEE
                 shares_to_buy = effective_investment / sp500_price
                 
-                dca_cash = dca_cash - weekly_budget
+                dca_cash = dca_cash - budget
                 dca_shares = dca_shares + shares_to_buy
                 dca_successful_purchases += 1
                 
-                dca_transactions.append({
-                    'date': date,
-                    'investment_amount': weekly_budget,
-                    'shares_bought': shares_to_buy,
-                    'total_shares': dca_shares,
-                    'cash_balance': dca_cash,
-                    'price': sp500_price
-                })
+                columns['dca_bought'][week] = True
+                columns['dca_investment'][week] = budget
+                columns['dca_shares_bought'][week] = shares_to_buy
+                columns['dca_total_shares'][week] = dca_shares
             
             # Calculate DCA portfolio value
             dca_portfolio_value = dca_cash + (dca_shares * sp500_price)
             
-            # Apply expense ratio to DCA
+            # Apply expense ratio to DCA (prorated like the budget)
             if float(dca_shares) > 0:
-                daily_expense = (dca_shares * sp500_price * self.EXPENSE_RATIO) / 365
-                dca_portfolio_value = dca_portfolio_value - daily_expense
-                dca_shares = dca_shares - (daily_expense / sp500_price)
+                expense = (dca_shares * sp500_price * self.EXPENSE_RATIO) / 365 * period
+                dca_portfolio_value = dca_portfolio_value - expense
+                dca_shares = dca_shares - (expense / sp500_price)
             
-            dca_history.append({
-                'date': date,
-                'portfolio_value': float(dca_portfolio_value),
-                'shares_owned': float(dca_shares),
-                'cash_balance': float(dca_cash),
-                'sp500_price': sp500_price
-            })
+            columns['dca_portfolio_value'][week] = dca_portfolio_value
+            columns['dca_shares_owned'][week] = dca_shares
+            columns['dca_cash_balance'][week] = dca_cash
             
             # === STRATEGY 2: FEAR/GREED WITH CASH BUFFER ===
             investment_multiplier = self.INVESTMENT_MULTIPLIERS[fear_greed_category]
 
-            # Add weekly budget to the cash buffer
-            fg_cash_buffer += weekly_budget
+            # Add the budget to the cash buffer
+            fg_cash_buffer += budget
 
-            # 1. Calculate the ideal investment for this week
-            desired_investment = weekly_budget * investment_multiplier
+            # 1. Calculate the ideal investment for this purchase date
+            desired_investment = budget * investment_multiplier
 
             # 2. Determine the actual investment amount, capped by the available cash buffer.
             investment_to_make = min(desired_investment, fg_cash_buffer)
@@ -303,129 +632,83 @@ class FearGreedBacktester:
                 fg_successful_purchases += 1
                 
                 # Log the transaction with both desired and actual investment amounts
-                fg_transactions.append({
-                    'date': date,
-                    'fear_greed_value': fear_greed_value,
-                    'fear_greed_category': fear_greed_category,
-                    'investment_multiplier': investment_multiplier,
-                    'desired_investment': desired_investment,
-                    'investment_amount': investment_to_make,  # Log the actual amount spent
-                    'shares_bought': shares_to_buy,
-                    'total_shares': fg_shares,
-                    'cash_buffer': fg_cash_buffer,
-                    'price': sp500_price
-                })
+                columns['fg_bought'][week] = True
+                columns['fg_investment_multiplier'][week] = investment_multiplier
+                columns['fg_desired_investment'][week] = desired_investment
+                columns['fg_investment'][week] = investment_to_make  # Log the actual amount spent
+                columns['fg_shares_bought'][week] = shares_to_buy
+                columns['fg_total_shares'][week] = fg_shares
             
             # Calculate Fear/Greed portfolio value
             fg_portfolio_value = fg_cash_buffer + (fg_shares * sp500_price)
             
-            # Apply expense ratio to Fear/Greed strategy
+            # Apply expense ratio to Fear/Greed strategy (prorated like the budget)
             if float(fg_shares) > 0:
-                daily_expense = (fg_shares * sp500_price * self.EXPENSE_RATIO) / 365
-                fg_portfolio_value = fg_portfolio_value - daily_expense
-                fg_shares = fg_shares - (daily_expense / sp500_price)
-            
-            # Track cash buffer statistics
-            fg_cash_stats.append({
-                'date': date,
-                'cash_buffer': float(fg_cash_buffer),
-                'fear_greed_value': fear_greed_value,
-                'fear_greed_category': fear_greed_category
-            })
+                expense = (fg_shares * sp500_price * self.EXPENSE_RATIO) / 365 * period
+                fg_portfolio_value = fg_portfolio_value - expense
+                fg_shares = fg_shares - (expense / sp500_price)
             
-            fg_history.append({
-                'date': date,
-                'portfolio_value': float(fg_portfolio_value),
-                'shares_owned': float(fg_shares),
-                'cash_buffer': float(fg_cash_buffer),
-                'sp500_price': sp500_price,
-                'fear_greed_value': fear_greed_value
-            })
+            columns['fg_portfolio_value'][week] = fg_portfolio_value
+            columns['fg_shares_owned'][week] = fg_shares
+            columns['fg_cash_buffer'][week] = fg_cash_buffer
+
+        return columns, dca_total_budget_received, fg_total_budget_received
+
+    def run_backtest(self, summary_only=False):
+        """
+        Run the complete backtest comparing both strategies
+
+        Args:
+            summary_only: Only keep running totals and return a BacktestSummary instead of
+                the per-week histories (much faster, used by the optimizer)
+        """
+        timeline = self.get_timeline()
+        if timeline is None:
+            return None
+
+        if summary_only:
+            if len(timeline) == 0:
+                print("No portfolio history generated - check date ranges and data availability")
+                return None
+            with self.instrumentation.phase('summary_loop'):
+                return simulate_summary(timeline.price_list, timeline.category_code_list,
+                                        self.INVESTMENT_MULTIPLIERS, period_weeks=timeline.period_list,
+                                        **self.simulation_settings())
+
+        with self.instrumentation.phase('weekly_loop'):
+            columns, dca_total_budget_received, fg_total_budget_received = self._simulate_history(timeline)
+        total_weeks = len(timeline)
         
-        if len(dca_history) == 0 or len(fg_history) == 0:
+        if total_weeks == 0:
             print("No portfolio history generated - check date ranges and data availability")
             return None
         
-        # Convert to DataFrames
-        dca_portfolio_df = pd.DataFrame(dca_history)
-        dca_transactions_df = pd.DataFrame(dca_transactions)
-        fg_portfolio_df = pd.DataFrame(fg_history)
-        fg_transactions_df = pd.DataFrame(fg_transactions)
-        fg_cash_stats_df = pd.DataFrame(fg_cash_stats)
-        
-        return (dca_portfolio_df, dca_transactions_df, fg_portfolio_df, fg_transactions_df, 
-                fg_cash_stats_df, sp500_df, total_weeks, fear_greed_week_counts, 
-                dca_total_budget_received, fg_total_budget_received)
+        # DataFrames are only built when a caller asks for them. The result shares this backtester's
+        # (cumulative) recorder so their construction time shows up in its report.
+        return BacktestResult(timeline, columns, dca_total_budget_received, fg_total_budget_received,
+                              instrumentation=self.instrumentation)
     
     def plot_results(self, dca_portfolio_df, fg_portfolio_df, fg_cash_stats_df, dca_transactions_df, fg_transactions_df):
-        """Plot comparison of both strategies"""
+        """Plot comparison of both strategies (reports.render_report writes the same figure to a file)"""
+        import matplotlib.pyplot as plt  # Only loaded when plotting
+
         if len(dca_portfolio_df) == 0 or len(fg_portfolio_df) == 0:
             print("No data to plot")
             return
-            
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(18, 12))
-        
-        # Plot 1: Portfolio Performance Comparison
-        ax1.plot(dca_portfolio_df['date'], dca_portfolio_df['portfolio_value'], 
-                label='Consistent DCA', linewidth=2, color='blue')
-        ax1.plot(fg_portfolio_df['date'], fg_portfolio_df['portfolio_value'], 
-                label='Fear/Greed Strategy', linewidth=2, color='red')
-        
-        ax1.set_title('Portfolio Performance Comparison', fontsize=14, fontweight='bold')
-        ax1.set_ylabel('Portfolio Value ($)')
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        ax1.ticklabel_format(style='plain', axis='y')
-        
-        # Plot 2: Cash Buffer Over Time
-        ax2.plot(fg_cash_stats_df['date'], fg_cash_stats_df['cash_buffer'], 
-                color='green', linewidth=2)
-        ax2.set_title('Fear/Greed Strategy Cash Buffer', fontsize=14, fontweight='bold')
-        ax2.set_ylabel('Cash Buffer ($)')
-        ax2.grid(True, alpha=0.3)
-        ax2.ticklabel_format(style='plain', axis='y')
-        
-        # # Plot 3: Fear/Greed Index over time
-        # ax3.plot(fg_portfolio_df['date'], fg_portfolio_df['fear_greed_value'], 
-        #         color='orange', linewidth=1.5)
-        # ax3.axhline(y=25, color='red', linestyle='--', alpha=0.5, label='Extreme Fear')
-        # ax3.axhline(y=75, color='darkgreen', linestyle='--', alpha=0.5, label='Extreme Greed')
-        # ax3.set_title('Fear & Greed Index Over Time', fontsize=14, fontweight='bold')
-        # ax3.set_ylabel('Fear & Greed Index')
-        # ax3.set_xlabel('Date')
-        # ax3.legend()
-        # ax3.grid(True, alpha=0.3)
-        # ax3.set_ylim(0, 100)
-
-        # Plot 3: Weekly Investment Amounts (replaces Fear & Greed Index plot)
-        dca_weekly = pd.DataFrame(dca_transactions_df[['date', 'investment_amount']]).copy()
-        dca_weekly['strategy'] = 'DCA'
-
-        fg_weekly = pd.DataFrame(fg_transactions_df[['date', 'investment_amount']]).copy()
-        fg_weekly['strategy'] = 'Fear/Greed'
-
-        all_investments = pd.concat([dca_weekly, fg_weekly]).sort_values('date')
-        pivot_df = all_investments.pivot(index='date', columns='strategy', values='investment_amount').fillna(0)
-
-        ax3.plot(pivot_df.index, pivot_df['DCA'], label='Consistent DCA', color='blue', linewidth=1.8)
-        ax3.plot(pivot_df.index, pivot_df['Fear/Greed'], label='Fear/Greed Strategy', color='red', linewidth=1.8)
-        ax3.set_title('Weekly Investment Amount by Strategy', fontsize=14, fontweight='bold')
-        ax3.set_ylabel('Investment ($)')
-        ax3.set_xlabel('Date')
-        ax3.legend()
-        ax3.grid(True, alpha=0.3)
-        ax3.ticklabel_format(style='plain', axis='y')
-        ax3.tick_params(axis='x', rotation=45)
-        
-        # Plot 4: S&P 500 price
-        ax4.plot(dca_portfolio_df['date'], dca_portfolio_df['sp500_price'], 
-                color='black', linewidth=1.5)
-        ax4.set_title('S&P 500 Price Over Time', fontsize=14, fontweight='bold')
-        ax4.set_ylabel('S&P 500 Price ($)')
-        ax4.set_xlabel('Date')
-        ax4.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
+
+        dates = dca_portfolio_df['date'].to_numpy(dtype='datetime64[ns]')
+        columns = {
+            'dates': dates,
+            'prices': dca_portfolio_df['sp500_price'].to_numpy(dtype=float),
+            'dca_value': dca_portfolio_df['portfolio_value'].to_numpy(dtype=float),
+            'fg_value': fg_portfolio_df['portfolio_value'].to_numpy(dtype=float),
+            'fg_cash_buffer': fg_cash_stats_df['cash_buffer'].to_numpy(dtype=float),
+            'dca_investment': amounts_by_date(dates, dca_transactions_df['date'], dca_transactions_df['investment_amount']),
+            'fg_investment': amounts_by_date(dates, fg_transactions_df['date'], fg_transactions_df['investment_amount']),
+        }
+
+        fig = plt.figure(figsize=(18, 12))
+        draw_report(fig, columns, max_points=None)  # Full detail, the window can be zoomed
         plt.show()
     
     def print_summary_stats(self, dca_portfolio_df, dca_transactions_df, fg_portfolio_df, fg_transactions_df, 
@@ -516,4 +799,19 @@ class FearGreedBacktester:
         if excess_return > 0:
             print(f"  Fear/Greed strategy outperformed by {excess_return:.2f}%")
         else:
-            print(f"  DCA strategy outperformed by {abs(excess_return):.2f}%")
\ No newline at end of file
+            print(f"  DCA strategy outperformed by {abs(excess_return):.2f}%")
+
+        # Risk metrics for both strategies in one pass
+        values = np.column_stack([dca_portfolio_df['portfolio_value'].to_numpy(dtype=float),
+                                  fg_portfolio_df['portfolio_value'].to_numpy(dtype=float)])
+        dates = dca_portfolio_df['date'].to_numpy(dtype='datetime64[ns]')
+        metrics = compute_metrics(values, dates, self.WEEKLY_BUDGET * purchase_periods(dates),
+                                  initial_cash=self.INITIAL_CASH)
+        print(f"\nRisk Metrics:             {'DCA':>10} {'Fear/Greed':>12}")
+        print(f"  Time-Weighted Return:  {metrics.twr_pct[0]:9.2f}% {metrics.twr_pct[1]:11.2f}%")
+        print(f"  Annualized TWR:        {metrics.annualized_twr_pct[0]:9.2f}% {metrics.annualized_twr_pct[1]:11.2f}%")
+        print(f"  Money-Weighted (XIRR): {metrics.xirr_pct[0]:9.2f}% {metrics.xirr_pct[1]:11.2f}%")
+        print(f"  Volatility:            {metrics.volatility_pct[0]:9.2f}% {metrics.volatility_pct[1]:11.2f}%")
+        print(f"  Max Drawdown:          {metrics.max_drawdown_pct[0]:9.2f}% {metrics.max_drawdown_pct[1]:11.2f}%")
+        print(f"  Sharpe Ratio:          {metrics.sharpe[0]:10.2f} {metrics.sharpe[1]:12.2f}")
+        print(f"  Sortino Ratio:         {metrics.sortino[0]:10.2f} {metrics.sortino[1]:12.2f}")
@@ -0,0 +1,151 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from backtest import FearGreedBacktester
+from syntheticData import generate_fear_greed_data, generate_price_data
+
+BENCHMARK_END_DATE = '2025-01-01'
+DEFAULT_YEARS = [1, 5, 10, 20, 30, 50]
+RESULTS_FILE = 'benchmark_results.jsonl'
+
+
+def create_synthetic_backtester(years, seed=0):
+    """Backtester over `years` of seeded synthetic data (no network access)"""
+    end = pd.Timestamp(BENCHMARK_END_DATE)
+    start = end - pd.DateOffset(years=years)
+    backtester = FearGreedBacktester()
+    backtester.START_DATE = start.strftime('%Y-%m-%d')
+    backtester.END_DATE = end.strftime('%Y-%m-%d')
+    backtester.set_data(generate_fear_greed_data(start - pd.DateOffset(months=1), end, seed=seed),
+                        generate_price_data(start - pd.DateOffset(months=1), end, seed=seed))
+    return backtester
+
+
+def time_call(func, repeats, setup=None):
+    """Run func `repeats` times and return the wall times in seconds"""
+    times = []
+    for _ in range(repeats):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        if setup is not None:
+            func(arg)
+        else:
+            func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def record(results, name, years, weeks, times, **extra):
+    """Add one benchmark entry and print it"""
+    entry = {
+        'benchmark': name,
+        'years': years,
+        'weeks': weeks,
+        'repeats': len(times),
+        'min_s': min(times),
+        'median_s': float(np.median(times)),
+    }
+    entry.update(extra)
+    results.append(entry)
+    extra_text = ''.join(f", {key}={value:,.0f}" for key, value in extra.items())
+    print(f"{name:22} {years:3d}y  median {entry['median_s'] * 1000:10.3f} ms  "
+          f"min {entry['min_s'] * 1000:10.3f} ms{extra_text}")
+
+
+def run_benchmarks(years_list=DEFAULT_YEARS, repeats=5, batch_size=1000, optimizer_calls=30):
+    """Run every benchmark for each backtest length and return the entries"""
+    results = []
+    silent = contextlib.redirect_stdout
+
+    for years in years_list:
+        backtester = create_synthetic_backtester(years)
+        fear_greed_df, sp500_df = backtester._fear_greed_df, backtester._sp500_df
+        weeks = len(backtester.get_timeline())
+
+        # Data prep: purchase schedule, alignment and categorization from scratch
+        def prepare():
+            backtester.set_data(fear_greed_df, sp500_df)
+            backtester.get_timeline()
+        record(results, 'data_prep', years, weeks, time_call(prepare, repeats))
+
+        # Weekly loop: full run_backtest without building any DataFrames
+        record(results, 'weekly_loop', years, weeks, time_call(backtester.run_backtest, repeats))
+
+        record(results, 'summary_loop', years, weeks,
+               time_call(lambda: backtester.run_backtest(summary_only=True), repeats))
+
+        # Result construction: materializing all five DataFrames
+        def materialize(result):
+            return (result.dca_portfolio_df, result.dca_transactions_df, result.fg_portfolio_df,
+                    result.fg_transactions_df, result.fg_cash_stats_df)
+        record(results, 'result_construction', years, weeks,
+               time_call(materialize, repeats, setup=backtester.run_backtest))
+
+        def summary_stats(result):
+            (dca_portfolio_df, dca_transactions_df, fg_portfolio_df, fg_transactions_df,
+             fg_cash_stats_df, _, total_weeks, fear_greed_week_counts,
+             dca_total_budget_received, fg_total_budget_received) = result
+            with silent(io.StringIO()):
+                backtester.print_summary_stats(dca_portfolio_df, dca_transactions_df, fg_portfolio_df,
+                                               fg_transactions_df, fg_cash_stats_df, total_weeks,
+                                               fear_greed_week_counts, dca_total_budget_received,
+                                               fg_total_budget_received)
+        record(results, 'print_summary_stats', years, weeks,
+               time_call(summary_stats, repeats, setup=backtester.run_backtest))
+
+        # Batched kernel throughput
+        multipliers = np.random.default_rng(0).uniform(0, 2, (batch_size, 5))
+        times = time_call(lambda: backtester.run_backtest_batch(multipliers), repeats)
+        record(results, 'batch_kernel', years, weeks, times,
+               sets_per_s=batch_size / float(np.median(times)))
+
+        # End-to-end optimizer throughput
+        if optimizer_calls > 0:
+            from findOptimal import bayesian_optimization
+            def optimize():
+                with silent(io.StringIO()):
+                    bayesian_optimization(backtester=backtester, n_calls=optimizer_calls,
+                                          n_initial_points=min(10, optimizer_calls), results_file=None,
+                                          store_file=None)
+            times = time_call(optimize, 1)
+            record(results, 'optimizer', years, weeks, times,
+                   evals_per_s=optimizer_calls / times[0])
+
+    return results
+
+
+def save_results(results, path=RESULTS_FILE):
+    """Append this run to the results file (one JSON object per line)"""
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline backtester benchmarks on synthetic data")
+    parser.add_argument('--years', type=int, nargs='+', default=DEFAULT_YEARS,
+                        help="Backtest lengths in years")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Multiplier sets per batch kernel call")
+    parser.add_argument('--optimizer-calls', type=int, default=30,
+                        help="gp_minimize evaluations per optimizer benchmark (0 to skip)")
+    parser.add_argument('--output', default=RESULTS_FILE, help="JSON lines file the run is appended to")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.years, repeats=args.repeats, batch_size=args.batch_size,
+                             optimizer_calls=args.optimizer_calls)
+    save_results(results, args.output)
+    print(f"\nResults appended to {args.output}")
@@ -0,0 +1,100 @@
+import argparse
+import sys
+
+# Subcommands whose options are parsed by the module they run
+PASSTHROUGH_COMMANDS = ('optimize', 'decide', 'sweep')
+
+
+def backtest_command(args):
+    """Run one backtest, print its statistics and plot it (or write a report file)"""
+    from runOneBacktest import main as run_one_backtest
+
+    results = run_one_backtest(start_date=args.start, end_date=args.end, weekly_budget=args.budget,
+                               schedule=args.schedule, plot=not args.no_plot, report_path=args.report)
+    return 0 if results is not None else 1
+
+
+def fetch_command(args):
+    """Refresh the fear/greed cache and the stored prices without running anything"""
+    from backtest import FearGreedBacktester
+
+    backtester = FearGreedBacktester()
+    backtester.CACHE_DIR = args.cache_dir
+    backtester.CACHE_TTL = 0  # Always revalidate against the server
+    backtester.START_DATE = args.start
+    backtester.END_DATE = 'present'
+    timeline = backtester.get_timeline()
+    if timeline is None:
+        return 1
+    print(f"Cached {len(backtester.get_fear_greed_data())} fear/greed points and "
+          f"{len(backtester.get_sp500_data(args.start, 'present'))} daily prices in {args.cache_dir}")
+    print(f"{len(timeline)} purchase dates from {str(timeline.dates[0])[:10]} to {str(timeline.dates[-1])[:10]}")
+    return 0
+
+
+def optimize_command(argv, prog):
+    from findOptimal import main as optimize
+    optimize(argv, prog=prog)
+    return 0
+
+
+def decide_command(argv, prog):
+    from decide import main as decide
+    decide(argv, prog=prog)
+    return 0
+
+
+def sweep_command(argv, prog):
+    from sweep import main as sweep
+    sweep(argv, prog=prog)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Fear & Greed backtester. Each subcommand only imports what it needs, "
+                    "so 'decide' starts without pandas, matplotlib, yfinance or skopt.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    backtest = subparsers.add_parser('backtest', help="Run one backtest and show the results")
+    backtest.add_argument('--start', default='2020-07-28', help="Backtest start date")
+    backtest.add_argument('--end', default='2025-07-28', help="Backtest end date, or 'present'")
+    backtest.add_argument('--budget', type=float, default=500, help="Weekly budget")
+    backtest.add_argument('--schedule', default=None, help="Purchase schedule, e.g. 'monthly:15'")
+    backtest.add_argument('--no-plot', action='store_true', help="Skip plotting (matplotlib is never loaded)")
+    backtest.add_argument('--report', default=None, metavar='PATH',
+                          help="Write the charts to a PNG or SVG file instead of showing them")
+
+    fetch = subparsers.add_parser('fetch', help="Refresh the cached fear/greed data and prices")
+    fetch.add_argument('--start', default='2011-01-01', help="First date of price history to keep")
+    fetch.add_argument('--cache-dir', default='.cache', help="Cache directory")
+
+    # Options are forwarded to findOptimal.py / decide.py / sweep.py, '<command> --help' lists them
+    subparsers.add_parser('optimize', add_help=False, help="Search for the best multipliers (findOptimal.py)")
+    subparsers.add_parser('decide', add_help=False, help="This week's purchase from the live state (decide.py)")
+    subparsers.add_parser('sweep', add_help=False, help="Sharded exhaustive parameter sweep (sweep.py)")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+
+    if args.command in PASSTHROUGH_COMMANDS:
+        prog = f"{parser.prog} {args.command}"
+        if args.command == 'optimize':
+            return optimize_command(rest, prog)
+        if args.command == 'sweep':
+            return sweep_command(rest, prog)
+        return decide_command(rest, prog)
+
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    if args.command == 'backtest':
+        return backtest_command(args)
+    return fetch_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
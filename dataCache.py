@@ -0,0 +1,125 @@
+import os
+import time
+from typing import NamedTuple
+import numpy as np
+
+FEAR_GREED_CACHE_FILE = 'fear_greed.npz'
+
+
+class FearGreedCache(NamedTuple):
+    """Cached fear/greed series plus the HTTP validators it was fetched with"""
+    dates: np.ndarray
+    values: np.ndarray
+    fetched_at: float
+    etag: str
+    last_modified: str
+
+
+def _to_arrays(data):
+    """Convert raw API rows into sorted (dates, values) arrays"""
+    if not data:
+        return np.array([], dtype='datetime64[ns]'), np.array([], dtype=float)
+    dates = np.array([row['date'] for row in data], dtype='datetime64[ns]')
+    values = np.array([row['value'] for row in data], dtype=float)
+    order = np.argsort(dates, kind='stable')
+    return dates[order], values[order]
+
+
+def read_fear_greed_cache(cache_dir):
+    """Read the cached fear/greed series, returns a FearGreedCache or None"""
+    path = os.path.join(cache_dir, FEAR_GREED_CACHE_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as cache:
+            return FearGreedCache(cache['dates'], cache['values'], float(cache['fetched_at']),
+                                  str(cache['etag']) if 'etag' in cache else '',
+                                  str(cache['last_modified']) if 'last_modified' in cache else '')
+    except Exception as e:
+        print(f"Error reading fear/greed cache: {e}")
+        return None
+
+
+def write_fear_greed_cache(cache_dir, dates, values, fetched_at=None, etag=None, last_modified=None):
+    """Write the fear/greed series (and the validators it was fetched with) to the cache directory"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, FEAR_GREED_CACHE_FILE)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path,
+             dates=np.asarray(dates, dtype='datetime64[ns]'),
+             values=np.asarray(values, dtype=float),
+             fetched_at=np.float64(time.time() if fetched_at is None else fetched_at),
+             etag=np.str_(etag or ''),
+             last_modified=np.str_(last_modified or ''))
+    # Atomic replace so concurrent readers never see a half-written file
+    os.replace(tmp_path, path)
+
+
+def merge_new_points(cached_dates, cached_values, dates, values):
+    """Append only the points newer than the last cached date"""
+    if len(cached_dates) == 0:
+        return dates, values
+    newer = dates > cached_dates[-1]
+    return (np.concatenate([cached_dates, dates[newer]]),
+            np.concatenate([cached_values, values[newer]]))
+
+
+def load_fear_greed_data(cache_dir, ttl=24 * 3600, offline=False, instrumentation=None, url=None):
+    """
+    Load the fear/greed series from the local cache, refreshing it when stale
+
+    Args:
+        cache_dir: Directory holding the cache file
+        ttl: Seconds a cached series stays fresh before it is refreshed
+        offline: Never touch the network, use whatever is cached
+        instrumentation: Optional Instrumentation that counts disk cache hits/misses
+        url: Fear/greed data endpoint (default: scrapeCNNData.FEAR_GREED_URL)
+
+    Returns:
+        tuple: (dates, values) numpy arrays sorted by date, or None
+    """
+    # Imported here so reading the cache doesn't pull in the HTTP stack
+    from scrapeCNNData import FEAR_GREED_URL, fetch_fear_greed_data_conditional
+    url = url or FEAR_GREED_URL
+
+    cached = read_fear_greed_cache(cache_dir)
+
+    if cached is not None:
+        if offline or time.time() - cached.fetched_at < ttl:
+            if instrumentation is not None:
+                instrumentation.count('fear_greed_disk_hit')
+            return cached.dates, cached.values
+    elif offline:
+        print("Offline mode: no cached fear/greed data available")
+        return None
+
+    if instrumentation is not None:
+        instrumentation.count('fear_greed_disk_miss')
+
+    # Revalidate the cached copy instead of downloading it again if nothing changed
+    if cached is not None:
+        result = fetch_fear_greed_data_conditional(url, etag=cached.etag, last_modified=cached.last_modified)
+    else:
+        result = fetch_fear_greed_data_conditional(url)
+
+    if result is None:
+        if cached is not None:
+            print("Using stale cached fear/greed data")
+            return cached.dates, cached.values
+        return None
+
+    if result.not_modified:
+        if instrumentation is not None:
+            instrumentation.count('fear_greed_not_modified')
+        dates, values = cached.dates, cached.values
+    else:
+        dates, values = _to_arrays(result.data)
+        if cached is not None:
+            dates, values = merge_new_points(cached.dates, cached.values, dates, values)
+
+    try:
+        write_fear_greed_cache(cache_dir, dates, values, etag=result.etag, last_modified=result.last_modified)
+    except Exception as e:
+        print(f"Error writing fear/greed cache: {e}")
+
+    return dates, values
@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple, Optional
+
+DEFAULT_TIMEOUT = 30  # Seconds per request
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class FetchResult(NamedTuple):
+    """Response of a conditional GET (data is None when the server said 304 Not Modified)"""
+    data: Any
+    not_modified: bool
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+def create_session(retries=3, backoff_factor=0.5, pool_size=10):
+    """
+    Create a requests session with connection pooling and bounded retry
+
+    Failed connections and the statuses in RETRY_STATUSES are retried up to
+    `retries` times with exponential backoff (backoff_factor * 2^n seconds).
+    requests is imported here so that importing this module stays cheap.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """Shared session used by every fetch in this process"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def fetch_json(url, headers=None, etag=None, last_modified=None, timeout=DEFAULT_TIMEOUT, session=None):
+    """
+    GET a JSON document, revalidating with ETag / If-Modified-Since when given
+
+    Raises:
+        requests.RequestException: If the request fails after all retries
+    """
+    request_headers = dict(headers or {})
+    if etag:
+        request_headers['If-None-Match'] = etag
+    if last_modified:
+        request_headers['If-Modified-Since'] = last_modified
+
+    response = (session or get_session()).get(url, headers=request_headers, timeout=timeout)
+    if response.status_code == 304:
+        return FetchResult(None, True, etag, last_modified)
+    response.raise_for_status()
+    return FetchResult(response.json(), False, response.headers.get('ETag'),
+                       response.headers.get('Last-Modified'))
+
+
+def fetch_concurrently(tasks, max_workers=None):
+    """
+    Run independent fetches at the same time
+
+    Args:
+        tasks: Dict of name -> zero-argument callable
+        max_workers: Thread count (defaults to one per task)
+
+    Returns:
+        dict: name -> callable's return value
+    """
+    if len(tasks) == 0:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(tasks)) as executor:
+        futures = {name: executor.submit(task) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import time
+from datetime import date
+from liveSimulator import LiveSimulator
+
+DEFAULT_CACHE_DIR = '.cache'
+LIVE_STATE_FILE = 'live_state.json'
+
+
+def cached_fear_greed_source(cache_dir=DEFAULT_CACHE_DIR):
+    """Source reading the latest point of the local fear/greed cache"""
+    from dataCache import FEAR_GREED_CACHE_FILE, read_fear_greed_cache
+
+    def latest():
+        cached = read_fear_greed_cache(cache_dir)
+        if cached is None or len(cached.dates) == 0:
+            return None
+        return str(cached.dates[-1])[:10], float(cached.values[-1])
+
+    latest.path = os.path.join(cache_dir, FEAR_GREED_CACHE_FILE)
+    return latest
+
+
+def json_file_source(path):
+    """
+    Source reading a local JSON file, for stand-in data
+
+    The file holds either {"date": ..., "value": ...} or a list of such points
+    (like the fear/greed API's "agg" rows), in which case the last one is used.
+    """
+    def latest():
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            if not data:
+                return None
+            data = data[-1]
+        return str(data['date'])[:10], float(data['value'])
+
+    latest.path = path
+    return latest
+
+
+class DecisionService:
+    """
+    Preloaded fear/greed value and live state answering "how much do I buy this week"
+
+    The source is only re-read when its file changes, so a decision is a stat
+    call plus a few float operations.
+    """
+
+    def __init__(self, state_path=LIVE_STATE_FILE, source=None):
+        self.state_path = state_path
+        self.source = source or cached_fear_greed_source()
+        self.simulator = LiveSimulator.load(state_path)
+        self.fear_greed_date = None
+        self.fear_greed_value = None
+        self._source_mtime = None
+        self.refresh()
+
+    def refresh(self):
+        """Reload the latest fear/greed point if the source changed since the last read"""
+        path = getattr(self.source, 'path', None)
+        mtime = os.stat(path).st_mtime_ns if path and os.path.exists(path) else None
+        if mtime is not None and mtime == self._source_mtime:
+            return
+        latest = self.source()
+        if latest is None:
+            raise ValueError("No fear/greed data available from the source")
+        self.fear_greed_date, self.fear_greed_value = latest
+        self._source_mtime = mtime
+
+    def decide(self, fear_greed_value=None, purchase_date=None):
+        """Decision for the latest fear/greed value (or the given one) on purchase_date (default today)"""
+        self.refresh()
+        value = self.fear_greed_value if fear_greed_value is None else fear_greed_value
+        return self.simulator.decide(value, purchase_date or date.today().isoformat())
+
+    def apply(self, price, purchase_date=None, fear_greed_value=None):
+        """Record this week's purchase at price and persist the updated state"""
+        self.refresh()
+        value = self.fear_greed_value if fear_greed_value is None else fear_greed_value
+        event = self.simulator.update(purchase_date or date.today().isoformat(), value, price)
+        self.simulator.save(self.state_path)
+        return event
+
+    def as_dict(self, decision):
+        return {'fear_greed_date': self.fear_greed_date, 'state_date': self.simulator.last_date,
+                **decision._asdict()}
+
+
+def initialize_state(state_path=LIVE_STATE_FILE, weekly_budget=None, multipliers=None, start_date=None,
+                     schedule=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Build the live state from the backtester's full history (imports the backtesting stack)
+
+    weekly_budget, multipliers (Extreme Fear to Extreme Greed), start_date and
+    schedule override the backtester's defaults; None keeps a default. They are
+    saved with the state, so later decisions use them too.
+    """
+    from backtest import FearGreedBacktester
+    from timeline import CATEGORIES
+
+    backtester = FearGreedBacktester()
+    backtester.CACHE_DIR = cache_dir
+    if weekly_budget is not None:
+        backtester.WEEKLY_BUDGET = weekly_budget
+    if multipliers is not None:
+        backtester.INVESTMENT_MULTIPLIERS = dict(zip(CATEGORIES, multipliers))
+    if start_date is not None:
+        backtester.START_DATE = start_date
+    if schedule is not None:
+        backtester.PURCHASE_SCHEDULE = schedule
+    timeline = backtester.get_timeline()
+    if timeline is None:
+        print("Failed to prepare backtest data")
+        return None
+    simulator = LiveSimulator.from_backtester(backtester)
+    simulator.catch_up(timeline)
+    simulator.save(state_path)
+    print(f"Saved live state through {simulator.last_date} ({simulator.total_weeks} weeks) to {state_path}")
+    print(f"Built from {simulator.start_date} on schedule '{simulator.schedule}', "
+          f"${simulator.weekly_budget:,.2f} weekly budget, multipliers "
+          f"{', '.join(f'{multiplier:.2f}' for multiplier in simulator.multipliers.values())}")
+    return simulator
+
+
+def print_decision(service, decision):
+    print(f"Fear & Greed:      {decision.fear_greed_value:.0f} ({decision.category}) as of {service.fear_greed_date}")
+    print(f"Multiplier:        {decision.multiplier:.2f}x")
+    print(f"Desired purchase:  ${decision.desired_investment:,.2f}")
+    print(f"Purchase:          ${decision.investment:,.2f} (cash buffer ${decision.cash_buffer:,.2f})")
+
+
+def serve(service, port, host='127.0.0.1'):
+    """Answer every GET with the current decision as JSON"""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            start = time.perf_counter()
+            try:
+                body = service.as_dict(service.decide())
+                body['latency_us'] = round((time.perf_counter() - start) * 1e6, 1)
+                status = 200
+            except Exception as e:
+                body, status = {'error': str(e)}, 500
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer((host, port), Handler)
+    print(f"Serving decisions on http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="This week's Fear & Greed purchase")
+    parser.add_argument('--state', default=LIVE_STATE_FILE, help="Saved LiveSimulator state")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Fear/greed cache directory")
+    parser.add_argument('--source', default=None, help="JSON file to read the fear/greed value from instead")
+    parser.add_argument('--value', type=float, default=None, help="Use this fear/greed value")
+    parser.add_argument('--json', action='store_true', help="Print the decision as JSON")
+    parser.add_argument('--apply', type=float, default=None, metavar='PRICE',
+                        help="Record this week's purchase at PRICE and save the state")
+    parser.add_argument('--serve', type=int, default=None, metavar='PORT', help="Serve decisions over HTTP")
+    parser.add_argument('--init', action='store_true', help="Build the state from the full history")
+    init_options = parser.add_argument_group("--init options (saved with the state, default: the backtester's)")
+    init_options.add_argument('--budget', type=float, default=None, help="Weekly budget")
+    init_options.add_argument('--multipliers', type=float, nargs=5, default=None, metavar=('EF', 'F', 'N', 'G', 'EG'),
+                              help="Extreme Fear, Fear, Neutral, Greed and Extreme Greed multipliers")
+    init_options.add_argument('--start', default=None, help="First purchase date of the history")
+    init_options.add_argument('--schedule', default=None, help="Purchase schedule, e.g. 'monthly:15'")
+    args = parser.parse_args(argv)
+    init_flags = [flag for flag, value in (('--budget', args.budget), ('--multipliers', args.multipliers),
+                                           ('--start', args.start), ('--schedule', args.schedule))
+                  if value is not None]
+    if init_flags and not args.init:
+        parser.error(f"{', '.join(init_flags)} only apply with --init, the saved state keeps its settings")
+    if args.schedule is not None:
+        from schedules import Schedule
+        try:
+            Schedule.parse(args.schedule)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.init:
+        initialize_state(args.state, weekly_budget=args.budget, multipliers=args.multipliers,
+                         start_date=args.start, schedule=args.schedule, cache_dir=args.cache_dir)
+    elif not os.path.exists(args.state):
+        raise SystemExit(f"No live state at {args.state}, create it with --init")
+    else:
+        source = json_file_source(args.source) if args.source else cached_fear_greed_source(args.cache_dir)
+        service = DecisionService(args.state, source)
+
+        if args.serve is not None:
+            serve(service, args.serve)
+        elif args.apply is not None:
+            event = service.apply(args.apply, fear_greed_value=args.value)
+            if event is None:
+                print(f"Purchase for {service.simulator.last_date} was already recorded")
+            else:
+                print(f"Recorded {event.date}: bought ${event.investment:,.2f} at ${event.price:,.2f}, "
+                      f"cash buffer ${event.fg_cash_buffer:,.2f}")
+        else:
+            decision = service.decide(args.value)
+            if args.json:
+                print(json.dumps(service.as_dict(decision)))
+            else:
+                print_decision(service, decision)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import sqlite3
+import time
+import numpy as np
+
+EVAL_STORE_FILE = 'optimization_evaluations.sqlite'
+
+# Backtester settings that change what an objective value means
+FINGERPRINT_SETTINGS = ('WEEKLY_BUDGET', 'INITIAL_CASH', 'TRANSACTION_FEE', 'EXPENSE_RATIO')
+
+
+def fingerprint(backtester, timeline, **extra):
+    """
+    Hash of everything besides the searched parameters that an evaluation depends on
+
+    Covers the aligned timeline data, the backtester's money settings and any
+    extra keyword values (e.g. the search space), so stored results are only
+    reused for identical inputs.
+    """
+    digest = hashlib.sha256()
+    for array in (timeline.dates, timeline.prices, timeline.fear_greed_values, timeline.period_weeks):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    config = {name: getattr(backtester, name) for name in FINGERPRINT_SETTINGS}
+    config.update(extra)
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _params_key(params):
+    return json.dumps([round(float(p), 12) for p in params])
+
+
+class EvaluationStore:
+    """
+    SQLite log of objective evaluations, written as they happen
+
+    Every row is keyed by (fingerprint, parameter vector). An interrupted
+    optimization can reload its points to resume from, and repeated points
+    are looked up instead of simulated again.
+    """
+
+    def __init__(self, path=EVAL_STORE_FILE):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS evaluations (
+                fingerprint TEXT NOT NULL,
+                params TEXT NOT NULL,
+                objective REAL NOT NULL,
+                portfolio_value REAL,
+                excess_return REAL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (fingerprint, params)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, fingerprint, params):
+        """(objective, portfolio_value, excess_return) for a stored point, or None"""
+        return self._conn.execute(
+            "SELECT objective, portfolio_value, excess_return FROM evaluations WHERE fingerprint = ? AND params = ?",
+            (fingerprint, _params_key(params))).fetchone()
+
+    def put(self, fingerprint, params, objective, portfolio_value=None, excess_return=None):
+        """Record one evaluation (committed immediately so a crash loses at most this point)"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?, ?)",
+            (fingerprint, _params_key(params), float(objective),
+             None if portfolio_value is None else float(portfolio_value),
+             None if excess_return is None else float(excess_return), time.time()))
+        self._conn.commit()
+
+    def load(self, fingerprint):
+        """
+        All stored evaluations for a fingerprint, oldest first
+
+        Returns:
+            list: (params, objective, portfolio_value, excess_return) tuples
+        """
+        rows = self._conn.execute(
+            "SELECT params, objective, portfolio_value, excess_return FROM evaluations "
+            "WHERE fingerprint = ? ORDER BY created_at, rowid", (fingerprint,)).fetchall()
+        return [(json.loads(params), objective, value, excess) for params, objective, value, excess in rows]
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
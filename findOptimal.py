@@ -1,43 +1,215 @@
+import argparse
+import contextlib
+import io
+import time
 import numpy as np
-from skopt import gp_minimize
-from skopt.space import Real
+from skopt import gp_minimize, Optimizer
+from skopt.space import Integer, Real, Space
 from skopt.acquisition import gaussian_ei
+from skopt.utils import create_result
 from backtest import FearGreedBacktester
+from evalStore import EVAL_STORE_FILE, EvaluationStore, fingerprint
+from metrics import OBJECTIVES, objective_scores
+from schedules import purchase_periods
+from simulation import simulate_batch
+from workerPool import SharedTimelinePool
 
-def bayesian_optimization():
+RESULTS_FILE = "bayesian_optimization_results.txt"
+
+# Define search space - now includes neutral as a parameter
+# Each parameter can range from 0.0 to 2.0
+SEARCH_SPACE = [
+    Real(0.0, 2.0, name='extreme_fear'),  # Extreme Fear multiplier
+    Real(0.0, 2.0, name='fear'),          # Fear multiplier
+    Real(0.0, 2.0, name='neutral'),       # Neutral multiplier (now optimized)
+    Real(0.0, 2.0, name='greed'),         # Greed multiplier
+    Real(0.0, 2.0, name='extreme_greed')  # Extreme Greed multiplier
+]
+
+# Category upper bounds, searched jointly with the multipliers when optimize_thresholds=True
+THRESHOLD_SPACE = [
+    Integer(10, 35, name='extreme_fear_max'),  # Default 24
+    Integer(30, 50, name='fear_max'),          # Default 44
+    Integer(45, 65, name='neutral_max'),       # Default 55
+    Integer(60, 90, name='greed_max')          # Default 75
+]
+
+def search_space(optimize_thresholds=False):
+    return SEARCH_SPACE + THRESHOLD_SPACE if optimize_thresholds else SEARCH_SPACE
+
+def thresholds_valid(thresholds):
+    """Category thresholds must be strictly increasing"""
+    return all(upper > lower for lower, upper in zip(thresholds, thresholds[1:]))
+
+def params_dict(params, optimize_thresholds=False):
+    """History entry parameters for a point in the search space"""
+    ef, f, n, g, eg = params[:5]
+    evaluated_params = {'EF': ef, 'F': f, 'N': n, 'G': g, 'EG': eg}
+    if optimize_thresholds:
+        evaluated_params['thresholds'] = tuple(params[5:])
+    return evaluated_params
+
+def open_store(backtester, store_file, optimize_thresholds=False, objective='final_value'):
     """
-    Use Bayesian optimization to find optimal Fear & Greed multipliers
+    Evaluation store and fingerprint for this optimization's data and settings
+
+    Returns:
+        tuple: (EvaluationStore, fingerprint), or (None, None) if store_file is None
     """
-    
-    # Initialize backtester
+    if not store_file:
+        return None, None
+    timeline = backtester.get_timeline()
+    if timeline is None:
+        return None, None
+    key = fingerprint(backtester, timeline,
+                      search_space=[(type(dimension).__name__, dimension.name, dimension.low, dimension.high)
+                                    for dimension in search_space(optimize_thresholds)],
+                      thresholds=None if optimize_thresholds else list(backtester.FEAR_GREED_THRESHOLDS),
+                      **({} if objective == 'final_value' else {'objective': objective}))
+    return EvaluationStore(store_file), key
+
+def load_stored_points(store, key, evaluation_history, optimize_thresholds=False, objective_name='final_value'):
+    """
+    Previously stored evaluations as (x0, y0) for resuming, adding them to evaluation_history
+
+    Returns:
+        tuple: (list of points, list of objective values)
+    """
+    space = search_space(optimize_thresholds)
+    x0, y0 = [], []
+    for params, objective, portfolio_value, excess_return in store.load(key):
+        params = [int(round(p)) if isinstance(dimension, Integer) else p for p, dimension in zip(params, space)]
+        x0.append(params)
+        y0.append(objective)
+        if portfolio_value is not None:
+            evaluation_history.append({
+                'params': params_dict(params, optimize_thresholds),
+                'portfolio_value': portfolio_value,
+                'excess_return': excess_return
+            })
+            if objective_name != 'final_value':
+                evaluation_history[-1]['score'] = -objective
+    return x0, y0
+
+def format_params(p):
+    text = f"EF={p['EF']:.2f}, F={p['F']:.2f}, N={p['N']:.2f}, G={p['G']:.2f}, EG={p['EG']:.2f}"
+    if 'thresholds' in p:
+        text += f", thresholds={'/'.join(str(int(t)) for t in p['thresholds'])}"
+    return text
+
+def create_backtester(schedule=None):
+    """Backtester configured for the optimization window"""
     backtester = FearGreedBacktester()
     backtester.PURCHASE_DAY = 1
+    backtester.PURCHASE_SCHEDULE = schedule  # e.g. 'monthly:15' or 'daily' (None = weekly on PURCHASE_DAY)
     backtester.START_DATE = '2015-07-28'
     backtester.END_DATE = '2025-07-28'
     backtester.WEEKLY_BUDGET = 500
     backtester.INITIAL_CASH = 0
+    return backtester
+
+@contextlib.contextmanager
+def restoring(backtester, *names):
+    """Put the backtester's named attributes back as they were once the block exits"""
+    saved = {name: getattr(backtester, name) for name in names}
+    try:
+        yield backtester
+    finally:
+        for name, value in saved.items():
+            setattr(backtester, name, value)
+
+def bayesian_optimization(backtester=None, n_calls=400, n_initial_points=25,
+                          results_file=RESULTS_FILE, instrument=False, schedule=None,
+                          optimize_thresholds=False, store_file=EVAL_STORE_FILE, callback=None):
+    """
+    Use Bayesian optimization to find optimal Fear & Greed multipliers
+
+    Every evaluation is written to the SQLite store_file as it happens, keyed on
+    the parameters plus a fingerprint of the data and settings. A rerun with the
+    same data resumes from the stored points (counting them towards n_calls) and
+    never re-simulates a stored point. Pass store_file=None to disable.
+
+    With optimize_thresholds=True the four category thresholds are searched
+    jointly with the multipliers (THRESHOLD_SPACE). Only the cached timeline's
+    categories are recomputed for each point, so this costs no extra data prep.
+
+    With instrument=True the backtester's per-phase timings and cache counters are
+    aggregated over every objective call, printed at the end and attached to the
+    result as result.instrumentation.
+
+    Every objective call sets the backtester's multipliers (and thresholds), so
+    a passed-in backtester gets its own settings back once the search ends.
+    """
+    
+    # Initialize backtester
+    if backtester is None:
+        backtester = create_backtester(schedule)
+    with restoring(backtester, 'INSTRUMENT', 'INVESTMENT_MULTIPLIERS', 'FEAR_GREED_THRESHOLDS'):
+        backtester.INSTRUMENT = instrument
+        return _bayesian_optimization(backtester, n_calls, n_initial_points, results_file,
+                                      optimize_thresholds, store_file, callback)
+
+def _bayesian_optimization(backtester, n_calls, n_initial_points, results_file,
+                           optimize_thresholds, store_file, callback):
+    """Run bayesian_optimization's search, changing the backtester's settings as it goes"""
+    instrumentation = backtester.instrumentation
     
     # Keep track of all evaluations for analysis
     evaluation_history = []
-    
+
+    # Resume from evaluations stored by earlier (possibly interrupted) runs
+    store, store_key = open_store(backtester, store_file, optimize_thresholds)
+    x0, y0 = [], []
+    if store is not None:
+        x0, y0 = load_stored_points(store, store_key, evaluation_history, optimize_thresholds)
+        if x0:
+            print(f"Resuming from {len(x0)} stored evaluations in {store_file}")
+
+    def record(params, objective, final_value=None, excess_return=None):
+        """Store an evaluation and return its objective value"""
+        if final_value is not None:
+            evaluation_history.append({
+                'params': params_dict(params, optimize_thresholds),
+                'portfolio_value': final_value,
+                'excess_return': excess_return
+            })
+        if store is not None:
+            store.put(store_key, params, objective, final_value, excess_return)
+        return objective
+
     def objective_function(params):
         """
         Objective function to minimize (we minimize negative portfolio value)
         
         Args:
-            params: [extreme_fear, fear, neutral, greed, extreme_greed] multipliers
+            params: [extreme_fear, fear, neutral, greed, extreme_greed] multipliers,
+                followed by the 4 category thresholds when optimize_thresholds is set
         
         Returns:
             float: Negative portfolio value (since we want to maximize portfolio value)
         """
-        ef, f, n, g, eg = params
+        ef, f, n, g, eg = params[:5]
+        evaluated_params = params_dict(params, optimize_thresholds)
         
-        print(f"[{len(evaluation_history)+1}] Evaluating: EF={ef:.2f}, F={f:.2f}, N={n:.2f}, G={g:.2f}, EG={eg:.2f}", end=" -- ")
+        print(f"[{len(evaluation_history)+1}] Evaluating: {format_params(evaluated_params)}", end=" -- ")
+
+        if store is not None:
+            stored = store.get(store_key, params)
+            if stored is not None:
+                print("Stored result")
+                instrumentation.count('eval_store_hit')
+                return stored[0]
         
         # Apply constraint: at least one multiplier should be ≤ 1.0
         if min(ef, f, n, g, eg) > 1.0:
             print("Skipped (constraint violation)")
-            return 1e6  # Large penalty for constraint violation
+            return record(params, 1e6)  # Large penalty for constraint violation
+
+        if optimize_thresholds:
+            if not thresholds_valid(evaluated_params['thresholds']):
+                print("Skipped (thresholds not increasing)")
+                return record(params, 1e6)
+            backtester.FEAR_GREED_THRESHOLDS = evaluated_params['thresholds']
         
         # Set up backtester with current parameters
         backtester.INVESTMENT_MULTIPLIERS = {
@@ -49,111 +221,465 @@ def bayesian_optimization():
         }
         
         try:
-            result = backtester.run_backtest()
+            result = backtester.run_backtest(summary_only=True)
             if result is None:
                 print("Backtest failed")
                 return 1e6
             
             # Extract results
-            (_, _, fg_portfolio_df, _, _, _, _, _, dca_total_budget, fg_total_budget) = result
-            final_value = fg_portfolio_df['portfolio_value'].iloc[-1]
+            dca_total_budget = result.dca_total_budget_received
+            fg_total_budget = result.fg_total_budget_received
+            final_value = result.fg_final_value
             
             # Calculate excess return vs DCA
-            dca_final_value = result[0]['portfolio_value'].iloc[-1]
+            dca_final_value = result.dca_final_value
             fg_return_pct = ((final_value - fg_total_budget) / fg_total_budget) * 100 if fg_total_budget > 0 else 0
             dca_return_pct = ((dca_final_value - dca_total_budget) / dca_total_budget) * 100 if dca_total_budget > 0 else 0
             excess_return = fg_return_pct - dca_return_pct
             
             print(f"Portfolio Value: ${final_value:.2f}, Excess Return: {excess_return:.2f}%")
             
-            # Store evaluation for analysis
-            evaluation_history.append({
-                'params': {'EF': ef, 'F': f, 'N': n, 'G': g, 'EG': eg},
-                'portfolio_value': final_value,
-                'excess_return': excess_return
-            })
-            
-            # Return negative value since we're minimizing
-            return -final_value
+            # Store evaluation for analysis (return negative value since we're minimizing)
+            return record(params, -final_value, final_value, excess_return)
             
         except Exception as e:
             print(f"Error: {e}")
             return 1e6
     
-    # Define search space - now includes neutral as a parameter
-    # Each parameter can range from 0.0 to 2.0
-    search_space = [
-        Real(0.0, 2.0, name='extreme_fear'),  # Extreme Fear multiplier
-        Real(0.0, 2.0, name='fear'),          # Fear multiplier
-        Real(0.0, 2.0, name='neutral'),       # Neutral multiplier (now optimized)
-        Real(0.0, 2.0, name='greed'),         # Greed multiplier
-        Real(0.0, 2.0, name='extreme_greed')  # Extreme Greed multiplier
-    ]
-    
     print("Starting Bayesian Optimization...")
     print("Optimizing all 5 sentiment multipliers (including Neutral)!")
+    if optimize_thresholds:
+        print("Optimizing the 4 category thresholds jointly with the multipliers.")
     print("This will intelligently sample ~200 parameter combinations.")
     print("-" * 80)
     
-    # Run Bayesian optimization
-    result = gp_minimize(
-        func=objective_function,           # Function to minimize
-        dimensions=search_space,           # Parameter bounds
-        n_calls=400,                      # Number of evaluations
-        n_initial_points=25,              # Random exploration points to start
-        acq_func='EI',                    # Expected Improvement acquisition
-        random_state=42,                  # For reproducibility
-        verbose=False                      # Show progress
-    )
+    n_remaining = n_calls - len(x0)
+    if n_remaining > 0:
+        # Run Bayesian optimization (stored points seed the model and count as initial points)
+        result = gp_minimize(
+            func=objective_function,           # Function to minimize
+            dimensions=search_space(optimize_thresholds),  # Parameter bounds
+            n_calls=n_remaining,              # Number of evaluations
+            n_initial_points=max(n_initial_points - len(x0), 0),  # Random exploration points to start
+            x0=x0 or None,                    # Points from the evaluation store
+            y0=y0 or None,
+            acq_func='EI',                    # Expected Improvement acquisition
+            random_state=42,                  # For reproducibility
+            verbose=False,                     # Show progress
+            callback=callback                  # Called with the partial result after every call
+        )
+    else:
+        print(f"All {n_calls} evaluations already stored")
+        result = create_result(x0, y0, space=Space(search_space(optimize_thresholds)))
+    if store is not None:
+        store.close()
+    
+    report_results(result, evaluation_history, results_file=results_file)
+    report_instrumentation(result, backtester)
     
+    return result, evaluation_history
+
+def report_instrumentation(result, backtester):
+    """Print the aggregated timings and attach them to the optimization result"""
+    if not backtester.INSTRUMENT:
+        return
+    backtester.instrumentation.print_report()
+    result.instrumentation = backtester.instrumentation.snapshot()
+
+def report_results(result, evaluation_history, results_file=RESULTS_FILE, objective='final_value'):
+    """Print the best parameters and top 10 results, and save them to results_file (if given)"""
     # Extract best results
     best_params = result.x
     best_value = -result.fun  # Convert back from negative
+    if objective == 'final_value':
+        best_label = f"Best Portfolio Value: ${best_value:.2f}"
+        rank = lambda x: x['portfolio_value']
+    else:
+        best_label = f"Best {objective.capitalize()}: {best_value:.4f}"
+        rank = lambda x: x['score']
     
     print("\n" + "="*80)
     print("OPTIMIZATION COMPLETE!")
     print("="*80)
-    print(f"Best Portfolio Value: ${best_value:.2f}")
+    print(best_label)
     print(f"Best Parameters:")
     print(f"  Extreme Fear: {best_params[0]:.2f}")
     print(f"  Fear:         {best_params[1]:.2f}")
     print(f"  Neutral:      {best_params[2]:.2f}")
     print(f"  Greed:        {best_params[3]:.2f}")
     print(f"  Extreme Greed: {best_params[4]:.2f}")
+    if len(best_params) > 5:
+        print(f"  Thresholds:   {'/'.join(str(int(t)) for t in best_params[5:])}")
     
     # Find best result in history for excess return info
-    best_eval = max(evaluation_history, key=lambda x: x['portfolio_value'])
+    best_eval = max(evaluation_history, key=rank)
     print(f"Excess Return vs DCA: {best_eval['excess_return']:.2f}%")
     
     # Show top 10 results
     print("\nTop 10 Results:")
     print("-" * 60)
-    sorted_history = sorted(evaluation_history, key=lambda x: x['portfolio_value'], reverse=True)
+    sorted_history = sorted(evaluation_history, key=rank, reverse=True)
     for i, eval_result in enumerate(sorted_history[:10], 1):
-        p = eval_result['params']
-        print(f"{i:2d}.) EF={p['EF']:.2f}, F={p['F']:.2f}, N={p['N']:.2f}, G={p['G']:.2f}, EG={p['EG']:.2f} "
-              f": ${eval_result['portfolio_value']:.2f} (Excess: {eval_result['excess_return']:.2f}%)")
+        score = '' if objective == 'final_value' else f", {objective}: {eval_result['score']:.4f}"
+        print(f"{i:2d}.) {format_params(eval_result['params'])} "
+              f": ${eval_result['portfolio_value']:.2f} (Excess: {eval_result['excess_return']:.2f}%{score})")
     
     # Save results
-    with open("bayesian_optimization_results.txt", "w") as f:
+    if not results_file:
+        return
+    with open(results_file, "w") as f:
         f.write("Bayesian Optimization Results (with Neutral parameter)\n")
         f.write("="*60 + "\n")
-        f.write(f"Best Portfolio Value: ${best_value:.2f}\n")
-        f.write(f"Best Parameters: EF={best_params[0]:.2f}, F={best_params[1]:.2f}, N={best_params[2]:.2f}, G={best_params[3]:.2f}, EG={best_params[4]:.2f}\n")
+        f.write(f"{best_label}\n")
+        f.write(f"Best Parameters: EF={best_params[0]:.2f}, F={best_params[1]:.2f}, N={best_params[2]:.2f}, G={best_params[3]:.2f}, EG={best_params[4]:.2f}")
+        if len(best_params) > 5:
+            f.write(f", thresholds={'/'.join(str(int(t)) for t in best_params[5:])}")
+        f.write("\n")
         f.write(f"Total Evaluations: {len(evaluation_history)}\n\n")
         f.write("Top 10 Results:\n")
         for i, eval_result in enumerate(sorted_history[:10], 1):
-            p = eval_result['params']
-            f.write(f"{i:2d}.) EF={p['EF']:.2f}, F={p['F']:.2f}, N={p['N']:.2f}, G={p['G']:.2f}, EG={p['EG']:.2f} "
-                   f": ${eval_result['portfolio_value']:.2f} (Excess: {eval_result['excess_return']:.2f}%)\n")
-    
+            score = '' if objective == 'final_value' else f", {objective}: {eval_result['score']:.4f}"
+            f.write(f"{i:2d}.) {format_params(eval_result['params'])} "
+                   f": ${eval_result['portfolio_value']:.2f} (Excess: {eval_result['excess_return']:.2f}%{score})\n")
+
+def parallel_bayesian_optimization(n_workers=None, points_per_round=8, n_calls=400,
+                                   n_initial_points=25, random_state=42, backtester=None,
+                                   results_file=RESULTS_FILE, instrument=False, schedule=None,
+                                   optimize_thresholds=False, store_file=EVAL_STORE_FILE, objective='final_value'):
+    """
+    Bayesian optimization that evaluates a batch of points per round across a process pool
+
+    Uses skopt's ask/tell interface: each round asks for points_per_round points,
+    evaluates them on workers that share the timeline arrays through shared memory,
+    and tells the results back. Results are deterministic for a fixed random_state
+    regardless of the worker count. With optimize_thresholds=True workers re-bucket
+    the shared fear/greed values for every point's thresholds. Evaluations are
+    stored and resumed from store_file like in bayesian_optimization.
+
+    objective picks what is maximized, one of metrics.OBJECTIVES: the final
+    portfolio value, or a risk-adjusted score computed by the workers from
+    each run's weekly values.
+    """
+    if backtester is None:
+        backtester = create_backtester(schedule)
+    with restoring(backtester, 'INSTRUMENT'):
+        backtester.INSTRUMENT = instrument
+        return _parallel_bayesian_optimization(backtester, n_workers, points_per_round, n_calls, n_initial_points,
+                                               random_state, results_file, optimize_thresholds, store_file,
+                                               objective)
+
+def _parallel_bayesian_optimization(backtester, n_workers, points_per_round, n_calls, n_initial_points,
+                                    random_state, results_file, optimize_thresholds, store_file, objective):
+    """Run parallel_bayesian_optimization's rounds on a backtester with instrumentation already set"""
+    instrumentation = backtester.instrumentation
+    timeline = backtester.get_timeline()
+    if timeline is None:
+        print("Failed to prepare backtest data")
+        return None, []
+
+    settings = backtester.simulation_settings()
+
+    optimizer = Optimizer(
+        dimensions=search_space(optimize_thresholds),
+        base_estimator='GP',
+        n_initial_points=n_initial_points,
+        acq_func='EI',
+        random_state=random_state
+    )
+
+    evaluation_history = []
+
+    print("Starting Parallel Bayesian Optimization...")
+    print(f"{n_calls} evaluations, {points_per_round} points per round")
+    print("-" * 80)
+
+    n_evaluated = 0
+    result = None
+    store, store_key = open_store(backtester, store_file, optimize_thresholds, objective)
+    if store is not None:
+        x0, y0 = load_stored_points(store, store_key, evaluation_history, optimize_thresholds, objective)
+        if x0:
+            print(f"Resuming from {len(x0)} stored evaluations in {store_file}")
+            result = optimizer.tell(x0, y0)
+            n_evaluated = len(x0)
+
+    with SharedTimelinePool(timeline, settings, n_workers=n_workers) as pool:
+        print(f"Using {pool.n_workers} worker processes")
+        while n_evaluated < n_calls:
+            n_points = min(points_per_round, n_calls - n_evaluated)
+            with instrumentation.phase('ask'):
+                points = optimizer.ask(n_points=n_points)
+            # Points already in the store are not sent to the workers again
+            objective_values = [None] * n_points
+            if store is not None:
+                for i, params in enumerate(points):
+                    stored = store.get(store_key, params)
+                    if stored is not None:
+                        instrumentation.count('eval_store_hit')
+                        objective_values[i] = stored[0]
+            pending = [i for i, value in enumerate(objective_values) if value is None]
+
+            if pending:
+                with instrumentation.phase('evaluate'):
+                    pending_points = [points[i] for i in pending]
+                    point_array = np.asarray(pending_points, dtype=float)
+                    thresholds = None
+                    if optimize_thresholds:
+                        # Invalid threshold sets are penalized below, evaluate them with the defaults
+                        thresholds = np.array([p[5:] if thresholds_valid(p[5:]) else backtester.FEAR_GREED_THRESHOLDS
+                                               for p in pending_points], dtype=float)
+                    final_values, excess_returns, scores = pool.evaluate(point_array[:, :5], thresholds, objective)
+            else:
+                final_values = excess_returns = scores = []
+
+            for i, final_value, excess_return, score in zip(pending, final_values, excess_returns, scores):
+                params = points[i]
+                # Apply constraint: at least one multiplier should be ≤ 1.0
+                if min(params[:5]) > 1.0 or (optimize_thresholds and not thresholds_valid(params[5:])):
+                    objective_values[i] = 1e6
+                    if store is not None:
+                        store.put(store_key, params, 1e6)
+                    continue
+                objective_values[i] = -float(score)
+                evaluation_history.append({
+                    'params': params_dict(params, optimize_thresholds),
+                    'portfolio_value': float(final_value),
+                    'excess_return': float(excess_return)
+                })
+                if objective != 'final_value':
+                    evaluation_history[-1]['score'] = float(score)
+                if store is not None:
+                    store.put(store_key, params, -float(score), final_value, excess_return)
+
+            with instrumentation.phase('tell'):
+                result = optimizer.tell(points, objective_values)
+            n_evaluated += n_points
+            if objective == 'final_value':
+                print(f"[{n_evaluated}/{n_calls}] Best Portfolio Value: ${-result.fun:.2f}")
+            else:
+                print(f"[{n_evaluated}/{n_calls}] Best {objective.capitalize()}: {-result.fun:.4f}")
+
+    if store is not None:
+        store.close()
+    if result is None:
+        print("No evaluations requested and none stored")
+        return None, evaluation_history
+    report_results(result, evaluation_history, results_file=results_file, objective=objective)
+    report_instrumentation(result, backtester)
+
     return result, evaluation_history
 
-if __name__ == "__main__":
+def fidelity_weeks(total_weeks, fraction, fidelity='truncate'):
+    """
+    Week indices of a reduced-fidelity backtest
+
+    'truncate' keeps the first fraction of the timeline (the full backtest's
+    state at that point is exactly the truncated run's final state), while
+    'subsample' keeps every 1/fraction-th week over the whole period.
+    """
+    if fraction >= 1:
+        return np.arange(total_weeks)
+    if fidelity == 'truncate':
+        return np.arange(max(1, int(round(total_weeks * fraction))))
+    if fidelity == 'subsample':
+        return np.arange(0, total_weeks, max(1, int(round(1 / fraction))))
+    raise ValueError(f"Unknown fidelity '{fidelity}', expected 'truncate' or 'subsample'")
+
+def successive_halving_optimization(backtester=None, n_candidates=729, eta=3, n_rungs=4,
+                                    fidelity='truncate', min_weeks=52, random_state=42, results_file=RESULTS_FILE,
+                                    schedule=None, optimize_thresholds=False, compare_calls=0, objective='final_value',
+                                    instrument=False, store_file=EVAL_STORE_FILE):
+    """
+    Multi-fidelity search: score many candidates on short backtests, promote the best to longer ones
+
+    Random candidates from the search space are scored with the batch kernel on
+    1/eta^(n_rungs-1) of the timeline, the top 1/eta move on to a timeline eta
+    times longer, and so on until the survivors are scored on the full backtest.
+    No rung is shorter than min_weeks, since very short backtests rank poorly.
+
+    Compute is counted in week-evaluations (one candidate simulated for one
+    week). With compare_calls > 0 a plain gp_minimize run of that many calls
+    is made for reference, and the report shows how many of its calls it took
+    to match the successive halving result. gp_minimize only maximizes the final
+    value, so the comparison is skipped for other objectives.
+
+    With a risk-adjusted objective (see metrics.OBJECTIVES) every rung records
+    the weekly values and ranks candidates on that score instead of the final
+    portfolio value.
+
+    The last rung scores the survivors on the full backtest, and those scores
+    are written to store_file like any other evaluation, so a later Bayesian
+    run on the same data resumes from them. With instrument=True the timings
+    of each rung are reported at the end as in bayesian_optimization.
+    """
+    if backtester is None:
+        backtester = create_backtester(schedule)
+    with restoring(backtester, 'INSTRUMENT'):
+        backtester.INSTRUMENT = instrument
+        return _successive_halving_optimization(backtester, n_candidates, eta, n_rungs, fidelity, min_weeks,
+                                                random_state, results_file, optimize_thresholds, compare_calls,
+                                                objective, store_file)
+
+def _successive_halving_optimization(backtester, n_candidates, eta, n_rungs, fidelity, min_weeks, random_state,
+                                     results_file, optimize_thresholds, compare_calls, objective, store_file):
+    """Run successive_halving_optimization's rungs on a backtester with instrumentation already set"""
+    instrumentation = backtester.instrumentation
+    timeline = backtester.get_timeline()
+    if timeline is None:
+        print("Failed to prepare backtest data")
+        return None, []
+
+    settings = backtester.simulation_settings()
+    total_weeks = len(timeline)
+
+    # Candidates that break the constraints are dropped before spending any compute on them
+    space = Space(search_space(optimize_thresholds))
+    points = np.array(space.rvs(n_candidates, random_state=random_state), dtype=float)
+    valid = points[:, :5].min(axis=1) <= 1.0
+    if optimize_thresholds:
+        valid &= np.all(np.diff(points[:, 5:], axis=1) > 0, axis=1)
+    points = points[valid]
+    category_codes = timeline.buckets.codes_batch(points[:, 5:]) if optimize_thresholds else timeline.category_codes
+
+    print("Starting Successive Halving Optimization...")
+    print(f"{len(points)} candidates, eta={eta}, {n_rungs} rungs, '{fidelity}' fidelity")
+    print("-" * 80)
+
+    start_time = time.perf_counter()
+    alive = np.arange(len(points))
+    week_evaluations = 0
+    for rung in range(n_rungs):
+        fraction = max(float(eta) ** (rung - n_rungs + 1), min_weeks / total_weeks)
+        weeks = fidelity_weeks(total_weeks, fraction, fidelity)
+        codes = category_codes[weeks][:, alive] if category_codes.ndim == 2 else category_codes[weeks]
+        # Subsampled weeks stand for the whole time since the previous kept week
+        periods = purchase_periods(timeline.dates[weeks])
+        with instrumentation.phase(f'rung_{rung + 1}'):
+            batch = simulate_batch(timeline.prices[weeks], codes, points[alive, :5],
+                                   record_values=objective != 'final_value', period_weeks=periods, **settings)
+            scores = batch.fg_final_value
+            if objective != 'final_value':
+                scores = objective_scores(batch.fg_values, timeline.dates[weeks], settings['weekly_budget'] * periods,
+                                          objective, initial_cash=settings['initial_cash'])
+        week_evaluations += len(alive) * len(weeks)
+        print(f"Rung {rung + 1}: {len(alive):4d} candidates x {len(weeks):4d} weeks, "
+              f"best ${batch.fg_final_value.max():,.2f}"
+              + ('' if objective == 'final_value' else f", best {objective} {scores.max():.4f}"))
+
+        if rung < n_rungs - 1:
+            keep = max(1, len(alive) // eta)
+            alive = alive[np.argsort(-scores, kind='stable')[:keep]]
+    elapsed = time.perf_counter() - start_time
+
+    evaluation_history = [{
+        'params': params_dict(points[i], optimize_thresholds),
+        'portfolio_value': float(final_value),
+        'excess_return': float(excess_return)
+    } for i, final_value, excess_return in zip(alive, batch.fg_final_value, batch.excess_return)]
+    if objective != 'final_value':
+        for entry, score in zip(evaluation_history, scores):
+            entry['score'] = float(score)
+    result = create_result(points[alive].tolist(), (-scores).tolist(), space=space)
+    report_results(result, evaluation_history, results_file=results_file, objective=objective)
+
+    # Only the last rung ran the full backtest, so only its scores are comparable with other runs
+    store, store_key = open_store(backtester, store_file, optimize_thresholds, objective)
+    if store is not None:
+        for i, final_value, excess_return, score in zip(alive, batch.fg_final_value, batch.excess_return, scores):
+            store.put(store_key, points[i], -float(score), final_value, excess_return)
+        store.close()
+        print(f"Stored {len(alive)} full-backtest evaluations in {store_file}")
+
+    full_cost = len(points) * total_weeks
+    print(f"\nSuccessive halving: {week_evaluations:,} week-evaluations in {elapsed:.2f}s "
+          f"({week_evaluations / full_cost * 100:.1f}% of scoring every candidate on the full backtest)")
+
+    if compare_calls > 0 and objective != 'final_value':
+        print(f"Skipping the gp_minimize comparison: it only supports the final_value objective, not {objective}")
+    elif compare_calls > 0:
+        # Plain gp_minimize for reference, on the same data and settings
+        call_times = []
+        start_time = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            gp_result, _ = bayesian_optimization(backtester=backtester, n_calls=compare_calls,
+                                                 n_initial_points=min(25, compare_calls), results_file=None,
+                                                 optimize_thresholds=optimize_thresholds, store_file=None,
+                                                 callback=lambda res: call_times.append(time.perf_counter()))
+        best_so_far = np.minimum.accumulate(gp_result.func_vals)
+        matched = np.nonzero(best_so_far <= result.fun)[0]
+        print(f"gp_minimize ({compare_calls} calls): best ${-gp_result.fun:,.2f}, "
+              f"{compare_calls * total_weeks:,} week-evaluations in {call_times[-1] - start_time:.2f}s")
+        if len(matched) > 0:
+            calls = matched[0] + 1
+            gp_cost = calls * total_weeks
+            gp_elapsed = call_times[matched[0]] - start_time
+            print(f"gp_minimize needed {calls} calls ({gp_cost:,} week-evaluations, {gp_elapsed:.2f}s) to match; "
+                  f"successive halving used {week_evaluations / gp_cost * 100:.1f}% of the simulated weeks "
+                  f"and {elapsed / gp_elapsed * 100:.1f}% of the time")
+        else:
+            print(f"gp_minimize never matched the successive halving result within {compare_calls} calls")
+
+    result.week_evaluations = week_evaluations
+    report_instrumentation(result, backtester)
+    return result, evaluation_history
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Find optimal Fear & Greed multipliers")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Evaluate points in parallel with this many processes (0 = serial gp_minimize)")
+    parser.add_argument('--points-per-round', type=int, default=8,
+                        help="Points proposed per round in parallel mode")
+    parser.add_argument('--schedule', default=None,
+                        help="Purchase schedule, e.g. 'weekly:1', 'biweekly:1', 'daily', 'business_days:5', "
+                             "'monthly:15', 'month_end' (default: weekly on PURCHASE_DAY)")
+    parser.add_argument('--halving', action='store_true',
+                        help="Multi-fidelity successive halving instead of Bayesian optimization")
+    parser.add_argument('--candidates', type=int, default=729,
+                        help="Random candidates in the first successive halving rung")
+    parser.add_argument('--eta', type=int, default=3,
+                        help="Successive halving keeps the top 1/eta and lengthens the backtest eta times per rung")
+    parser.add_argument('--fidelity', choices=('truncate', 'subsample'), default='truncate',
+                        help="How successive halving shortens the backtest in early rungs")
+    parser.add_argument('--compare-calls', type=int, default=0,
+                        help="Also run gp_minimize with this many calls and compare compute at equal quality")
+    parser.add_argument('--thresholds', action='store_true',
+                        help="Also optimize the fear/greed category thresholds")
+    parser.add_argument('--store', default=EVAL_STORE_FILE,
+                        help="SQLite file recording every evaluation, used to resume interrupted runs")
+    parser.add_argument('--no-store', action='store_true',
+                        help="Don't record or resume from stored evaluations")
+    parser.add_argument('--instrument', action='store_true',
+                        help="Print per-phase timings and cache hit/miss counters at the end")
+    parser.add_argument('--objective', choices=OBJECTIVES, default='final_value',
+                        help="What to maximize; risk-adjusted objectives need --workers or --halving")
+    args = parser.parse_args(argv)
+    store_file = None if args.no_store else args.store
+    if args.objective != 'final_value' and not args.halving and args.workers <= 0:
+        parser.error("--objective other than final_value needs --workers or --halving")
+    if args.compare_calls > 0 and args.objective != 'final_value':
+        parser.error("--compare-calls only supports --objective final_value")
+
     # Run the optimization
-    optimization_result, history = bayesian_optimization()
-    
-    print(f"\nEfficiency Gain:")
-    print(f"Full Grid Search: Would be 3,200,000+ evaluations (2.0^5 with 0.01 steps)")  
-    print(f"Bayesian Opt: {len(history)} evaluations")
-    print(f"Speedup: ~{3200000 // len(history)}x faster!")
\ No newline at end of file
+    if args.halving:
+        successive_halving_optimization(
+            n_candidates=args.candidates, eta=args.eta, fidelity=args.fidelity, schedule=args.schedule,
+            optimize_thresholds=args.thresholds, compare_calls=args.compare_calls, objective=args.objective,
+            instrument=args.instrument, store_file=store_file)
+    else:
+        if args.workers > 0:
+            optimization_result, history = parallel_bayesian_optimization(
+                n_workers=args.workers, points_per_round=args.points_per_round, instrument=args.instrument,
+                schedule=args.schedule, optimize_thresholds=args.thresholds, store_file=store_file,
+                objective=args.objective)
+        else:
+            optimization_result, history = bayesian_optimization(instrument=args.instrument, schedule=args.schedule,
+                                                                 optimize_thresholds=args.thresholds,
+                                                                 store_file=store_file)
+
+        print(f"\nEfficiency Gain:")
+        print(f"Full Grid Search: Would be 3,200,000+ evaluations (2.0^5 with 0.01 steps)")
+        print(f"Bayesian Opt: {len(history)} evaluations")
+        print(f"Speedup: ~{3200000 // len(history)}x faster!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import time
+from collections import Counter, defaultdict
+
+
+class _PhaseTimer:
+    """Context manager that adds its wall time to one phase"""
+
+    __slots__ = ('_instrumentation', '_name', '_start')
+
+    def __init__(self, instrumentation, name):
+        self._instrumentation = instrumentation
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        instrumentation = self._instrumentation
+        instrumentation.timings[self._name] += time.perf_counter() - self._start
+        instrumentation.calls[self._name] += 1
+        return False
+
+
+class _NullPhase:
+    """Does nothing, returned for every phase when instrumentation is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class Instrumentation:
+    """
+    Wall time and call counts per phase, plus named counters (e.g. cache hits/misses)
+
+    Usage:
+        with instrumentation.phase('alignment'):
+            ...
+        instrumentation.count('timeline_cache_hit')
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.timings = defaultdict(float)
+        self.calls = Counter()
+        self.counters = Counter()
+
+    def phase(self, name):
+        return _PhaseTimer(self, name)
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def reset(self):
+        self.timings.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def merge(self, other):
+        """Add another Instrumentation's (or snapshot's) numbers to this one"""
+        if isinstance(other, Instrumentation):
+            other = other.snapshot()
+        for name, seconds in other['timings'].items():
+            self.timings[name] += seconds
+        self.calls.update(other['calls'])
+        self.counters.update(other['counters'])
+
+    def snapshot(self):
+        """Plain-dict copy of the current numbers"""
+        return {
+            'timings': dict(self.timings),
+            'calls': dict(self.calls),
+            'counters': dict(self.counters),
+        }
+
+    def print_report(self):
+        """Print time per phase (slowest first) and all counters"""
+        total = sum(self.timings.values())
+        print("\nPhase                     Calls     Total (s)   Per call (ms)   Share")
+        print("-" * 72)
+        for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            calls = self.calls[name]
+            share = seconds / total * 100 if total > 0 else 0
+            print(f"{name:24} {calls:7d} {seconds:12.4f} {seconds / max(calls, 1) * 1000:15.4f} {share:6.1f}%")
+        if self.counters:
+            print("\nCounters:")
+            for name, value in sorted(self.counters.items()):
+                print(f"  {name:30}: {value}")
+
+
+class NullInstrumentation:
+    """Drop-in replacement for Instrumentation that records nothing"""
+
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def count(self, name, amount=1):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
@@ -0,0 +1,279 @@
+import json
+import os
+from datetime import date as _date
+from typing import NamedTuple
+from simulation import BacktestSummary
+from timeline import CATEGORIES, FEAR_GREED_THRESHOLDS
+
+STATE_VERSION = 1
+
+# Running totals that make up the simulator state, in serialization order
+STATE_FIELDS = ('last_date', 'total_weeks',
+                'dca_cash', 'dca_shares', 'dca_value', 'dca_total_budget_received',
+                'dca_total_invested', 'dca_purchases',
+                'fg_cash_buffer', 'fg_shares', 'fg_value', 'fg_total_budget_received',
+                'fg_total_invested', 'fg_purchases',
+                'cash_min', 'cash_max', 'cash_sum')
+
+
+def _day(date):
+    """ISO 'YYYY-MM-DD' for a date string, datetime, Timestamp or datetime64"""
+    return str(date)[:10]
+
+
+def _days_between(earlier, later):
+    return (_date.fromisoformat(later) - _date.fromisoformat(earlier)).days
+
+
+class Decision(NamedTuple):
+    """What the fear/greed strategy buys on the next purchase date"""
+    fear_greed_value: float
+    category: str
+    multiplier: float
+    desired_investment: float
+    investment: float
+    cash_buffer: float  # Cash buffer after this week's budget, before investing
+
+
+class LiveEvent(NamedTuple):
+    """Outcome of one purchase date applied to the live state"""
+    date: str
+    fear_greed_value: float
+    category: str
+    price: float
+    multiplier: float
+    desired_investment: float
+    investment: float
+    fg_cash_buffer: float
+    fg_value: float
+    dca_value: float
+
+
+class LiveSimulator:
+    """
+    Resumable DCA and fear/greed cash buffer state, updated one purchase date at a time
+
+    Applies exactly the rules of run_backtest, but keeps only running totals,
+    so every new (date, fear_greed_value, price) event costs the same no matter
+    how long the history is. The state serializes to a small JSON file and a
+    restored simulator carries on where the saved one stopped. schedule and
+    start_date only record how the state was built (the budget of every event
+    follows from its date), so a restored state shows what it was built with.
+
+    Usage:
+        sim = LiveSimulator.from_backtester(backtester)
+        sim.catch_up(backtester.get_timeline())
+        sim.save('live_state.json')
+        ...
+        sim = LiveSimulator.load('live_state.json')
+        sim.update('2025-08-05', 63.0, 632.10)
+    """
+
+    def __init__(self, weekly_budget, multipliers, thresholds=FEAR_GREED_THRESHOLDS, initial_cash=0.0,
+                 transaction_fee=0.0, expense_ratio=0.0, schedule=None, start_date=None):
+        self.weekly_budget = float(weekly_budget)
+        self.multipliers = {category: float(multipliers[category]) for category in CATEGORIES}
+        self.thresholds = tuple(float(t) for t in thresholds)
+        self.initial_cash = float(initial_cash)
+        self.transaction_fee = float(transaction_fee)
+        self.expense_ratio = float(expense_ratio)
+        self.schedule = schedule
+        self.start_date = None if start_date is None else _day(start_date)
+        self.reset()
+
+    @classmethod
+    def from_backtester(cls, backtester):
+        """Simulator with a FearGreedBacktester's budget, multipliers, thresholds, fees and schedule"""
+        return cls(multipliers=backtester.INVESTMENT_MULTIPLIERS, thresholds=backtester.FEAR_GREED_THRESHOLDS,
+                   schedule=backtester.get_purchase_schedule().spec, start_date=backtester.START_DATE,
+                   **backtester.simulation_settings())
+
+    def reset(self):
+        """Back to the state before the first purchase date"""
+        self.last_date = None
+        self.total_weeks = 0
+        self.dca_cash = self.initial_cash
+        self.dca_shares = 0.0
+        self.dca_value = self.initial_cash
+        self.dca_total_budget_received = 0.0
+        self.dca_total_invested = 0.0
+        self.dca_purchases = 0
+        self.fg_cash_buffer = self.initial_cash
+        self.fg_shares = 0.0
+        self.fg_value = self.initial_cash
+        self.fg_total_budget_received = 0.0
+        self.fg_total_invested = 0.0
+        self.fg_purchases = 0
+        self.cash_min = float('inf')
+        self.cash_max = float('-inf')
+        self.cash_sum = 0.0
+
+    def classify(self, fear_greed_value):
+        """Category for a fear/greed value under this simulator's thresholds"""
+        for category, upper_bound in zip(CATEGORIES, self.thresholds):
+            if fear_greed_value <= upper_bound:
+                return category
+        return CATEGORIES[-1]
+
+    def period_weeks(self, date=None):
+        """
+        Weeks of budget a purchase on date receives (see MarketTimeline.period_weeks)
+
+        That is the time since the last applied date. The first purchase date, or
+        one with no date or not after the last applied one, counts as one week.
+        """
+        if date is None or self.last_date is None:
+            return 1.0
+        days = _days_between(self.last_date, _day(date))
+        return days / 7 if days > 0 else 1.0
+
+    def decide(self, fear_greed_value, date=None):
+        """The fear/greed strategy's purchase on date (default: one week's budget), without changing the state"""
+        category = self.classify(fear_greed_value)
+        multiplier = self.multipliers[category]
+        budget = self.weekly_budget * self.period_weeks(date)
+        cash_buffer = self.fg_cash_buffer + budget
+        desired_investment = budget * multiplier
+        investment = min(desired_investment, cash_buffer)
+        if investment <= self.transaction_fee:
+            investment = 0.0
+        return Decision(float(fear_greed_value), category, multiplier, desired_investment, investment, cash_buffer)
+
+    def update(self, date, fear_greed_value, price):
+        """
+        Apply one purchase date
+
+        Events dated on or before the last applied one are ignored, so replaying
+        an overlapping batch after a restore is safe.
+
+        Returns:
+            LiveEvent, or None if the event was already applied
+        """
+        date = _day(date)
+        if self.last_date is not None and date <= self.last_date:
+            return None
+
+        price = float(price)
+        period = self.period_weeks(date)
+        budget = self.weekly_budget * period
+        fee = self.transaction_fee
+        decision = self.decide(fear_greed_value, date)
+        self.last_date = date
+        self.total_weeks += 1
+        self.dca_total_budget_received += budget
+        self.fg_total_budget_received += budget
+
+        # === STRATEGY 1: CONSISTENT DCA ===
+        self.dca_cash += budget
+        if self.dca_cash >= budget + fee:
+            self.dca_shares = self.dca_shares + (budget - fee) / price
+            self.dca_cash = self.dca_cash - budget
+            self.dca_total_invested += budget
+            self.dca_purchases += 1
+
+        self.dca_value = self.dca_cash + (self.dca_shares * price)
+        if self.dca_shares > 0:
+            expense = (self.dca_shares * price * self.expense_ratio) / 365 * period
+            self.dca_value = self.dca_value - expense
+            self.dca_shares = self.dca_shares - (expense / price)
+
+        # === STRATEGY 2: FEAR/GREED WITH CASH BUFFER ===
+        self.fg_cash_buffer += budget
+        if decision.investment > 0:
+            self.fg_shares += (decision.investment - fee) / price
+            self.fg_cash_buffer -= decision.investment
+            self.fg_total_invested += decision.investment
+            self.fg_purchases += 1
+
+        self.fg_value = self.fg_cash_buffer + (self.fg_shares * price)
+        if self.fg_shares > 0:
+            expense = (self.fg_shares * price * self.expense_ratio) / 365 * period
+            self.fg_value = self.fg_value - expense
+            self.fg_shares = self.fg_shares - (expense / price)
+
+        # Track cash buffer statistics
+        if self.fg_cash_buffer < self.cash_min:
+            self.cash_min = self.fg_cash_buffer
+        if self.fg_cash_buffer > self.cash_max:
+            self.cash_max = self.fg_cash_buffer
+        self.cash_sum += self.fg_cash_buffer
+
+        return LiveEvent(date, decision.fear_greed_value, decision.category, price, decision.multiplier,
+                         decision.desired_investment, decision.investment, self.fg_cash_buffer,
+                         self.fg_value, self.dca_value)
+
+    def update_many(self, events):
+        """Apply (date, fear_greed_value, price) events in order, returning the LiveEvents applied"""
+        applied = (self.update(date, value, price) for date, value, price in events)
+        return [event for event in applied if event is not None]
+
+    def catch_up(self, timeline):
+        """Apply every purchase date of a MarketTimeline after the last applied one"""
+        dates = timeline.dates.astype('datetime64[D]').astype(str)
+        first = 0
+        if self.last_date is not None:
+            first = int(dates.searchsorted(self.last_date, side='right'))
+        return self.update_many(zip(dates[first:].tolist(), timeline.fear_greed_values[first:].tolist(),
+                                    timeline.prices[first:].tolist()))
+
+    def values_at(self, price):
+        """(DCA value, fear/greed value) marked to a new price without applying a purchase"""
+        return (self.dca_cash + self.dca_shares * price,
+                self.fg_cash_buffer + self.fg_shares * price)
+
+    def summary(self):
+        """BacktestSummary of everything applied so far (matches run_backtest(summary_only=True))"""
+        return BacktestSummary(
+            total_weeks=self.total_weeks,
+            initial_cash=self.initial_cash,
+            dca_total_budget_received=self.dca_total_budget_received,
+            fg_total_budget_received=self.fg_total_budget_received,
+            dca_final_value=self.dca_value,
+            fg_final_value=self.fg_value,
+            dca_final_cash=self.dca_cash,
+            fg_final_cash=self.fg_cash_buffer,
+            dca_total_invested=self.dca_total_invested,
+            fg_total_invested=self.fg_total_invested,
+            dca_purchases=self.dca_purchases,
+            fg_purchases=self.fg_purchases,
+            cash_min=self.cash_min,
+            cash_max=self.cash_max,
+            cash_mean=self.cash_sum / max(self.total_weeks, 1),
+        )
+
+    def to_dict(self):
+        return {
+            'version': STATE_VERSION,
+            'settings': {
+                'weekly_budget': self.weekly_budget,
+                'multipliers': self.multipliers,
+                'thresholds': list(self.thresholds),
+                'initial_cash': self.initial_cash,
+                'transaction_fee': self.transaction_fee,
+                'expense_ratio': self.expense_ratio,
+                'schedule': self.schedule,
+                'start_date': self.start_date,
+            },
+            'state': [getattr(self, name) for name in STATE_FIELDS],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported live state version {data.get('version')}")
+        simulator = cls(**data['settings'])
+        for name, value in zip(STATE_FIELDS, data['state']):
+            setattr(simulator, name, value)
+        return simulator
+
+    def save(self, path):
+        """Write the state as JSON (atomically, so a crash never leaves a partial file)"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
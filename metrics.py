@@ -0,0 +1,166 @@
+import numpy as np
+from typing import NamedTuple
+
+DAYS_PER_YEAR = 365.25
+
+# Objectives the optimizers can maximize, see objective_scores
+OBJECTIVES = ('final_value', 'sharpe', 'sortino', 'calmar', 'xirr')
+
+# Score of a run an objective can't be computed for, same size as the optimizer's constraint penalty
+OBJECTIVE_PENALTY = 1e6
+
+
+class RiskMetrics(NamedTuple):
+    """Risk and return metrics, one entry per run (floats for a single run)"""
+    total_return_pct: np.ndarray
+    twr_pct: np.ndarray              # Time-weighted return, contributions factored out
+    annualized_twr_pct: np.ndarray
+    volatility_pct: np.ndarray       # Annualized standard deviation of period returns
+    sharpe: np.ndarray
+    sortino: np.ndarray
+    max_drawdown_pct: np.ndarray     # Largest peak-to-trough fall of the time-weighted wealth index
+    xirr_pct: np.ndarray             # Money-weighted annual return of the contributions
+
+
+def year_fractions(dates):
+    """Years since the first date for every date"""
+    days = (np.asarray(dates, dtype='datetime64[ns]') - np.asarray(dates, dtype='datetime64[ns]')[0])
+    return days / np.timedelta64(1, 'D') / DAYS_PER_YEAR
+
+
+def xirr(cash_flows, times, guess=0.1, max_iterations=100, tolerance=1e-10):
+    """
+    Annual internal rates of return of many cash flow series at once (batched Newton iteration)
+
+    Args:
+        cash_flows: (T,) or (T x N) flows, negative for money paid in
+        times: (T,) times of the flows in years
+
+    Returns:
+        (N,) rates (or a float for 1-D input), NaN where Newton didn't converge
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    single = cash_flows.ndim == 1
+    flows = cash_flows.reshape(len(cash_flows), -1)
+    times = np.asarray(times, dtype=float)[:, None]
+
+    rate = np.full(flows.shape[1], float(guess))
+    converged = np.zeros(flows.shape[1], dtype=bool)
+    for _ in range(max_iterations):
+        discount = (1 + rate) ** -times
+        npv = (flows * discount).sum(axis=0)
+        derivative = (-times * flows * discount / (1 + rate)).sum(axis=0)
+        step = np.divide(npv, derivative, out=np.zeros_like(npv), where=derivative != 0)
+        # Keep every rate above -100% so (1 + rate) stays positive
+        new_rate = np.maximum(rate - step, (rate - 1) / 2)
+        converged = np.abs(new_rate - rate) < tolerance
+        rate = new_rate
+        if converged.all():
+            break
+
+    rate = np.where(converged, rate, np.nan)
+    return float(rate[0]) if single else rate
+
+
+def period_returns(values, contributions, initial_cash=0.0):
+    """
+    Return of every period with that period's contribution factored out
+
+    values are the portfolio values after each purchase date (already including
+    that date's contribution). Periods starting from a zero value have no
+    defined return and are reported as 0.
+
+    Returns:
+        (T x N) returns for (T x N) values, (T,) for (T,) values
+    """
+    values = np.asarray(values, dtype=float)
+    contributions = np.broadcast_to(np.asarray(contributions, dtype=float), values.shape[:1])
+    contributions = contributions.reshape((-1,) + (1,) * (values.ndim - 1))
+    previous = np.concatenate([np.full((1,) + values.shape[1:], float(initial_cash)), values[:-1]])
+    return np.divide(values - contributions, previous, out=np.ones_like(values), where=previous > 0) - 1
+
+
+def compute_metrics(values, dates, contributions, initial_cash=0.0, risk_free_rate=0.0):
+    """
+    All risk and return metrics for one or many runs in one vectorized pass
+
+    Args:
+        values: Portfolio value per purchase date, (T,) for one run or (T x N) for N runs
+        dates: (T,) purchase dates
+        contributions: Budget paid in on every purchase date, scalar or (T,)
+        initial_cash: Cash every run started with
+        risk_free_rate: Annual risk-free rate for Sharpe and Sortino (e.g. 0.04)
+
+    Returns:
+        RiskMetrics with (N,) arrays, or floats for a single (T,) run
+    """
+    values = np.asarray(values, dtype=float)
+    single = values.ndim == 1
+    values = values.reshape(len(values), -1)
+    total_weeks = len(values)
+    contributions = np.broadcast_to(np.asarray(contributions, dtype=float), (total_weeks,))
+    times = year_fractions(dates)
+    years = times[-1] if total_weeks > 1 else 0.0
+    periods_per_year = (total_weeks - 1) / years if years > 0 else 52.0
+
+    returns = period_returns(values, contributions, initial_cash)
+    wealth = np.cumprod(1 + returns, axis=0)
+    twr = wealth[-1] - 1
+    annualized_twr = (1 + twr) ** (1 / years) - 1 if years > 0 else twr
+
+    # Period returns after the first, which has no starting value unless there was initial cash
+    sample = returns if initial_cash > 0 else returns[1:]
+    period_excess = sample - risk_free_rate / periods_per_year
+    volatility = sample.std(axis=0, ddof=1) * np.sqrt(periods_per_year) if len(sample) > 1 else np.zeros(values.shape[1])
+    downside = np.sqrt((np.minimum(period_excess, 0) ** 2).mean(axis=0)) * np.sqrt(periods_per_year)
+    annual_excess = period_excess.mean(axis=0) * periods_per_year
+    sharpe = np.divide(annual_excess, volatility, out=np.zeros_like(volatility), where=volatility > 0)
+    sortino = np.divide(annual_excess, downside, out=np.zeros_like(downside), where=downside > 0)
+
+    max_drawdown = (1 - wealth / np.maximum.accumulate(wealth, axis=0)).max(axis=0)
+
+    paid_in = initial_cash + contributions.sum()
+    total_return = (values[-1] - paid_in) / paid_in if paid_in > 0 else np.zeros(values.shape[1])
+
+    # Money-weighted: contributions (and initial cash) paid in, final value taken out
+    flows = np.repeat(-contributions[:, None], values.shape[1], axis=1)
+    flows[0] -= initial_cash
+    flows[-1] += values[-1]
+    money_weighted = xirr(flows, times) if years > 0 else np.full(values.shape[1], np.nan)
+
+    metrics = RiskMetrics(
+        total_return_pct=total_return * 100,
+        twr_pct=twr * 100,
+        annualized_twr_pct=annualized_twr * 100,
+        volatility_pct=volatility * 100,
+        sharpe=sharpe,
+        sortino=sortino,
+        max_drawdown_pct=max_drawdown * 100,
+        xirr_pct=money_weighted * 100,
+    )
+    if single:
+        return RiskMetrics(*(float(np.asarray(m).reshape(-1)[0]) for m in metrics))
+    return metrics
+
+
+def objective_scores(values, dates, contributions, objective='final_value', initial_cash=0.0):
+    """
+    Higher-is-better score per run for an optimizer objective in OBJECTIVES
+
+    'calmar' is the annualized time-weighted return over the max drawdown. A
+    run whose XIRR doesn't converge scores -OBJECTIVE_PENALTY, a finite score
+    the optimizer's surrogate model can fit (it ranks below any real result).
+    """
+    values = np.asarray(values, dtype=float)
+    if objective == 'final_value':
+        return values[-1]
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}', expected one of {', '.join(OBJECTIVES)}")
+    metrics = compute_metrics(values, dates, contributions, initial_cash=initial_cash)
+    if objective == 'sharpe':
+        return metrics.sharpe
+    if objective == 'sortino':
+        return metrics.sortino
+    if objective == 'calmar':
+        return metrics.annualized_twr_pct / np.maximum(metrics.max_drawdown_pct, 1e-9)
+    return np.nan_to_num(metrics.xirr_pct, nan=-OBJECTIVE_PENALTY)
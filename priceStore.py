@@ -0,0 +1,160 @@
+import contextlib
+import json
+import os
+import re
+import time
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single writer assumed
+    fcntl = None
+
+INDEX_FILE = 'index.json'
+LOCK_FILE = '.lock'
+
+
+class PriceStore:
+    """
+    On-disk, memory-mapped store of per-ticker daily price history
+
+    Every ticker has two flat binary files, <ticker>.dates (int64 nanoseconds)
+    and <ticker>.prices (float64), plus an entry in index.json recording the
+    row count and the date range that has been downloaded. Reads return
+    read-only np.memmap views, so any number of processes can share the data
+    through the OS page cache without loading or copying it. Refreshing only
+    appends rows newer than the last stored date. Rewriting a ticker's history
+    swaps in new files instead of truncating the old ones, so existing maps
+    stay valid.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, ticker, kind):
+        safe_ticker = re.sub(r'[^A-Za-z0-9_.-]', '_', ticker)
+        return os.path.join(self.root, f"{safe_ticker}.{kind}")
+
+    @contextlib.contextmanager
+    def _locked(self, shared=False):
+        """Serialize writers across processes (shared=True for readers, which only exclude writers)"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def read_index(self):
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_index(self, index):
+        path = os.path.join(self.root, INDEX_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def tickers(self):
+        return sorted(self.read_index())
+
+    def covered_range(self, ticker):
+        """(start, end) dates that have been downloaded for ticker, or None"""
+        entry = self.read_index().get(ticker)
+        if entry is None:
+            return None
+        return entry['start'], entry['end']
+
+    def load(self, ticker, start_date=None, end_date=None):
+        """
+        Memory-mapped (dates, prices) for ticker, optionally limited to [start_date, end_date)
+
+        Returns:
+            tuple: (datetime64[ns] array, float64 array) views, or None if the ticker isn't stored
+        """
+        # The index and files are read together under the lock, so a concurrent rewrite
+        # can't pair one file's row count with the other's contents
+        with self._locked(shared=True):
+            entry = self.read_index().get(ticker)
+            if entry is None:
+                return None
+            rows = entry['rows']
+            if rows == 0:
+                return np.array([], dtype='datetime64[ns]'), np.array([], dtype=float)
+
+            dates = np.memmap(self._path(ticker, 'dates'), dtype='datetime64[ns]', mode='r', shape=(rows,))
+            prices = np.memmap(self._path(ticker, 'prices'), dtype=np.float64, mode='r', shape=(rows,))
+
+        first = 0 if start_date is None else np.searchsorted(dates, np.datetime64(start_date, 'ns'), side='left')
+        last = rows if end_date is None else np.searchsorted(dates, np.datetime64(end_date, 'ns'), side='left')
+        return dates[first:last], prices[first:last]
+
+    def write(self, ticker, dates, prices, start_date, end_date, replace=False):
+        """
+        Store downloaded prices covering [start_date, end_date)
+
+        Unless replace is True, only rows dated after the last stored row are
+        appended and the covered range is extended (also when no rows are new).
+        Data files are written before the index, so a crash never exposes a
+        partial row. A replaced history is written to new files that are moved
+        over the old ones, so processes still mapping the old files keep
+        reading them.
+        """
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+        prices = np.asarray(prices, dtype=np.float64)
+        order = np.argsort(dates, kind='stable')
+        dates, prices = dates[order], prices[order]
+
+        with self._locked():
+            index = self.read_index()
+            entry = None if replace else index.get(ticker)
+
+            if entry is None:
+                paths = [self._path(ticker, kind) for kind in ('dates', 'prices')]
+                for path, values in zip(paths, (dates, prices)):
+                    with open(path + '.tmp', 'wb') as f:
+                        f.write(np.ascontiguousarray(values).tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                # Unlisted while the pair is swapped, so a crash in between only loses the ticker
+                if index.pop(ticker, None) is not None:
+                    self._write_index(index)
+                for path in paths:
+                    os.replace(path + '.tmp', path)
+                index[ticker] = {'rows': len(dates), 'start': start_date, 'end': end_date,
+                                 'updated_at': time.time()}
+                self._write_index(index)
+                return len(dates)
+
+            rows = entry['rows']
+            if rows > 0:
+                last_date = np.memmap(self._path(ticker, 'dates'), dtype='datetime64[ns]',
+                                      mode='r', shape=(rows,))[-1]
+                newer = dates > last_date
+                dates, prices = dates[newer], prices[newer]
+
+            # Truncate anything past the indexed rows (left over from an interrupted write)
+            for kind, values in (('dates', dates), ('prices', prices)):
+                with open(self._path(ticker, kind), 'r+b') as f:
+                    f.truncate(rows * 8)
+                    f.seek(0, os.SEEK_END)
+                    f.write(np.ascontiguousarray(values).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            entry['rows'] = rows + len(dates)
+            entry['start'] = min(entry['start'], start_date)
+            entry['end'] = max(entry['end'], end_date)
+            entry['updated_at'] = time.time()
+            index[ticker] = entry
+            self._write_index(index)
+
+        return len(dates)
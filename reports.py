@@ -0,0 +1,201 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from schedules import purchase_periods
+
+REPORT_FORMATS = ('png', 'svg')
+MAX_POINTS = 2000  # Points kept per plotted line after decimation
+
+# Per-run columns a report is drawn from, one entry per purchase date
+REPORT_COLUMNS = ('dates', 'prices', 'dca_value', 'fg_value', 'fg_cash_buffer', 'dca_investment', 'fg_investment')
+
+
+def minmax_indices(values, max_points=MAX_POINTS):
+    """
+    Indices of a min/max preserving decimation of values
+
+    The series is split into max_points // 2 equal buckets and each bucket keeps
+    the positions of its minimum and maximum, so peaks, drawdowns and single
+    large purchases survive however long the series is. The first and last
+    points are always kept. Series of at most max_points (or max_points=None)
+    are returned whole.
+    """
+    values = np.asarray(values, dtype=float)
+    total = len(values)
+    if max_points is None or total <= max_points:
+        return np.arange(total)
+
+    n_buckets = max(1, max_points // 2)
+    starts = np.linspace(0, total, n_buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(starts))
+    # Sorted by bucket, then value: each bucket's min comes first and its max last
+    order = np.lexsort((values, bucket))
+    return np.unique(np.concatenate([order[starts[:-1]], order[starts[1:] - 1], [0, total - 1]]))
+
+
+def amounts_by_date(dates, transaction_dates, amounts):
+    """Transaction amounts spread over every purchase date (0 where nothing was bought)"""
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    weekly = np.zeros(len(dates))
+    positions = np.searchsorted(dates, np.asarray(transaction_dates, dtype='datetime64[ns]'))
+    weekly[positions] = np.asarray(amounts, dtype=float)
+    return weekly
+
+
+def result_columns(result):
+    """Report columns of a BacktestResult, taken straight from its per-week numpy columns"""
+    c = result.columns
+    return {
+        'dates': result.dates,
+        'prices': result.prices,
+        'dca_value': c['dca_portfolio_value'],
+        'fg_value': c['fg_portfolio_value'],
+        'fg_cash_buffer': c['fg_cash_buffer'],
+        'dca_investment': c['dca_investment'],
+        'fg_investment': c['fg_investment'],
+    }
+
+
+def batch_columns(dates, prices, batch, lane, weekly_budget):
+    """
+    Report columns of one multiplier set of a simulate_batch(..., record_values=True) result
+
+    Weekly investments are recovered from the recorded cash: whatever of the
+    previous cash plus this date's budget (prorated like simulate_batch's) is
+    no longer cash was invested.
+    """
+    if batch.fg_values is None:
+        raise ValueError("Batch was simulated without record_values=True")
+
+    def column(values):
+        # DCA and prices only have one column per price path
+        return values[:, lane] if values.ndim > 1 else values
+
+    budgets = weekly_budget * purchase_periods(dates)
+
+    def invested(cash):
+        previous = np.concatenate([[batch.initial_cash], cash[:-1]])
+        return previous + budgets - cash
+
+    fg_cash = batch.fg_cash_values[:, lane]
+    dca_cash = column(batch.dca_cash_values)
+    return {
+        'dates': np.asarray(dates, dtype='datetime64[ns]'),
+        'prices': column(np.asarray(prices, dtype=float)),
+        'dca_value': column(batch.dca_values),
+        'fg_value': batch.fg_values[:, lane],
+        'fg_cash_buffer': fg_cash,
+        'dca_investment': invested(dca_cash),
+        'fg_investment': invested(fg_cash),
+    }
+
+
+def _line(ax, dates, values, max_points, **kwargs):
+    keep = minmax_indices(values, max_points)
+    ax.plot(dates[keep], np.asarray(values)[keep], **kwargs)
+
+
+def draw_report(fig, columns, title=None, max_points=MAX_POINTS):
+    """
+    Draw the 2x2 strategy comparison (portfolio values, cash buffer, weekly
+    investments, price) onto a matplotlib Figure, decimating every line to max_points
+    """
+    dates = np.asarray(columns['dates'], dtype='datetime64[ns]')
+    (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
+
+    # Plot 1: Portfolio Performance Comparison
+    _line(ax1, dates, columns['dca_value'], max_points, label='Consistent DCA', linewidth=2, color='blue')
+    _line(ax1, dates, columns['fg_value'], max_points, label='Fear/Greed Strategy', linewidth=2, color='red')
+    ax1.set_title('Portfolio Performance Comparison', fontsize=14, fontweight='bold')
+    ax1.set_ylabel('Portfolio Value ($)')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+    ax1.ticklabel_format(style='plain', axis='y')
+
+    # Plot 2: Cash Buffer Over Time
+    _line(ax2, dates, columns['fg_cash_buffer'], max_points, color='green', linewidth=2)
+    ax2.set_title('Fear/Greed Strategy Cash Buffer', fontsize=14, fontweight='bold')
+    ax2.set_ylabel('Cash Buffer ($)')
+    ax2.grid(True, alpha=0.3)
+    ax2.ticklabel_format(style='plain', axis='y')
+
+    # Plot 3: Weekly Investment Amounts, on the dates either strategy bought (0 for the one that didn't)
+    dca_investment = np.asarray(columns['dca_investment'], dtype=float)
+    fg_investment = np.asarray(columns['fg_investment'], dtype=float)
+    traded = (dca_investment > 0) | (fg_investment > 0)
+    _line(ax3, dates[traded], dca_investment[traded], max_points, label='Consistent DCA', color='blue', linewidth=1.8)
+    _line(ax3, dates[traded], fg_investment[traded], max_points, label='Fear/Greed Strategy', color='red',
+          linewidth=1.8)
+    ax3.set_title('Weekly Investment Amount by Strategy', fontsize=14, fontweight='bold')
+    ax3.set_ylabel('Investment ($)')
+    ax3.set_xlabel('Date')
+    ax3.legend()
+    ax3.grid(True, alpha=0.3)
+    ax3.ticklabel_format(style='plain', axis='y')
+    ax3.tick_params(axis='x', rotation=45)
+
+    # Plot 4: S&P 500 price
+    _line(ax4, dates, columns['prices'], max_points, color='black', linewidth=1.5)
+    ax4.set_title('S&P 500 Price Over Time', fontsize=14, fontweight='bold')
+    ax4.set_ylabel('S&P 500 Price ($)')
+    ax4.set_xlabel('Date')
+    ax4.grid(True, alpha=0.3)
+
+    if title:
+        fig.suptitle(title, fontsize=16, fontweight='bold')
+    fig.tight_layout()
+
+
+def render_report(columns, path, title=None, max_points=MAX_POINTS, dpi=100):
+    """
+    Write one report to a PNG or SVG file (format from the extension) without a display
+
+    Uses a bare matplotlib Figure rather than pyplot, so nothing interactive or
+    global is involved and figures are freed as soon as they are written.
+    """
+    from matplotlib.figure import Figure
+
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    if extension not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format '{extension}', expected one of {', '.join(REPORT_FORMATS)}")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    fig = Figure(figsize=(18, 12))
+    draw_report(fig, columns, title=title, max_points=max_points)
+    fig.savefig(path, dpi=dpi)
+    return path
+
+
+def _render_job(job):
+    return render_report(**job)
+
+
+def render_reports(jobs, n_workers=None, chunksize=4):
+    """
+    Render many reports concurrently across a process pool
+
+    Args:
+        jobs: Iterable of render_report keyword dicts ({'columns': ..., 'path': ..., 'title': ...})
+        n_workers: Worker processes (default: one per CPU, 1 renders in this process)
+
+    Returns:
+        list: Paths written, in job order
+    """
+    jobs = list(jobs)
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or len(jobs) <= 1:
+        return [_render_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(jobs))) as executor:
+        return list(executor.map(_render_job, jobs, chunksize=chunksize))
+
+
+def batch_report_jobs(dates, prices, batch, weekly_budget, directory, names=None, fmt='png'):
+    """render_reports jobs for every multiplier set of a recorded batch, one file per set in directory"""
+    names = names if names is not None else [f"run_{lane:05d}" for lane in range(len(batch))]
+    return [{
+        'columns': batch_columns(dates, prices, batch, lane, weekly_budget),
+        'path': os.path.join(directory, f"{name}.{fmt}"),
+        'title': name,
+    } for lane, name in enumerate(names)]
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from functools import cached_property
+from timeline import CATEGORIES
+from instrumentation import NULL_INSTRUMENTATION
+
+
+class BacktestResult:
+    """
+    Result of a full backtest, stored as contiguous per-week numpy columns
+
+    The date, price and fear/greed columns come straight from the timeline and
+    are shared by both strategies. DataFrames are only built (once) when a
+    property like fg_portfolio_df is accessed.
+
+    Still unpacks like the old 10-tuple:
+        (dca_portfolio_df, dca_transactions_df, fg_portfolio_df, fg_transactions_df,
+         fg_cash_stats_df, sp500_df, total_weeks, fear_greed_week_counts,
+         dca_total_budget_received, fg_total_budget_received) = result
+    """
+
+    # Float columns filled in by run_backtest (plus the dca_bought/fg_bought masks)
+    COLUMNS = (
+        'dca_portfolio_value', 'dca_shares_owned', 'dca_cash_balance',
+        'dca_investment', 'dca_shares_bought', 'dca_total_shares',
+        'fg_portfolio_value', 'fg_shares_owned', 'fg_cash_buffer',
+        'fg_investment_multiplier', 'fg_desired_investment', 'fg_investment',
+        'fg_shares_bought', 'fg_total_shares',
+    )
+
+    # Order of the legacy tuple
+    FIELDS = (
+        'dca_portfolio_df', 'dca_transactions_df', 'fg_portfolio_df', 'fg_transactions_df',
+        'fg_cash_stats_df', 'sp500_df', 'total_weeks', 'fear_greed_week_counts',
+        'dca_total_budget_received', 'fg_total_budget_received',
+    )
+
+    def __init__(self, timeline, columns, dca_total_budget_received, fg_total_budget_received,
+                 instrumentation=NULL_INSTRUMENTATION):
+        self.timeline = timeline
+        self.columns = columns
+        self.dca_total_budget_received = dca_total_budget_received
+        self.fg_total_budget_received = fg_total_budget_received
+        # The producing backtester's own recorder, not a copy: its numbers are cumulative over every
+        # run of that backtester, and lazily built DataFrames add their 'result_construction' time to
+        # it. Take instrumentation.snapshot() for this point in time.
+        self.instrumentation = instrumentation
+
+    # Shared columns
+    @property
+    def dates(self):
+        return self.timeline.dates
+
+    @property
+    def prices(self):
+        return self.timeline.prices
+
+    @property
+    def sp500_df(self):
+        return self.timeline.price_data
+
+    @property
+    def total_weeks(self):
+        return len(self.timeline)
+
+    @cached_property
+    def fear_greed_week_counts(self):
+        return self.timeline.week_counts()
+
+    # Scalars that don't need any DataFrame
+    @property
+    def dca_final_value(self):
+        return float(self.columns['dca_portfolio_value'][-1])
+
+    @property
+    def fg_final_value(self):
+        return float(self.columns['fg_portfolio_value'][-1])
+
+    def _categories(self, mask=None):
+        codes = self.timeline.category_codes if mask is None else self.timeline.category_codes[mask]
+        return np.asarray(CATEGORIES, dtype=object)[codes]
+
+    # Lazily materialized DataFrames
+    def _frame(self, data):
+        with self.instrumentation.phase('result_construction'):
+            return pd.DataFrame(data)
+
+    @cached_property
+    def dca_portfolio_df(self):
+        c = self.columns
+        return self._frame({
+            'date': self.dates,
+            'portfolio_value': c['dca_portfolio_value'],
+            'shares_owned': c['dca_shares_owned'],
+            'cash_balance': c['dca_cash_balance'],
+            'sp500_price': self.prices
+        })
+
+    @cached_property
+    def dca_transactions_df(self):
+        c = self.columns
+        bought = c['dca_bought']
+        return self._frame({
+            'date': self.dates[bought],
+            'investment_amount': c['dca_investment'][bought],
+            'shares_bought': c['dca_shares_bought'][bought],
+            'total_shares': c['dca_total_shares'][bought],
+            'cash_balance': c['dca_cash_balance'][bought],
+            'price': self.prices[bought]
+        })
+
+    @cached_property
+    def fg_portfolio_df(self):
+        c = self.columns
+        return self._frame({
+            'date': self.dates,
+            'portfolio_value': c['fg_portfolio_value'],
+            'shares_owned': c['fg_shares_owned'],
+            'cash_buffer': c['fg_cash_buffer'],
+            'sp500_price': self.prices,
+            'fear_greed_value': self.timeline.fear_greed_values
+        })
+
+    @cached_property
+    def fg_transactions_df(self):
+        c = self.columns
+        bought = c['fg_bought']
+        return self._frame({
+            'date': self.dates[bought],
+            'fear_greed_value': self.timeline.fear_greed_values[bought],
+            'fear_greed_category': self._categories(bought),
+            'investment_multiplier': c['fg_investment_multiplier'][bought],
+            'desired_investment': c['fg_desired_investment'][bought],
+            'investment_amount': c['fg_investment'][bought],
+            'shares_bought': c['fg_shares_bought'][bought],
+            'total_shares': c['fg_total_shares'][bought],
+            'cash_buffer': c['fg_cash_buffer'][bought],
+            'price': self.prices[bought]
+        })
+
+    @cached_property
+    def fg_cash_stats_df(self):
+        return self._frame({
+            'date': self.dates,
+            'cash_buffer': self.columns['fg_cash_buffer'],
+            'fear_greed_value': self.timeline.fear_greed_values,
+            'fear_greed_category': self._categories()
+        })
+
+    # Backward-compatible tuple behaviour
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.FIELDS)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(getattr(self, name) for name in self.FIELDS[index])
+        return getattr(self, self.FIELDS[index])
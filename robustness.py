@@ -0,0 +1,201 @@
+import argparse
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+from simulation import multipliers_to_array, simulate_batch
+
+RESAMPLING_METHODS = ('block', 'regime')
+
+# Historical series and settings attached by each worker process in _init_worker
+_worker_state = {}
+
+
+class RobustnessResult(NamedTuple):
+    """
+    Per-path returns of DCA and the fear/greed strategy over resampled histories
+
+    Every multiplier set runs on the same paths, so fg_return_pct and
+    excess_return have one column per set: shape (n_paths, n_sets).
+    """
+    method: str
+    total_weeks: int
+    multipliers: np.ndarray  # (n_sets x 5) in CATEGORIES order
+    dca_return_pct: np.ndarray
+    fg_return_pct: np.ndarray
+    excess_return: np.ndarray
+
+
+def block_bootstrap_paths(prices, category_codes, n_paths, block_size, rng):
+    """
+    Resample weekly (log return, category) pairs in circular blocks
+
+    Returns and the fear/greed category they were observed with are drawn
+    together, so the relationship between sentiment and subsequent moves
+    survives within every block.
+
+    Returns:
+        tuple: (T x n_paths) prices and (T x n_paths) category codes
+    """
+    log_returns = np.diff(np.log(prices))
+    codes = category_codes[1:]
+    n_returns = len(log_returns)
+    n_blocks = -(-n_returns // block_size)
+
+    starts = rng.integers(0, n_returns, (n_blocks, 1, n_paths))
+    offsets = np.arange(block_size)[None, :, None]
+    idx = ((starts + offsets) % n_returns).reshape(n_blocks * block_size, n_paths)[:n_returns]
+
+    path_prices = np.empty((n_returns + 1, n_paths))
+    path_prices[0] = prices[0]
+    path_prices[1:] = prices[0] * np.exp(np.cumsum(log_returns[idx], axis=0))
+    path_codes = np.empty((n_returns + 1, n_paths), dtype=np.int8)
+    path_codes[0] = category_codes[0]
+    path_codes[1:] = codes[idx]
+    return path_prices, path_codes
+
+
+def regime_resample_paths(prices, category_codes, n_paths, rng):
+    """
+    Keep the historical category sequence and redraw every week's return from weeks in the same category
+
+    Returns:
+        tuple: (T x n_paths) prices and the (T,) historical category codes
+    """
+    log_returns = np.diff(np.log(prices))
+    codes = category_codes[1:]
+
+    # Returns grouped by category: group c is sorted_returns[group_start[c]:group_start[c] + group_size[c]]
+    order = np.argsort(codes, kind='stable')
+    sorted_returns = log_returns[order]
+    group_size = np.bincount(codes, minlength=int(category_codes.max()) + 1)
+    group_start = np.concatenate([[0], np.cumsum(group_size)[:-1]])
+
+    draws = (rng.random((len(codes), n_paths)) * group_size[codes][:, None]).astype(np.int64)
+    idx = group_start[codes][:, None] + draws
+
+    path_prices = np.empty((len(prices), n_paths))
+    path_prices[0] = prices[0]
+    path_prices[1:] = prices[0] * np.exp(np.cumsum(sorted_returns[idx], axis=0))
+    return path_prices, category_codes
+
+
+def _init_worker(prices, category_codes, multipliers, settings):
+    _worker_state['prices'] = prices
+    _worker_state['category_codes'] = category_codes
+    _worker_state['multipliers'] = multipliers
+    _worker_state['settings'] = settings
+
+
+def _simulate_chunk(task):
+    """Generate one chunk of paths from its own seed and simulate both strategies on them"""
+    method, n_paths, block_size, seed = task
+    rng = np.random.default_rng(seed)
+    prices = _worker_state['prices']
+    category_codes = _worker_state['category_codes']
+
+    if method == 'block':
+        path_prices, path_codes = block_bootstrap_paths(prices, category_codes, n_paths, block_size, rng)
+    else:
+        path_prices, path_codes = regime_resample_paths(prices, category_codes, n_paths, rng)
+
+    # One batch per multiplier set, each over all of the chunk's paths
+    results = [simulate_batch(path_prices, path_codes, multipliers[None, :], **_worker_state['settings'])
+               for multipliers in _worker_state['multipliers']]
+    return results[0].dca_return_pct, np.column_stack([result.fg_return_pct for result in results])
+
+
+def run_robustness(backtester, n_paths=10000, method='block', block_size=13, chunk_size=1000,
+                   n_workers=None, seed=42, multipliers=None):
+    """
+    Distribution of excess return over DCA across resampled market histories
+
+    Paths are generated and simulated chunk_size at a time, so memory stays
+    bounded by one chunk per worker however many paths are requested. Every
+    chunk gets its own child seed, so results don't depend on n_workers.
+
+    Args:
+        backtester: FearGreedBacktester providing the historical timeline and settings
+        method: 'block' (circular block bootstrap of weekly return/category pairs)
+                or 'regime' (historical category sequence, returns redrawn within category)
+        block_size: Weeks per bootstrap block
+        n_workers: Worker processes (1 runs everything in this process)
+        multipliers: Multiplier dict or (N x 5) sets to test, all on the same paths,
+            defaults to backtester.INVESTMENT_MULTIPLIERS
+
+    Returns:
+        RobustnessResult, or None if no data
+    """
+    if method not in RESAMPLING_METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {', '.join(RESAMPLING_METHODS)}")
+
+    timeline = backtester.get_timeline()
+    if timeline is None or len(timeline) < 2:
+        print("Failed to prepare backtest data")
+        return None
+
+    multipliers = multipliers_to_array(multipliers if multipliers is not None else backtester.INVESTMENT_MULTIPLIERS)
+    # Resampled paths keep the historical calendar, so they keep its budget periods too
+    settings = dict(backtester.simulation_settings(), period_weeks=timeline.period_weeks)
+    initargs = (timeline.prices, timeline.category_codes, multipliers, settings)
+
+    chunk_sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        chunk_sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [(method, size, block_size, child_seed) for size, child_seed in zip(chunk_sizes, seeds)]
+
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1:
+        _init_worker(*initargs)
+        results = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=initargs) as executor:
+            results = list(executor.map(_simulate_chunk, tasks))
+
+    dca_return_pct = np.concatenate([r[0] for r in results])
+    fg_return_pct = np.concatenate([r[1] for r in results])
+    return RobustnessResult(method=method, total_weeks=len(timeline), multipliers=multipliers,
+                            dca_return_pct=dca_return_pct, fg_return_pct=fg_return_pct,
+                            excess_return=fg_return_pct - dca_return_pct[:, None])
+
+
+def print_robustness_report(result):
+    """Summary of the excess return distribution"""
+    if result is None:
+        return
+
+    print("\n" + "=" * 80)
+    print(f"ROBUSTNESS ({result.method} resampling, {len(result.dca_return_pct):,} paths "
+          f"of {result.total_weeks} weeks)")
+    print("=" * 80)
+    print(f"Mean DCA return:          {result.dca_return_pct.mean():.2f}%")
+    for i, multipliers in enumerate(result.multipliers):
+        excess = result.excess_return[:, i]
+        if len(result.multipliers) > 1:
+            print(f"\nMultipliers {', '.join(f'{m:.2f}' for m in multipliers)}:")
+        print(f"Mean Fear/Greed return:   {result.fg_return_pct[:, i].mean():.2f}%")
+        print(f"Mean excess return:       {excess.mean():+.2f}% (std {excess.std():.2f}%)")
+        print(f"Paths beating DCA:        {(excess > 0).mean() * 100:.1f}%")
+        print("Excess return percentiles:")
+        for q, value in zip((5, 25, 50, 75, 95), np.percentile(excess, (5, 25, 50, 75, 95))):
+            print(f"  {q:>2}th: {value:+.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo robustness check of the Fear & Greed strategy")
+    parser.add_argument('--paths', type=int, default=10000)
+    parser.add_argument('--method', choices=RESAMPLING_METHODS, default='block')
+    parser.add_argument('--block-size', type=int, default=13, help="Weeks per bootstrap block")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Paths simulated per task")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    # Imported here so worker processes only load numpy and the simulation kernel
+    from backtest import FearGreedBacktester
+
+    backtester = FearGreedBacktester()
+    result = run_robustness(backtester, n_paths=args.paths, method=args.method, block_size=args.block_size,
+                            chunk_size=args.chunk_size, n_workers=args.workers, seed=args.seed)
+    print_robustness_report(result)
@@ -0,0 +1,29 @@
+import pandas as pd
+from backtest import FearGreedBacktester
+
+def main():
+    """Run the Fear/Greed strategy against DCA across several tickers"""
+    backtester = FearGreedBacktester()
+    
+    # You can modify these parameters:
+    backtester.PURCHASE_DAY = 1
+    backtester.START_DATE = '2015-07-28'
+    backtester.END_DATE = '2025-07-28'
+    backtester.WEEKLY_BUDGET = 500
+    backtester.INITIAL_CASH = 0
+
+    tickers = ['SPY', 'QQQ', 'DIA', 'IWM', 'VTI', 'EFA', 'EEM', 'TLT', 'GLD']
+    
+    # Run backtest
+    comparison = backtester.run_multi_ticker_backtest(tickers, max_workers=8)
+    
+    if comparison is not None:
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(comparison.sort_values('excess_return', ascending=False)[
+                ['weeks', 'dca_final_value', 'fg_final_value', 'dca_return_pct', 'fg_return_pct',
+                 'excess_return', 'cash_max', 'cash_mean']].round(2))
+    
+    return comparison
+
+if __name__ == "__main__":
+    comparison = main()
@@ -1,14 +1,17 @@
 from backtest import FearGreedBacktester
+from reports import render_report, result_columns
 
-def main():
+def main(start_date='2020-07-28', end_date='2025-07-28', weekly_budget=500, schedule=None, plot=True,
+         report_path=None):
     """Main function to run the backtest"""
     backtester = FearGreedBacktester()
     
     # You can modify these parameters:
     backtester.PURCHASE_DAY = 1
-    backtester.START_DATE = '2020-07-28'
-    backtester.END_DATE = '2025-07-28'
-    backtester.WEEKLY_BUDGET = 500
+    backtester.PURCHASE_SCHEDULE = schedule
+    backtester.START_DATE = start_date
+    backtester.END_DATE = end_date
+    backtester.WEEKLY_BUDGET = weekly_budget
     backtester.INITIAL_CASH = 0
 
     # Example investment multipliers based on fear/greed levels
@@ -33,8 +36,12 @@ def main():
                                      fg_transactions_df, fg_cash_stats_df, total_weeks, 
                                      fear_greed_week_counts, dca_total_budget_received, fg_total_budget_received)
         
-        # Plot results
-        backtester.plot_results(dca_portfolio_df, fg_portfolio_df, fg_cash_stats_df, dca_transactions_df, fg_transactions_df)
+        # Plot results (or write them to a PNG/SVG file without a display)
+        if report_path:
+            render_report(result_columns(results), report_path)
+            print(f"\nReport saved to {report_path}")
+        elif plot:
+            backtester.plot_results(dca_portfolio_df, fg_portfolio_df, fg_cash_stats_df, dca_transactions_df, fg_transactions_df)
         
         return results
     
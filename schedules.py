@@ -0,0 +1,130 @@
+from typing import NamedTuple, Optional
+import numpy as np
+
+SCHEDULE_KINDS = ('weekly', 'biweekly', 'daily', 'business_days', 'monthly', 'month_end')
+
+
+class Schedule(NamedTuple):
+    """
+    Purchase cadence
+
+    kind:
+        'weekly'        - every week on weekday `day` (0=Monday), calendar dates like get_purchase_dates
+        'biweekly'      - every other week on weekday `day`, snapped to trading days
+        'daily'         - every trading day
+        'business_days' - every `every` trading days
+        'monthly'       - day `day` of every month, snapped to the next trading day
+        'month_end'     - last trading day of every month
+    """
+    kind: str = 'weekly'
+    day: Optional[int] = None
+    every: int = 1
+
+    @classmethod
+    def parse(cls, text):
+        """Parse 'kind' or 'kind:number', e.g. 'monthly:15', 'business_days:5', 'weekly:1'"""
+        kind, _, number = text.partition(':')
+        if kind not in SCHEDULE_KINDS:
+            raise ValueError(f"Unknown schedule '{kind}', expected one of {', '.join(SCHEDULE_KINDS)}")
+        if not number:
+            return cls(kind)
+        if kind == 'business_days':
+            return cls(kind, every=int(number))
+        return cls(kind, day=int(number))
+
+    @property
+    def spec(self):
+        """The text Schedule.parse reads back, e.g. 'monthly:15'"""
+        if self.kind == 'business_days':
+            return f"{self.kind}:{self.every}"
+        return self.kind if self.day is None else f"{self.kind}:{self.day}"
+
+
+def _to_day(date):
+    return np.datetime64(str(date)[:10], 'D')
+
+
+def _weekday(days):
+    """0=Monday for datetime64[D] values (1970-01-01 was a Thursday)"""
+    return (days.astype(np.int64) + 3) % 7
+
+
+def weekly_dates(start_date, end_date, day_of_week, step_weeks=1):
+    """Every step_weeks weeks on day_of_week from the first occurrence on/after start_date"""
+    start = _to_day(start_date)
+    end = _to_day(end_date)
+    first = start + (day_of_week - _weekday(start)) % 7
+    return np.arange(first, end + 1, 7 * step_weeks, dtype='datetime64[D]')
+
+
+def monthly_dates(start_date, end_date, day_of_month):
+    """Day day_of_month of every month (clipped to the month's length)"""
+    start = _to_day(start_date)
+    end = _to_day(end_date)
+    months = np.arange(start.astype('datetime64[M]'), end.astype('datetime64[M]') + 1, dtype='datetime64[M]')
+    month_starts = months.astype('datetime64[D]')
+    month_lengths = ((months + 1).astype('datetime64[D]') - month_starts).astype(np.int64)
+    dates = month_starts + np.minimum(day_of_month, month_lengths) - 1
+    return dates[(dates >= start) & (dates <= end)]
+
+
+def purchase_periods(dates):
+    """
+    Weeks since the previous purchase date for every purchase date (the first counts as one week)
+
+    Budgets and expenses are prorated by these, so every cadence is paid the
+    same amount per calendar week: weekly dates get 1, biweekly 2, trading
+    days 1/7 (3/7 after a weekend) and monthly dates 4 to 4.4.
+    """
+    days = np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    weeks = np.ones(len(days))
+    weeks[1:] = np.diff(days) / 7
+    return weeks
+
+
+def snap_to_trading_days(dates, trading_days):
+    """Move every date to the first trading day on or after it (dropping dates past the last one)"""
+    idx = np.searchsorted(trading_days, dates, side='left')
+    idx = idx[idx < len(trading_days)]
+    return np.unique(trading_days[idx])
+
+
+def schedule_dates(schedule, start_date, end_date, trading_days=None):
+    """
+    All purchase dates for a schedule between start_date and end_date (inclusive)
+
+    Args:
+        schedule: Schedule
+        trading_days: Sorted dates with prices, needed for every kind except 'weekly'
+
+    Returns:
+        numpy datetime64[ns] array
+    """
+    start = _to_day(start_date)
+    end = _to_day(end_date)
+
+    if schedule.kind == 'weekly':
+        return weekly_dates(start, end, schedule.day or 0).astype('datetime64[ns]')
+
+    if trading_days is None:
+        raise ValueError(f"'{schedule.kind}' schedules need the trading days of the price data")
+    trading_days = np.asarray(trading_days, dtype='datetime64[ns]').astype('datetime64[D]')
+    trading_days = trading_days[(trading_days >= start) & (trading_days <= end)]
+
+    if schedule.kind == 'daily':
+        dates = trading_days
+    elif schedule.kind == 'business_days':
+        dates = trading_days[::max(schedule.every, 1)]
+    elif schedule.kind == 'biweekly':
+        dates = snap_to_trading_days(weekly_dates(start, end, schedule.day or 0, step_weeks=2), trading_days)
+    elif schedule.kind == 'monthly':
+        dates = snap_to_trading_days(monthly_dates(start, end, schedule.day or 1), trading_days)
+    elif schedule.kind == 'month_end':
+        months = trading_days.astype('datetime64[M]')
+        is_last = np.ones(len(months), dtype=bool)
+        is_last[:-1] = months[1:] != months[:-1]
+        dates = trading_days[is_last]
+    else:
+        raise ValueError(f"Unknown schedule '{schedule.kind}'")
+
+    return dates.astype('datetime64[ns]')
@@ -1,20 +1,34 @@
-import requests
+from dataFetch import fetch_json
 
-def fetch_fear_greed_data():
+FEAR_GREED_URL = "https://www.finhacker.cz/wp-content/custom-api/fear-greed-data.php"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36",
+    "Accept": "*/*",
+    "Referer": "https://www.finhacker.cz/fear-and-greed-index-historical-data-and-chart/",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+}
+
+def fetch_fear_greed_data(url=FEAR_GREED_URL):
     """Fetch fear and greed index data"""
-    url = "https://www.finhacker.cz/wp-content/custom-api/fear-greed-data.php"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36",
-        "Accept": "*/*",
-        "Referer": "https://www.finhacker.cz/fear-and-greed-index-historical-data-and-chart/",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
-    }
-    
+    result = fetch_fear_greed_data_conditional(url)
+    if result is None:
+        return None
+    return result.data
+
+def fetch_fear_greed_data_conditional(url=FEAR_GREED_URL, etag=None, last_modified=None):
+    """
+    Fetch fear and greed index data, revalidating against a previous response
+
+    Returns:
+        FetchResult: data is the list of points, or None with not_modified=True if the
+        server reports no change since etag/last_modified. None if the fetch failed.
+    """
     try:
-        response = requests.get(url, headers=headers)
-        data = response.json().get("agg", [])
-        return data
+        result = fetch_json(url, headers=HEADERS, etag=etag, last_modified=last_modified)
+        if result.not_modified:
+            return result
+        return result._replace(data=result.data.get("agg", []))
     except Exception as e:
         print(f"Error fetching fear/greed data: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,328 @@
+import numpy as np
+from typing import NamedTuple
+from timeline import CATEGORIES
+
+
+def multipliers_to_array(multipliers):
+    """Convert INVESTMENT_MULTIPLIERS dicts (or one dict) into an (N x 5) array in CATEGORIES order"""
+    if isinstance(multipliers, dict):
+        multipliers = [multipliers]
+    if len(multipliers) > 0 and isinstance(multipliers[0], dict):
+        return np.array([[m[category] for category in CATEGORIES] for m in multipliers], dtype=float)
+    return np.atleast_2d(np.asarray(multipliers, dtype=float))
+
+
+def return_pct(final_value, initial_cash, budget_received):
+    """Total return % on everything paid into a strategy"""
+    total_in = initial_cash + budget_received
+    if total_in <= 0:
+        return np.zeros_like(final_value)
+    return (final_value - initial_cash - budget_received) / total_in * 100
+
+
+class BacktestSummary(NamedTuple):
+    """Final figures of a single backtest, without any per-week history"""
+    total_weeks: int
+    initial_cash: float
+    dca_total_budget_received: float
+    fg_total_budget_received: float
+    dca_final_value: float
+    fg_final_value: float
+    dca_final_cash: float
+    fg_final_cash: float
+    dca_total_invested: float
+    fg_total_invested: float
+    dca_purchases: int
+    fg_purchases: int
+    cash_min: float
+    cash_max: float
+    cash_mean: float
+
+    @property
+    def dca_return_pct(self):
+        return float(return_pct(self.dca_final_value, self.initial_cash, self.dca_total_budget_received))
+
+    @property
+    def fg_return_pct(self):
+        return float(return_pct(self.fg_final_value, self.initial_cash, self.fg_total_budget_received))
+
+    @property
+    def excess_return(self):
+        """Fear/greed return % minus DCA return %"""
+        return self.fg_return_pct - self.dca_return_pct
+
+
+class BatchResult:
+    """Final state and cash buffer statistics for a batch of simulated multiplier sets"""
+
+    __slots__ = ('multipliers', 'total_weeks', 'budget_received', 'initial_cash',
+                 'dca_final_value', 'dca_final_cash', 'dca_purchases',
+                 'fg_final_value', 'fg_final_cash', 'fg_purchases',
+                 'cash_min', 'cash_max', 'cash_mean', 'dca_values', 'fg_values',
+                 'dca_cash_values', 'fg_cash_values')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    def __len__(self):
+        return len(self.multipliers)
+
+    @property
+    def dca_return_pct(self):
+        return return_pct(self.dca_final_value, self.initial_cash, self.budget_received)
+
+    @property
+    def fg_return_pct(self):
+        return return_pct(self.fg_final_value, self.initial_cash, self.budget_received)
+
+    @property
+    def excess_return(self):
+        """Fear/greed return % minus DCA return % for every multiplier set"""
+        return self.fg_return_pct - self.dca_return_pct
+
+
+def _as_list(values, dtype=None):
+    """values as a Python list, lists (like MarketTimeline's cached ones) are used as they are"""
+    if isinstance(values, list):
+        return values
+    return np.asarray(values, dtype=dtype).tolist()
+
+
+def _periods(period_weeks, total_weeks):
+    """Weeks per purchase date as a list, one each when period_weeks is None"""
+    if period_weeks is None:
+        return [1.0] * total_weeks
+    return _as_list(period_weeks, dtype=float)
+
+
+def simulate_batch(prices, category_codes, multipliers, weekly_budget, initial_cash=0.0,
+                   transaction_fee=0.0, expense_ratio=0.0, record_values=False, period_weeks=None):
+    """
+    Simulate consistent DCA and the fear/greed cash buffer strategy for many multiplier sets at once
+
+    Steps through the timeline once with the per-week state of every multiplier
+    set held in numpy arrays, using exactly the same rules as run_backtest.
+
+    Args:
+        prices: Price per purchase date, shape (T,) or (T, N) for a different price path per set
+        category_codes: Category code per purchase date, shape (T,) or (T, N)
+        multipliers: (N x 5) array of multipliers in CATEGORIES order
+        weekly_budget: Budget added to both strategies per week
+        initial_cash: Starting cash balance for both strategies
+        transaction_fee: Fee per transaction
+        expense_ratio: Annual expense ratio
+        record_values: Also keep the portfolio value and cash of every purchase date
+            (BatchResult.dca_values, fg_values, dca_cash_values and fg_cash_values,
+            time along the first axis)
+        period_weeks: (T,) weeks since the previous purchase date (MarketTimeline.period_weeks).
+            The budget and expense of every date are prorated by it, default one week per date
+
+    Returns:
+        BatchResult: Final values, purchase counts and cash buffer stats with one entry per set
+    """
+    prices = np.asarray(prices, dtype=float)
+    category_codes = np.asarray(category_codes)
+    multipliers = multipliers_to_array(multipliers)
+    n_sets = len(multipliers)
+
+    fee = float(transaction_fee)
+    expense_ratio = float(expense_ratio)
+    total_weeks = len(prices)
+    periods = _periods(period_weeks, total_weeks)
+    budgets = [float(weekly_budget) * period for period in periods]
+
+    # Multipliers looked up by category code, one row per category
+    multiplier_table = multipliers.T.copy()
+    lanes = np.arange(n_sets) if n_sets > 1 else 0
+
+    # Strategy 1: Consistent DCA (doesn't depend on the multipliers, so only
+    # needs one lane per price path)
+    dca_cash = np.full(prices.shape[1:], float(initial_cash))
+    dca_shares = np.zeros(prices.shape[1:])
+    dca_purchases = np.zeros(prices.shape[1:], dtype=np.int64)
+    dca_value = dca_cash.copy()
+
+    # Strategy 2: Fear/Greed with cash buffer
+    lane_shape = np.broadcast_shapes((n_sets,), prices.shape[1:], category_codes.shape[1:])
+    fg_cash = np.full(lane_shape, float(initial_cash))
+    fg_shares = np.zeros(lane_shape)
+    fg_purchases = np.zeros(lane_shape, dtype=np.int64)
+    fg_value = fg_cash.copy()
+    cash_min = np.full(lane_shape, np.inf)
+    cash_max = np.full(lane_shape, -np.inf)
+    cash_sum = np.zeros(lane_shape)
+    budget_received = 0.0
+
+    dca_values = np.zeros((total_weeks,) + dca_cash.shape) if record_values else None
+    fg_values = np.zeros((total_weeks,) + lane_shape) if record_values else None
+    dca_cash_values = np.zeros((total_weeks,) + dca_cash.shape) if record_values else None
+    fg_cash_values = np.zeros((total_weeks,) + lane_shape) if record_values else None
+
+    for week in range(total_weeks):
+        price = prices[week]
+        code = category_codes[week]
+        budget = budgets[week]
+        period = periods[week]
+        budget_received += budget
+        if category_codes.ndim == 1:
+            investment_multiplier = multiplier_table[code]
+        else:
+            investment_multiplier = multipliers[lanes, code]
+
+        # === STRATEGY 1: CONSISTENT DCA ===
+        dca_cash = dca_cash + budget
+        buy = dca_cash >= budget + fee
+        dca_shares = dca_shares + np.where(buy, (budget - fee) / price, 0.0)
+        dca_cash = dca_cash - np.where(buy, budget, 0.0)
+        dca_purchases += buy
+
+        dca_value = dca_cash + dca_shares * price
+        expense = dca_shares * price * expense_ratio / 365 * period
+        dca_value = dca_value - expense
+        dca_shares = dca_shares - expense / price
+
+        # === STRATEGY 2: FEAR/GREED WITH CASH BUFFER ===
+        fg_cash = fg_cash + budget
+        desired_investment = budget * investment_multiplier
+        investment_to_make = np.minimum(desired_investment, fg_cash)
+        buy = investment_to_make > fee
+        fg_shares = fg_shares + np.where(buy, (investment_to_make - fee) / price, 0.0)
+        fg_cash = fg_cash - np.where(buy, investment_to_make, 0.0)
+        fg_purchases += buy
+
+        fg_value = fg_cash + fg_shares * price
+        expense = fg_shares * price * expense_ratio / 365 * period
+        fg_value = fg_value - expense
+        fg_shares = fg_shares - expense / price
+
+        # Track cash buffer statistics
+        np.minimum(cash_min, fg_cash, out=cash_min)
+        np.maximum(cash_max, fg_cash, out=cash_max)
+        cash_sum += fg_cash
+
+        if record_values:
+            dca_values[week] = dca_value
+            fg_values[week] = fg_value
+            dca_cash_values[week] = dca_cash
+            fg_cash_values[week] = fg_cash
+
+    return BatchResult(
+        multipliers=multipliers,
+        total_weeks=total_weeks,
+        budget_received=budget_received,
+        initial_cash=float(initial_cash),
+        dca_final_value=dca_value,
+        dca_final_cash=dca_cash,
+        dca_purchases=dca_purchases,
+        fg_final_value=fg_value,
+        fg_final_cash=fg_cash,
+        fg_purchases=fg_purchases,
+        cash_min=cash_min,
+        cash_max=cash_max,
+        cash_mean=cash_sum / max(total_weeks, 1),
+        dca_values=dca_values,
+        fg_values=fg_values,
+        dca_cash_values=dca_cash_values,
+        fg_cash_values=fg_cash_values,
+    )
+
+
+def simulate_summary(prices, category_codes, multipliers, weekly_budget, initial_cash=0.0,
+                     transaction_fee=0.0, expense_ratio=0.0, period_weeks=None):
+    """
+    Simulate both strategies for one multiplier set keeping only running scalars
+
+    Same rules as run_backtest, but nothing is recorded per week, so memory use
+    doesn't grow with the length of the backtest. period_weeks prorates the
+    budget and expense of every date like in simulate_batch. The loop runs on
+    Python floats, so arrays are converted to lists first; pass lists (see
+    MarketTimeline.price_list) to skip that on repeated calls.
+
+    Returns:
+        BacktestSummary: Final values, budget totals and cash buffer stats
+    """
+    multiplier_table = multipliers_to_array(multipliers)[0].tolist()
+    weekly_budget = float(weekly_budget)
+    fee = float(transaction_fee)
+
+    dca_cash = float(initial_cash)
+    dca_shares = 0.0
+    dca_value = dca_cash
+    dca_total_budget_received = 0.0
+    dca_total_invested = 0.0
+    dca_purchases = 0
+
+    fg_cash_buffer = float(initial_cash)
+    fg_shares = 0.0
+    fg_value = fg_cash_buffer
+    fg_total_budget_received = 0.0
+    fg_total_invested = 0.0
+    fg_purchases = 0
+
+    cash_min = float('inf')
+    cash_max = float('-inf')
+    cash_sum = 0.0
+    total_weeks = 0
+
+    prices = _as_list(prices, dtype=float)
+    for price, code, period in zip(prices, _as_list(category_codes), _periods(period_weeks, len(prices))):
+        budget = weekly_budget * period
+        total_weeks += 1
+        dca_total_budget_received += budget
+        fg_total_budget_received += budget
+
+        # === STRATEGY 1: CONSISTENT DCA ===
+        dca_cash += budget
+        if dca_cash >= budget + fee:
+            dca_shares = dca_shares + (budget - fee) / price
+            dca_cash = dca_cash - budget
+            dca_total_invested += budget
+            dca_purchases += 1
+
+        dca_value = dca_cash + (dca_shares * price)
+        if dca_shares > 0:
+            expense = (dca_shares * price * expense_ratio) / 365 * period
+            dca_value = dca_value - expense
+            dca_shares = dca_shares - (expense / price)
+
+        # === STRATEGY 2: FEAR/GREED WITH CASH BUFFER ===
+        fg_cash_buffer += budget
+        desired_investment = budget * multiplier_table[code]
+        investment_to_make = min(desired_investment, fg_cash_buffer)
+        if investment_to_make > fee:
+            fg_shares += (investment_to_make - fee) / price
+            fg_cash_buffer -= investment_to_make
+            fg_total_invested += investment_to_make
+            fg_purchases += 1
+
+        fg_value = fg_cash_buffer + (fg_shares * price)
+        if fg_shares > 0:
+            expense = (fg_shares * price * expense_ratio) / 365 * period
+            fg_value = fg_value - expense
+            fg_shares = fg_shares - (expense / price)
+
+        # Track cash buffer statistics
+        if fg_cash_buffer < cash_min:
+            cash_min = fg_cash_buffer
+        if fg_cash_buffer > cash_max:
+            cash_max = fg_cash_buffer
+        cash_sum += fg_cash_buffer
+
+    return BacktestSummary(
+        total_weeks=total_weeks,
+        initial_cash=float(initial_cash),
+        dca_total_budget_received=dca_total_budget_received,
+        fg_total_budget_received=fg_total_budget_received,
+        dca_final_value=dca_value,
+        fg_final_value=fg_value,
+        dca_final_cash=dca_cash,
+        fg_final_cash=fg_cash_buffer,
+        dca_total_invested=dca_total_invested,
+        fg_total_invested=fg_total_invested,
+        dca_purchases=dca_purchases,
+        fg_purchases=fg_purchases,
+        cash_min=cash_min,
+        cash_max=cash_max,
+        cash_mean=cash_sum / max(total_weeks, 1),
+    )
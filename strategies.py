@@ -0,0 +1,212 @@
+import numpy as np
+from typing import NamedTuple, Optional
+from simulation import return_pct
+from timeline import CATEGORIES
+
+
+class StepContext:
+    """
+    Everything shared by all strategies for the current purchase date
+
+    budget is this date's budget: the weekly budget prorated to the weeks since
+    the previous purchase date (see MarketTimeline.period_weeks).
+    """
+
+    __slots__ = ('week', 'date', 'price', 'fear_greed_value', 'category_code', 'category',
+                 'budget', 'transaction_fee')
+
+
+class Account:
+    """Cash and shares of one strategy, maintained by the engine"""
+
+    __slots__ = ('cash', 'shares', 'value', 'budget_received', 'total_invested', 'purchases',
+                 'cash_min', 'cash_max', 'cash_sum')
+
+    def __init__(self, initial_cash):
+        self.cash = float(initial_cash)
+        self.shares = 0.0
+        self.value = self.cash
+        self.budget_received = 0.0
+        self.total_invested = 0.0
+        self.purchases = 0
+        self.cash_min = float('inf')
+        self.cash_max = float('-inf')
+        self.cash_sum = 0.0
+
+
+class Strategy:
+    """
+    Base class for strategies run by run_strategies
+
+    A strategy declares its own per-step state in initial_state and its
+    decision rule in decide. The engine adds the budget to the account before
+    calling decide, and executes, values and charges expenses afterwards, so a
+    strategy only chooses how much to invest.
+    """
+
+    name = 'strategy'
+
+    def initial_state(self):
+        """Strategy-specific state carried from one purchase date to the next"""
+        return {}
+
+    def decide(self, context, account, state):
+        """
+        Amount to invest this purchase date
+
+        Args:
+            context: StepContext for the current purchase date
+            account: The strategy's Account, budget already added
+            state: The dict returned by initial_state, free to update
+
+        Returns:
+            float amount (fee included) to invest, at most account.cash, or None (or 0) to not trade
+        """
+        raise NotImplementedError
+
+
+class ConsistentDCA(Strategy):
+    """Invest the full budget every purchase date (run_backtest's DCA strategy)"""
+
+    name = 'DCA'
+
+    def decide(self, context, account, state):
+        if account.cash >= context.budget + context.transaction_fee:
+            return context.budget
+        return None
+
+
+class FearGreedCashBuffer(Strategy):
+    """Invest budget x category multiplier, capped at the cash buffer (run_backtest's fear/greed strategy)"""
+
+    def __init__(self, multipliers, name='Fear/Greed'):
+        self.multipliers = [float(multipliers[category]) for category in CATEGORIES]
+        self.name = name
+
+    def decide(self, context, account, state):
+        desired_investment = context.budget * self.multipliers[context.category_code]
+        investment = min(desired_investment, account.cash)
+        if investment > context.transaction_fee:
+            return investment
+        return None
+
+
+class ValueAveraging(Strategy):
+    """Invest whatever brings the holdings up to a target that grows by the budget every purchase date"""
+
+    def __init__(self, max_multiplier=3.0, name='Value Averaging'):
+        self.max_multiplier = max_multiplier
+        self.name = name
+
+    def initial_state(self):
+        return {'target': 0.0}
+
+    def decide(self, context, account, state):
+        state['target'] += context.budget
+        shortfall = state['target'] - account.shares * context.price
+        investment = min(max(shortfall, 0.0), context.budget * self.max_multiplier, account.cash)
+        if investment > context.transaction_fee:
+            return investment
+        return None
+
+
+class StrategyResult(NamedTuple):
+    """Final figures of one strategy"""
+    name: str
+    total_weeks: int
+    initial_cash: float
+    budget_received: float
+    final_value: float
+    final_cash: float
+    final_shares: float
+    total_invested: float
+    purchases: int
+    cash_min: float
+    cash_max: float
+    cash_mean: float
+    values: Optional[np.ndarray]  # Portfolio value per purchase date if record_values was set
+
+    @property
+    def return_pct(self):
+        return float(return_pct(self.final_value, self.initial_cash, self.budget_received))
+
+
+def run_strategies(timeline, strategies, weekly_budget, initial_cash=0.0, transaction_fee=0.0,
+                   expense_ratio=0.0, record_values=False):
+    """
+    Run any number of strategies side by side in one pass over a MarketTimeline
+
+    Date, price and fear/greed lookups are made once per purchase date and
+    shared by every strategy; each strategy then only pays for its decide call
+    and a few float operations. ConsistentDCA and FearGreedCashBuffer give
+    exactly run_backtest's results.
+
+    An amount of 0 or less is not a purchase. A strategy that invests more
+    than its account's cash raises ValueError instead of running into debt.
+
+    Returns:
+        list: StrategyResult per strategy, in the order given
+    """
+    weekly_budget = float(weekly_budget)
+    fee = float(transaction_fee)
+    total_weeks = len(timeline)
+    lanes = [(strategy, Account(initial_cash), strategy.initial_state()) for strategy in strategies]
+    values = np.zeros((len(lanes), total_weeks)) if record_values else None
+
+    context = StepContext()
+    context.transaction_fee = fee
+    rows = zip(timeline.dates.tolist(), timeline.prices.tolist(), timeline.fear_greed_values.tolist(),
+               timeline.category_codes.tolist(), timeline.period_weeks.tolist())
+    for week, (date, price, fear_greed_value, category_code, period) in enumerate(rows):
+        budget = weekly_budget * period
+        context.week = week
+        context.budget = budget
+        context.date = date
+        context.price = price
+        context.fear_greed_value = fear_greed_value
+        context.category_code = category_code
+        context.category = CATEGORIES[category_code]
+
+        for lane, (strategy, account, state) in enumerate(lanes):
+            account.cash += budget
+            account.budget_received += budget
+
+            investment = strategy.decide(context, account, state)
+            if investment is not None and investment > account.cash:
+                raise ValueError(f"{strategy.name} invested {investment:,.2f} on {str(np.datetime64(date, 'ns'))[:10]} "
+                                 f"with only {account.cash:,.2f} cash")
+            if investment is not None and investment > 0:
+                account.shares += (investment - fee) / price
+                account.cash -= investment
+                account.total_invested += investment
+                account.purchases += 1
+
+            account.value = account.cash + (account.shares * price)
+            if account.shares > 0:
+                expense = (account.shares * price * expense_ratio) / 365 * period
+                account.value = account.value - expense
+                account.shares = account.shares - (expense / price)
+
+            if account.cash < account.cash_min:
+                account.cash_min = account.cash
+            if account.cash > account.cash_max:
+                account.cash_max = account.cash
+            account.cash_sum += account.cash
+            if values is not None:
+                values[lane, week] = account.value
+
+    return [StrategyResult(
+        name=strategy.name,
+        total_weeks=total_weeks,
+        initial_cash=float(initial_cash),
+        budget_received=account.budget_received,
+        final_value=account.value,
+        final_cash=account.cash,
+        final_shares=account.shares,
+        total_invested=account.total_invested,
+        purchases=account.purchases,
+        cash_min=account.cash_min,
+        cash_max=account.cash_max,
+        cash_mean=account.cash_sum / max(total_weeks, 1),
+        values=None if values is None else values[lane],
+    ) for lane, (strategy, account, state) in enumerate(lanes)]
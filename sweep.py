@@ -0,0 +1,509 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import time
+import uuid
+import numpy as np
+from simulation import simulate_batch
+
+SPEC_FILE = 'sweep.json'
+DATA_DIR = 'data'
+CLAIMS_DIR = 'claims'
+DONE_DIR = 'done'
+RESULTS_DIR = 'results'
+MERGED_DIR = 'merged'
+STALE_AFTER = 600  # Seconds without a heartbeat before another host may take over a claimed shard
+
+# Columns every shard appends to, with their on-disk dtypes
+RESULT_COLUMNS = {
+    'scenario': np.int32,
+    'combo': np.int64,
+    'EF': np.float64,
+    'F': np.float64,
+    'N': np.float64,
+    'G': np.float64,
+    'EG': np.float64,
+    'dca_final_value': np.float64,
+    'fg_final_value': np.float64,
+    'excess_return': np.float64,
+    'fg_purchases': np.int64,
+    'cash_max': np.float64,
+    'cash_mean': np.float64,
+}
+MULTIPLIER_COLUMNS = ('EF', 'F', 'N', 'G', 'EG')
+
+
+def grid_values(low, high, step):
+    """Multiplier values from low to high (inclusive) in steps of step"""
+    return np.round(np.arange(low, high + step / 2, step), 10)
+
+
+def combo_multipliers(values, combos):
+    """(N x 5) multipliers for flat grid indices, every category taking any of values"""
+    values = np.asarray(values, dtype=float)
+    digits = np.unravel_index(np.asarray(combos, dtype=np.int64), (len(values),) * len(MULTIPLIER_COLUMNS))
+    return np.column_stack([values[d] for d in digits])
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    """Write JSON atomically, so readers never see a partial file"""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _create_exclusive(path, data):
+    """Create path holding data as JSON, False if it already exists (atomic on local and NFS filesystems)"""
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    return True
+
+
+def create_sweep(sweep_dir, backtester, multiplier_values, purchase_days=None, weekly_budgets=None,
+                 windows=None, shard_size=100000):
+    """
+    Lay out a sweep in sweep_dir: the grid, its shards and a frozen copy of the input data
+
+    The grid is every combination of multiplier_values for each of the 5
+    categories, crossed with every (window, purchase day, weekly budget)
+    scenario. Shard i always covers the same grid rows, and every worker reads
+    the fear/greed and price data saved here, so results don't depend on which
+    host or process ran a shard, or when.
+
+    Args:
+        backtester: FearGreedBacktester supplying the data and fee settings
+        multiplier_values: Values every category multiplier takes (see grid_values)
+        purchase_days: PURCHASE_DAY values (default: the backtester's)
+        weekly_budgets: WEEKLY_BUDGET values (default: the backtester's)
+        windows: (start, end) date pairs (default: the backtester's START_DATE/END_DATE)
+        shard_size: Grid rows per shard
+
+    Returns:
+        dict: The sweep spec, also written to sweep_dir/sweep.json
+    """
+    spec_path = os.path.join(sweep_dir, SPEC_FILE)
+    if os.path.exists(spec_path):
+        raise FileExistsError(f"{sweep_dir} already holds a sweep")
+
+    windows = [(start, backtester._resolve_end_date(end))
+               for start, end in (windows or [(backtester.START_DATE, backtester.END_DATE)])]
+    purchase_days = list(purchase_days or [backtester.PURCHASE_DAY])
+    weekly_budgets = [float(budget) for budget in (weekly_budgets or [backtester.WEEKLY_BUDGET])]
+
+    fear_greed_df = backtester.get_fear_greed_data()
+    sp500_df = backtester.get_sp500_data(min(start for start, _ in windows), max(end for _, end in windows))
+    if fear_greed_df is None or sp500_df is None:
+        print("Failed to fetch sweep data")
+        return None
+
+    data_dir = os.path.join(sweep_dir, DATA_DIR)
+    for name in (CLAIMS_DIR, DONE_DIR, RESULTS_DIR, DATA_DIR):
+        os.makedirs(os.path.join(sweep_dir, name), exist_ok=True)
+    np.save(os.path.join(data_dir, 'fear_greed_dates.npy'), fear_greed_df['date'].to_numpy(dtype='datetime64[ns]'))
+    np.save(os.path.join(data_dir, 'fear_greed_values.npy'), fear_greed_df['value'].to_numpy(dtype=float))
+    np.save(os.path.join(data_dir, 'price_dates.npy'), sp500_df['date'].to_numpy(dtype='datetime64[ns]'))
+    np.save(os.path.join(data_dir, 'prices.npy'), sp500_df['price'].to_numpy(dtype=float))
+
+    multiplier_values = [float(v) for v in multiplier_values]
+    n_combos = len(multiplier_values) ** len(MULTIPLIER_COLUMNS)
+    scenarios = [{'start': start, 'end': end, 'purchase_day': int(day), 'weekly_budget': budget}
+                 for (start, end), day, budget in itertools.product(windows, purchase_days, weekly_budgets)]
+    shards_per_scenario = -(-n_combos // shard_size)
+    settings = backtester.simulation_settings()
+    del settings['weekly_budget']  # Swept per scenario
+    spec = {
+        'multiplier_values': multiplier_values,
+        'n_combos': n_combos,
+        'scenarios': scenarios,
+        'shard_size': shard_size,
+        'shards_per_scenario': shards_per_scenario,
+        'n_shards': shards_per_scenario * len(scenarios),
+        'settings': dict(settings, thresholds=list(backtester.FEAR_GREED_THRESHOLDS)),
+    }
+    _write_json(spec_path, spec)
+    return spec
+
+
+def load_spec(sweep_dir):
+    return _read_json(os.path.join(sweep_dir, SPEC_FILE))
+
+
+def shard_bounds(spec, shard):
+    """(scenario index, first grid row, end grid row) of a shard"""
+    scenario, part = divmod(shard, spec['shards_per_scenario'])
+    start = part * spec['shard_size']
+    return scenario, start, min(start + spec['shard_size'], spec['n_combos'])
+
+
+class ShardQueue:
+    """
+    Work queue of shards kept entirely in a shared directory
+
+    A worker claims a shard by creating claims/shard_<i>.json exclusively and
+    touches it after every chunk as a heartbeat. A finished shard gets a
+    done/shard_<i>.json marker naming the attempt whose results count. Claims
+    whose owner died (same host, process gone) or that missed heartbeats for
+    stale_after seconds are taken over; finished shards are never redone.
+    """
+
+    def __init__(self, sweep_dir, stale_after=STALE_AFTER):
+        self.sweep_dir = sweep_dir
+        self.stale_after = stale_after
+        self.n_shards = load_spec(sweep_dir)['n_shards']
+        self.host = socket.gethostname()
+
+    def _claim_path(self, shard):
+        return os.path.join(self.sweep_dir, CLAIMS_DIR, f"shard_{shard:06d}.json")
+
+    def _done_path(self, shard):
+        return os.path.join(self.sweep_dir, DONE_DIR, f"shard_{shard:06d}.json")
+
+    def attempt_dir(self, shard, token):
+        return os.path.join(self.sweep_dir, RESULTS_DIR, f"shard_{shard:06d}.{token}")
+
+    def is_done(self, shard):
+        return os.path.exists(self._done_path(shard))
+
+    def _is_stale(self, path):
+        try:
+            claim = _read_json(path)
+            age = time.time() - os.stat(path).st_mtime
+        except (OSError, ValueError):
+            return False  # Gone or still being written
+        if claim.get('host') == self.host:
+            try:
+                os.kill(claim['pid'], 0)
+            except ProcessLookupError:
+                return True
+            except PermissionError:
+                pass
+        return age > self.stale_after
+
+    def claim(self):
+        """
+        Claim the next unfinished shard
+
+        Returns:
+            tuple: (shard, token), or None if every shard is finished or claimed by a live worker
+        """
+        done = set(os.listdir(os.path.join(self.sweep_dir, DONE_DIR)))
+        for shard in range(self.n_shards):
+            if f"shard_{shard:06d}.json" in done:
+                continue
+            path = self._claim_path(shard)
+            token = uuid.uuid4().hex[:12]
+            claim = {'host': self.host, 'pid': os.getpid(), 'token': token, 'claimed_at': time.time()}
+            if _create_exclusive(path, claim):
+                if self.is_done(shard):  # Finished between the listing and the claim
+                    os.remove(path)
+                    continue
+                return shard, token
+            if self._is_stale(path):
+                # Only one worker wins the rename, the others see the claim vanish
+                try:
+                    os.rename(path, f"{path}.{token}.stale")
+                except FileNotFoundError:
+                    continue
+                os.remove(f"{path}.{token}.stale")
+                if _create_exclusive(path, claim):
+                    return shard, token
+        return None
+
+    def heartbeat(self, shard, token):
+        """Refresh the claim, False if another worker has taken the shard over"""
+        path = self._claim_path(shard)
+        try:
+            if _read_json(path).get('token') != token:
+                return False
+            os.utime(path)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def complete(self, shard, token, rows):
+        """Mark a shard finished by this attempt, discarding the attempt if another one finished first"""
+        if _create_exclusive(self._done_path(shard), {'token': token, 'rows': int(rows)}):
+            # Leftovers of attempts whose workers crashed
+            results_dir = os.path.join(self.sweep_dir, RESULTS_DIR)
+            for name in os.listdir(results_dir):
+                if name.startswith(f"shard_{shard:06d}.") and name != os.path.basename(self.attempt_dir(shard, token)):
+                    shutil.rmtree(os.path.join(results_dir, name), ignore_errors=True)
+        else:
+            shutil.rmtree(self.attempt_dir(shard, token), ignore_errors=True)
+        try:
+            if _read_json(self._claim_path(shard)).get('token') == token:
+                os.remove(self._claim_path(shard))
+        except (OSError, ValueError):
+            pass
+
+    def status(self):
+        """(finished, claimed, pending) shard counts"""
+        done = len(os.listdir(os.path.join(self.sweep_dir, DONE_DIR)))
+        claimed = sum(1 for name in os.listdir(os.path.join(self.sweep_dir, CLAIMS_DIR)) if name.endswith('.json'))
+        return done, claimed, self.n_shards - done - claimed
+
+
+class ShardRunner:
+    """Simulates shards of one sweep, keeping one timeline per scenario"""
+
+    def __init__(self, sweep_dir):
+        from backtest import FearGreedBacktester
+        import pandas as pd
+
+        self.sweep_dir = sweep_dir
+        self.spec = load_spec(sweep_dir)
+        self.values = np.asarray(self.spec['multiplier_values'])
+        data_dir = os.path.join(sweep_dir, DATA_DIR)
+        self.backtester = FearGreedBacktester()
+        self.backtester.FEAR_GREED_THRESHOLDS = tuple(self.spec['settings']['thresholds'])
+        # simulate_batch arguments shared by every scenario (the budget comes from the scenario)
+        self.costs = {name: value for name, value in self.spec['settings'].items() if name != 'thresholds'}
+        self.backtester.TIMELINE_CACHE_SIZE = max(self.backtester.TIMELINE_CACHE_SIZE, len(self.spec['scenarios']))
+        self.backtester.set_data(
+            pd.DataFrame({'date': np.load(os.path.join(data_dir, 'fear_greed_dates.npy')),
+                          'value': np.load(os.path.join(data_dir, 'fear_greed_values.npy'))}),
+            pd.DataFrame({'date': np.load(os.path.join(data_dir, 'price_dates.npy')),
+                          'price': np.load(os.path.join(data_dir, 'prices.npy'))}))
+
+    def timeline(self, scenario):
+        settings = self.spec['scenarios'][scenario]
+        self.backtester.START_DATE = settings['start']
+        self.backtester.END_DATE = settings['end']
+        self.backtester.PURCHASE_DAY = settings['purchase_day']
+        return self.backtester.get_timeline()
+
+    def run(self, shard, attempt_dir, chunk_size=20000, heartbeat=None):
+        """
+        Simulate one shard, appending every chunk's rows to the attempt's column files
+
+        Grid rows where every multiplier is above 1 are skipped (the optimizers'
+        constraint). heartbeat is called after each chunk and stops the shard
+        early by returning False.
+
+        Returns:
+            int: Rows written, or None if the shard was abandoned
+        """
+        scenario, start, end = shard_bounds(self.spec, shard)
+        timeline = self.timeline(scenario)
+        budget = self.spec['scenarios'][scenario]['weekly_budget']
+
+        os.makedirs(attempt_dir, exist_ok=True)
+        files = {name: open(os.path.join(attempt_dir, f"{name}.bin"), 'ab') for name in RESULT_COLUMNS}
+        rows = 0
+        try:
+            for chunk_start in range(start, end, chunk_size):
+                combos = np.arange(chunk_start, min(chunk_start + chunk_size, end), dtype=np.int64)
+                multipliers = combo_multipliers(self.values, combos)
+                keep = multipliers.min(axis=1) <= 1.0
+                combos, multipliers = combos[keep], multipliers[keep]
+                if len(combos) > 0:
+                    result = simulate_batch(timeline.prices, timeline.category_codes, multipliers, budget,
+                                            period_weeks=timeline.period_weeks, **self.costs)
+                    columns = {
+                        'scenario': np.full(len(combos), scenario),
+                        'combo': combos,
+                        'dca_final_value': np.broadcast_to(result.dca_final_value, len(combos)),
+                        'fg_final_value': result.fg_final_value,
+                        'excess_return': result.excess_return,
+                        'fg_purchases': result.fg_purchases,
+                        'cash_max': result.cash_max,
+                        'cash_mean': result.cash_mean,
+                    }
+                    columns.update(zip(MULTIPLIER_COLUMNS, multipliers.T))
+                    for name, dtype in RESULT_COLUMNS.items():
+                        files[name].write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+                    rows += len(combos)
+                if heartbeat is not None and not heartbeat():
+                    return None
+            for f in files.values():
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            for f in files.values():
+                f.close()
+        return rows
+
+
+def work(sweep_dir, chunk_size=20000, stale_after=STALE_AFTER, max_shards=None):
+    """
+    Claim and run shards until none are left (one worker; run any number per host)
+
+    Returns:
+        int: Shards this worker finished
+    """
+    queue = ShardQueue(sweep_dir, stale_after=stale_after)
+    runner = ShardRunner(sweep_dir)
+    finished = 0
+    while max_shards is None or finished < max_shards:
+        claimed = queue.claim()
+        if claimed is None:
+            break
+        shard, token = claimed
+        attempt_dir = queue.attempt_dir(shard, token)
+        rows = runner.run(shard, attempt_dir, chunk_size=chunk_size,
+                          heartbeat=lambda: queue.heartbeat(shard, token))
+        if rows is None:
+            print(f"Lost the claim on shard {shard}, dropping it")
+            shutil.rmtree(attempt_dir, ignore_errors=True)
+            continue
+        queue.complete(shard, token, rows)
+        finished += 1
+    return finished
+
+
+def _work_process(sweep_dir, chunk_size, stale_after):
+    work(sweep_dir, chunk_size=chunk_size, stale_after=stale_after)
+
+
+def run_workers(sweep_dir, n_workers=None, chunk_size=20000, stale_after=STALE_AFTER, max_rounds=3):
+    """
+    Run n_workers worker processes on this host until the sweep is finished
+
+    Workers are independent processes, so one crashing doesn't take the others
+    down; its shard is reclaimed in the next round (a dead local process's
+    claim is taken over at once).
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    queue = ShardQueue(sweep_dir, stale_after=stale_after)
+    for _ in range(max_rounds):
+        processes = [multiprocessing.Process(target=_work_process, args=(sweep_dir, chunk_size, stale_after))
+                     for _ in range(n_workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        crashed = sum(1 for process in processes if process.exitcode != 0)
+        done, claimed, pending = queue.status()
+        if crashed == 0 or done == queue.n_shards:
+            break
+        print(f"{crashed} worker(s) crashed, restarting ({done}/{queue.n_shards} shards finished)")
+    return queue.status()
+
+
+def load_shard(sweep_dir, shard):
+    """Columns of a finished shard, or None if it isn't finished"""
+    done_path = os.path.join(sweep_dir, DONE_DIR, f"shard_{shard:06d}.json")
+    if not os.path.exists(done_path):
+        return None
+    done = _read_json(done_path)
+    attempt_dir = os.path.join(sweep_dir, RESULTS_DIR, f"shard_{shard:06d}.{done['token']}")
+    return {name: np.fromfile(os.path.join(attempt_dir, f"{name}.bin"), dtype=dtype, count=done['rows'])
+            for name, dtype in RESULT_COLUMNS.items()}
+
+
+def merge(sweep_dir, allow_partial=False):
+    """
+    Concatenate every finished shard, in shard order, into merged/<column>.npy
+
+    Returns:
+        DataFrame: One row per grid point and scenario, with the scenario settings joined in
+    """
+    import pandas as pd
+
+    spec = load_spec(sweep_dir)
+    shards = [load_shard(sweep_dir, shard) for shard in range(spec['n_shards'])]
+    missing = sum(1 for shard in shards if shard is None)
+    if missing and not allow_partial:
+        raise RuntimeError(f"{missing} of {spec['n_shards']} shards are not finished")
+    shards = [shard for shard in shards if shard is not None]
+
+    merged_dir = os.path.join(sweep_dir, MERGED_DIR)
+    os.makedirs(merged_dir, exist_ok=True)
+    columns = {}
+    for name, dtype in RESULT_COLUMNS.items():
+        columns[name] = np.concatenate([shard[name] for shard in shards]) if shards else np.empty(0, dtype=dtype)
+        np.save(os.path.join(merged_dir, f"{name}.npy"), columns[name])
+
+    results = pd.DataFrame(columns)
+    scenarios = pd.DataFrame(spec['scenarios'])
+    return results.join(scenarios, on='scenario')
+
+
+def print_sweep_summary(results, top=10):
+    """Best multipliers of every scenario by excess return over DCA"""
+    print("\n" + "=" * 80)
+    print(f"SWEEP RESULTS ({len(results):,} evaluations)")
+    print("=" * 80)
+    for (start, end, day, budget), group in results.groupby(['start', 'end', 'purchase_day', 'weekly_budget']):
+        print(f"\n{start} to {end}, purchase day {day}, weekly budget ${budget:,.0f}:")
+        best = group.nlargest(top, 'excess_return')
+        for i, row in enumerate(best.itertuples(), 1):
+            print(f"{i:2d}.) EF={row.EF:.2f}, F={row.F:.2f}, N={row.N:.2f}, G={row.G:.2f}, EG={row.EG:.2f} "
+                  f": ${row.fg_final_value:,.2f} (Excess: {row.excess_return:.2f}%)")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Sharded exhaustive parameter sweep")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create = commands.add_parser('create', help="Lay out a sweep and freeze its input data")
+    create.add_argument('sweep_dir')
+    create.add_argument('--low', type=float, default=0.0, help="Lowest multiplier")
+    create.add_argument('--high', type=float, default=2.0, help="Highest multiplier")
+    create.add_argument('--step', type=float, default=0.1, help="Multiplier grid step")
+    create.add_argument('--days', type=int, nargs='+', default=None, help="PURCHASE_DAY values")
+    create.add_argument('--budgets', type=float, nargs='+', default=None, help="WEEKLY_BUDGET values")
+    create.add_argument('--windows', nargs='+', default=None, metavar='START:END',
+                        help="Date windows, e.g. 2015-07-28:2025-07-28")
+    create.add_argument('--shard-size', type=int, default=100000, help="Grid rows per shard")
+
+    work_parser = commands.add_parser('work', help="Run shards until the sweep is finished")
+    work_parser.add_argument('sweep_dir')
+    work_parser.add_argument('--workers', type=int, default=None, help="Worker processes on this host")
+    work_parser.add_argument('--chunk-size', type=int, default=20000, help="Grid rows simulated per batch")
+    work_parser.add_argument('--stale-after', type=float, default=STALE_AFTER,
+                             help="Seconds without a heartbeat before a claimed shard is taken over")
+
+    status = commands.add_parser('status', help="Finished, claimed and pending shards")
+    status.add_argument('sweep_dir')
+
+    merge_parser = commands.add_parser('merge', help="Merge finished shards and print the best results")
+    merge_parser.add_argument('sweep_dir')
+    merge_parser.add_argument('--partial', action='store_true', help="Merge even if shards are missing")
+    merge_parser.add_argument('--top', type=int, default=10)
+    merge_parser.add_argument('--output', default=None, help="Also write the merged results to this CSV")
+    args = parser.parse_args(argv)
+
+    if args.command == 'create':
+        from backtest import FearGreedBacktester
+
+        windows = [tuple(window.split(':')) for window in args.windows] if args.windows else None
+        spec = create_sweep(args.sweep_dir, FearGreedBacktester(), grid_values(args.low, args.high, args.step),
+                            purchase_days=args.days, weekly_budgets=args.budgets, windows=windows,
+                            shard_size=args.shard_size)
+        if spec is not None:
+            print(f"{spec['n_combos'] * len(spec['scenarios']):,} evaluations in {spec['n_shards']} shards "
+                  f"({len(spec['scenarios'])} scenarios) in {args.sweep_dir}")
+    elif args.command == 'work':
+        start_time = time.perf_counter()
+        done, claimed, pending = run_workers(args.sweep_dir, n_workers=args.workers, chunk_size=args.chunk_size,
+                                             stale_after=args.stale_after)
+        print(f"{done} shards finished, {claimed} claimed elsewhere, {pending} pending "
+              f"({time.perf_counter() - start_time:.1f}s)")
+    elif args.command == 'status':
+        done, claimed, pending = ShardQueue(args.sweep_dir).status()
+        print(f"{done} finished, {claimed} claimed, {pending} pending")
+    else:
+        results = merge(args.sweep_dir, allow_partial=args.partial)
+        print_sweep_summary(results, top=args.top)
+        if args.output:
+            results.to_csv(args.output, index=False)
+            print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+def generate_fear_greed_data(start_date, end_date, points_per_month=4.5, seed=0):
+    """
+    Generate a sparse, mean-reverting fear/greed series like the finhacker.cz data
+
+    The real source only has ~4-5 points per month, so dates are sampled at
+    random from the calendar days in the range.
+
+    Returns:
+        DataFrame: 'date' and 'value' (0-100) columns sorted by date
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start_date, end_date, freq='D')
+    n_points = max(int(len(days) / 30.44 * points_per_month), 1)
+    dates = np.sort(rng.choice(days.to_numpy(), size=min(n_points, len(days)), replace=False))
+
+    # AR(1) around 50 so the index drifts between fear and greed regimes
+    values = np.empty(len(dates))
+    value = 50.0
+    for i in range(len(dates)):
+        value = 50 + 0.85 * (value - 50) + rng.normal(0, 9)
+        values[i] = value
+    values = np.clip(np.round(values), 0, 100)
+
+    return pd.DataFrame({'date': pd.to_datetime(dates), 'value': values})
+
+
+def generate_price_data(start_date, end_date, start_price=100.0, annual_return=0.08,
+                        annual_volatility=0.18, seed=0):
+    """
+    Generate daily closing prices on business days with geometric Brownian motion
+
+    Returns:
+        DataFrame: 'date' and 'price' columns like get_sp500_data
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start_date, end_date)
+    daily_drift = annual_return / 252 - annual_volatility ** 2 / 504
+    daily_volatility = annual_volatility / np.sqrt(252)
+    log_returns = rng.normal(daily_drift, daily_volatility, len(dates))
+    prices = start_price * np.exp(np.cumsum(log_returns))
+
+    return pd.DataFrame({'date': dates, 'price': prices})
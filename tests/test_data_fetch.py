@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from dataCache import load_fear_greed_data, read_fear_greed_cache
+from dataFetch import create_session, fetch_json
+from instrumentation import Instrumentation
+
+
+class FearGreedServer:
+    """Local stand-in for the fear/greed endpoint that answers conditional GETs like the real one"""
+
+    def __init__(self):
+        self.rows = [{'date': '2024-01-02', 'value': 40.0}, {'date': '2024-01-09', 'value': 55.0}]
+        self.version = 1
+        self.requests = []  # (If-None-Match, status) per request
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                etag = f'"v{server.version}"'
+                if_none_match = self.headers.get('If-None-Match')
+                if if_none_match == etag:
+                    server.requests.append((if_none_match, 304))
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                payload = json.dumps({'agg': server.rows}).encode()
+                server.requests.append((if_none_match, 200))
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/fear-greed"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def publish(self, row):
+        """Add a point, which changes the ETag"""
+        self.rows.append(row)
+        self.version += 1
+
+
+@pytest.fixture
+def server():
+    server = FearGreedServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+def test_fetch_json_revalidates_with_etag(server):
+    session = create_session(retries=0)
+    first = fetch_json(server.url, session=session)
+    assert not first.not_modified
+    assert first.etag == '"v1"'
+    assert first.data['agg'] == server.rows
+
+    second = fetch_json(server.url, etag=first.etag, session=session)
+    assert second.not_modified
+    assert second.data is None
+    assert second.etag == first.etag
+    assert server.requests == [(None, 200), ('"v1"', 304)]
+
+
+def test_load_fear_greed_data_keeps_cache_on_304_and_merges_changes(server, tmp_path):
+    instrumentation = Instrumentation()
+    dates, values = load_fear_greed_data(str(tmp_path), ttl=0, url=server.url, instrumentation=instrumentation)
+    assert values.tolist() == [40.0, 55.0]
+    assert read_fear_greed_cache(str(tmp_path)).etag == '"v1"'
+
+    # Nothing changed: the server answers 304 and the cached series is used as is
+    dates, values = load_fear_greed_data(str(tmp_path), ttl=0, url=server.url, instrumentation=instrumentation)
+    assert values.tolist() == [40.0, 55.0]
+    assert server.requests[-1] == ('"v1"', 304)
+    assert instrumentation.counters['fear_greed_not_modified'] == 1
+
+    # A new point changes the ETag, so the full response is merged into the cache
+    server.publish({'date': '2024-01-16', 'value': 20.0})
+    dates, values = load_fear_greed_data(str(tmp_path), ttl=0, url=server.url, instrumentation=instrumentation)
+    assert server.requests[-1] == ('"v1"', 200)
+    assert values.tolist() == [40.0, 55.0, 20.0]
+    assert dates[-1] == np.datetime64('2024-01-16', 'ns')
+    assert read_fear_greed_cache(str(tmp_path)).etag == '"v2"'
+    assert instrumentation.counters['fear_greed_not_modified'] == 1
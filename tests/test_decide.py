@@ -0,0 +1,50 @@
+import json
+from datetime import date
+
+import decide
+from liveSimulator import LiveSimulator
+
+MULTIPLIERS = {'Extreme Fear': 2.0, 'Fear': 1.5, 'Neutral': 1.0, 'Greed': 0.5, 'Extreme Greed': 0.2}
+
+
+def make_state(tmp_path):
+    """Live state with a few past purchases, plus a JSON fear/greed source"""
+    simulator = LiveSimulator(500, MULTIPLIERS, expense_ratio=0.0003)
+    simulator.update_many([('2024-01-02', 20.0, 470.0), ('2024-01-09', 50.0, 475.0), ('2024-01-16', 80.0, 480.0)])
+    state_path = str(tmp_path / 'live_state.json')
+    simulator.save(state_path)
+    source_path = tmp_path / 'fear_greed.json'
+    source_path.write_text(json.dumps({'date': date.today().isoformat(), 'value': 30.0}))
+    return state_path, str(source_path)
+
+
+def test_apply_records_todays_purchase_once(tmp_path, capsys):
+    state_path, source_path = make_state(tmp_path)
+    args = ['--state', state_path, '--source', source_path]
+
+    decide.main(args + ['--apply', '500'])
+    assert capsys.readouterr().out.startswith(f"Recorded {date.today().isoformat()}")
+    with open(state_path) as f:
+        applied = f.read()
+    simulator = LiveSimulator.load(state_path)
+    assert simulator.last_date == date.today().isoformat()
+    assert simulator.total_weeks == 4
+
+    # Running it again the same day (e.g. a retried cron job) must not buy twice
+    decide.main(args + ['--apply', '510'])
+    assert "already recorded" in capsys.readouterr().out
+    with open(state_path) as f:
+        assert f.read() == applied
+
+
+def test_decide_does_not_change_the_state(tmp_path, capsys):
+    state_path, source_path = make_state(tmp_path)
+    with open(state_path) as f:
+        before = f.read()
+
+    decide.main(['--state', state_path, '--source', source_path, '--json'])
+    decision = json.loads(capsys.readouterr().out)
+    assert decision['category'] == 'Fear'
+    assert decision['state_date'] == '2024-01-16'
+    with open(state_path) as f:
+        assert f.read() == before
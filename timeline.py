@@ -0,0 +1,123 @@
+import numpy as np
+from functools import cached_property
+from schedules import purchase_periods
+
+# Fear/greed categories in index order, category codes index into this tuple
+CATEGORIES = ('Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed')
+
+# Upper bounds (inclusive) of every category except the last
+FEAR_GREED_THRESHOLDS = (24, 44, 55, 75)
+
+
+def validate_thresholds(thresholds):
+    """Check a set of category upper bounds, returning it as a tuple of floats"""
+    thresholds = tuple(float(t) for t in thresholds)
+    if len(thresholds) != len(CATEGORIES) - 1:
+        raise ValueError(f"Expected {len(CATEGORIES) - 1} thresholds, got {len(thresholds)}")
+    if any(upper <= lower for lower, upper in zip(thresholds, thresholds[1:])):
+        raise ValueError(f"Thresholds must be strictly increasing, got {thresholds}")
+    return thresholds
+
+
+def categorize(values, thresholds=FEAR_GREED_THRESHOLDS):
+    """Vectorized classify_fear_greed, returns an int8 category code per value"""
+    return np.searchsorted(np.asarray(thresholds, dtype=float), values, side='left').astype(np.int8)
+
+
+class FearGreedBuckets:
+    """
+    Fear/greed values pre-sorted for fast re-bucketing under new thresholds
+
+    The index only takes a few hundred distinct values, so categorizing the
+    sorted unique values and gathering them back costs almost nothing compared
+    to re-categorizing the whole series.
+    """
+
+    def __init__(self, values):
+        self.unique_values, self.inverse = np.unique(np.asarray(values, dtype=float), return_inverse=True)
+
+    def codes(self, thresholds):
+        """(T,) category codes for one set of thresholds"""
+        return categorize(self.unique_values, thresholds)[self.inverse]
+
+    def codes_batch(self, thresholds):
+        """(T x N) category codes for an (N x 4) array of threshold sets, one column per set"""
+        thresholds = np.atleast_2d(np.asarray(thresholds, dtype=float))
+        unique_codes = (self.unique_values[:, None, None] > thresholds[None, :, :]).sum(axis=2, dtype=np.int8)
+        return unique_codes[self.inverse]
+
+
+class MarketTimeline:
+    """
+    Purchase schedule with everything a backtest needs already aligned to it
+
+    All columns have one entry per purchase date that has both a fear/greed
+    value and a price available, so simulations can index them directly.
+    """
+
+    def __init__(self, dates, prices, fear_greed_values, category_codes=None, price_data=None,
+                 thresholds=FEAR_GREED_THRESHOLDS):
+        self.dates = np.asarray(dates, dtype='datetime64[ns]')
+        self.prices = np.asarray(prices, dtype=float)
+        self.fear_greed_values = np.asarray(fear_greed_values, dtype=float)
+        self.thresholds = tuple(thresholds)  # Category upper bounds the codes were computed with
+        if category_codes is None:
+            category_codes = categorize(self.fear_greed_values, self.thresholds)
+        self.category_codes = np.asarray(category_codes, dtype=np.int8)
+        self.price_data = price_data  # Source price DataFrame the timeline was built from
+
+    def __len__(self):
+        return len(self.dates)
+
+    def window(self, start_date, end_date):
+        """Timeline restricted to purchase dates in [start_date, end_date), sharing this one's arrays"""
+        first = np.searchsorted(self.dates, np.datetime64(start_date, 'ns'), side='left')
+        last = np.searchsorted(self.dates, np.datetime64(end_date, 'ns'), side='left')
+        return MarketTimeline(self.dates[first:last], self.prices[first:last],
+                              self.fear_greed_values[first:last], self.category_codes[first:last],
+                              price_data=self.price_data, thresholds=self.thresholds)
+
+    @cached_property
+    def period_weeks(self):
+        """Weeks of budget each purchase date receives, see schedules.purchase_periods"""
+        return purchase_periods(self.dates)
+
+    @cached_property
+    def buckets(self):
+        return FearGreedBuckets(self.fear_greed_values)
+
+    # Python lists of the columns for simulate_summary's scalar loop, converted once per timeline
+
+    @cached_property
+    def price_list(self):
+        return self.prices.tolist()
+
+    @cached_property
+    def category_code_list(self):
+        return self.category_codes.tolist()
+
+    @cached_property
+    def period_list(self):
+        return self.period_weeks.tolist()
+
+    def with_thresholds(self, thresholds):
+        """Timeline re-bucketed with new category thresholds, sharing this one's dates, prices and values"""
+        thresholds = validate_thresholds(thresholds)
+        if thresholds == self.thresholds:
+            return self
+        timeline = MarketTimeline(self.dates, self.prices, self.fear_greed_values,
+                                  self.buckets.codes(thresholds), price_data=self.price_data,
+                                  thresholds=thresholds)
+        for name in ('buckets', 'price_list', 'period_weeks', 'period_list'):
+            if name in self.__dict__:
+                timeline.__dict__[name] = self.__dict__[name]
+        return timeline
+
+    def categories(self):
+        """Category name for every purchase date"""
+        return [CATEGORIES[code] for code in self.category_codes]
+
+    def week_counts(self):
+        """Number of purchase dates in each fear/greed category"""
+        counts = np.bincount(self.category_codes, minlength=len(CATEGORIES))
+        return {category: int(count) for category, count in zip(CATEGORIES, counts)}
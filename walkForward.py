@@ -0,0 +1,173 @@
+import argparse
+import numpy as np
+import pandas as pd
+from backtest import FearGreedBacktester
+from simulation import simulate_batch
+from timeline import CATEGORIES
+
+PARAM_NAMES = ('EF', 'F', 'N', 'G', 'EG')
+
+
+def years_offset(years):
+    """DateOffset for a (possibly fractional) number of years, rounded to whole months"""
+    return pd.DateOffset(months=int(round(years * 12)))
+
+
+def generate_windows(first_date, last_date, train_years, test_years, step_years):
+    """(train_start, train_end, test_end) tuples sliding across [first_date, last_date]"""
+    if min(train_years, test_years, step_years) * 12 < 0.5:
+        raise ValueError("Train, test and step lengths must be at least one month")
+    windows = []
+    train_start = pd.Timestamp(first_date)
+    last_date = pd.Timestamp(last_date)
+    while True:
+        train_end = train_start + years_offset(train_years)
+        test_end = train_end + years_offset(test_years)
+        if test_end > last_date + pd.Timedelta(days=1):
+            break
+        windows.append((train_start, train_end, test_end))
+        train_start = train_start + years_offset(step_years)
+    return windows
+
+
+class WindowEvaluator:
+    """Scores multiplier sets on one timeline window with the batch kernel"""
+
+    def __init__(self, timeline, backtester):
+        self.timeline = timeline
+        self.settings = dict(backtester.simulation_settings(), period_weeks=timeline.period_weeks)
+
+    def evaluate(self, multipliers):
+        return simulate_batch(self.timeline.prices, self.timeline.category_codes, multipliers, **self.settings)
+
+
+def optimize_window(evaluator, candidates, refine_rounds=2, refine_size=512, rng=None):
+    """
+    Best multipliers on a window: score a shared candidate set, then refine around the leaders
+
+    Candidates that break findOptimal's constraint (every multiplier > 1.0) are skipped.
+
+    Returns:
+        numpy array: The best multipliers found, in CATEGORIES order
+    """
+    rng = rng or np.random.default_rng(0)
+    allowed = candidates.min(axis=1) <= 1.0
+    pool = candidates[allowed]
+    result = evaluator.evaluate(pool)
+    scores = result.fg_final_value
+
+    for round_number in range(refine_rounds):
+        # Perturb the top candidates with a shrinking step and keep the best overall
+        leaders = pool[np.argsort(scores)[-16:]]
+        scale = 0.25 / (round_number + 1)
+        parents = leaders[rng.integers(0, len(leaders), refine_size)]
+        children = np.clip(parents + rng.normal(0, scale, parents.shape), 0.0, 2.0)
+        children = children[children.min(axis=1) <= 1.0]
+        child_result = evaluator.evaluate(children)
+        pool = np.concatenate([pool, children])
+        scores = np.concatenate([scores, child_result.fg_final_value])
+
+    best = int(np.argmax(scores))
+    return pool[best]
+
+
+def walk_forward(backtester, train_years=5, test_years=1, step_years=1, n_candidates=4096,
+                 refine_rounds=2, seed=42):
+    """
+    Walk-forward optimization of the fear/greed multipliers
+
+    The aligned timeline is built once for the backtester's full date range and
+    every train/test window is a zero-copy view of it. Each training window is
+    optimized with the batch kernel against one shared candidate set (plus a
+    few refinement rounds), and the winner is scored out-of-sample on the
+    following test window.
+
+    Returns:
+        DataFrame: One row per window with the chosen multipliers and in/out-of-sample excess return
+    """
+    timeline = backtester.get_timeline()
+    if timeline is None or len(timeline) == 0:
+        print("Failed to prepare backtest data")
+        return None
+
+    rng = np.random.default_rng(seed)
+    candidates = rng.uniform(0.0, 2.0, (n_candidates, len(CATEGORIES)))
+    candidates[0] = [backtester.INVESTMENT_MULTIPLIERS[category] for category in CATEGORIES]
+
+    windows = generate_windows(timeline.dates[0], timeline.dates[-1], train_years, test_years, step_years)
+    if len(windows) == 0:
+        print("Date range is too short for a single train/test window")
+        return None
+
+    rows = []
+    for i, (train_start, train_end, test_end) in enumerate(windows, 1):
+        train = WindowEvaluator(timeline.window(train_start, train_end), backtester)
+        test = WindowEvaluator(timeline.window(train_end, test_end), backtester)
+        if len(train.timeline) == 0 or len(test.timeline) == 0:
+            continue
+
+        best = optimize_window(train, candidates, refine_rounds=refine_rounds, rng=rng)
+        train_result = train.evaluate(best)
+        test_result = test.evaluate(best)
+
+        row = {
+            'train_start': train_start,
+            'train_end': train_end,
+            'test_end': test_end,
+        }
+        row.update(dict(zip(PARAM_NAMES, best)))
+        row.update({
+            'train_excess_return': float(train_result.excess_return[0]),
+            'test_excess_return': float(test_result.excess_return[0]),
+            'test_fg_final_value': float(test_result.fg_final_value[0]),
+            'test_dca_final_value': float(test_result.dca_final_value),
+        })
+        rows.append(row)
+        print(f"[{i}/{len(windows)}] {train_start:%Y-%m-%d} -> {train_end:%Y-%m-%d} | test to {test_end:%Y-%m-%d}: "
+              f"in-sample {row['train_excess_return']:+.2f}%, out-of-sample {row['test_excess_return']:+.2f}%")
+
+    return pd.DataFrame(rows)
+
+
+def print_walk_forward_summary(results):
+    """Out-of-sample performance and multiplier stability across windows"""
+    if results is None or len(results) == 0:
+        print("No walk-forward results")
+        return
+
+    print("\n" + "=" * 80)
+    print("WALK-FORWARD SUMMARY")
+    print("=" * 80)
+    print(f"Windows:                           {len(results)}")
+    print(f"Mean in-sample excess return:      {results['train_excess_return'].mean():+.2f}%")
+    print(f"Mean out-of-sample excess return:  {results['test_excess_return'].mean():+.2f}%")
+    print(f"Median out-of-sample excess:       {results['test_excess_return'].median():+.2f}%")
+    print(f"Windows beating DCA out-of-sample: {(results['test_excess_return'] > 0).mean() * 100:.0f}%")
+    print("\nMultiplier stability (mean +/- std across windows):")
+    for name in PARAM_NAMES:
+        print(f"  {name:3}: {results[name].mean():.2f} +/- {results[name].std():.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of Fear & Greed multipliers")
+    parser.add_argument('--start', default='2011-01-01', help="First date of the study")
+    parser.add_argument('--end', default='present', help="Last date of the study")
+    parser.add_argument('--train-years', type=float, default=5)
+    parser.add_argument('--test-years', type=float, default=1)
+    parser.add_argument('--step-years', type=float, default=0.25)
+    parser.add_argument('--candidates', type=int, default=4096, help="Random multiplier sets per window")
+    parser.add_argument('--schedule', default=None, help="Purchase schedule, e.g. 'monthly:15'")
+    parser.add_argument('--output', default='walk_forward_results.csv')
+    args = parser.parse_args()
+
+    backtester = FearGreedBacktester()
+    backtester.START_DATE = args.start
+    backtester.END_DATE = args.end
+    backtester.PURCHASE_SCHEDULE = args.schedule
+
+    results = walk_forward(backtester, train_years=args.train_years, test_years=args.test_years,
+                           step_years=args.step_years, n_candidates=args.candidates)
+    print_walk_forward_summary(results)
+    if results is not None:
+        results.to_csv(args.output, index=False)
+        print(f"\nResults saved to {args.output}")
@@ -0,0 +1,103 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from metrics import objective_scores
+from simulation import simulate_batch
+from timeline import FearGreedBuckets
+
+# Arrays and settings attached by each worker process in _init_worker
+_worker_state = {}
+
+
+def _init_worker(array_specs, settings):
+    """Attach the shared timeline arrays in a worker process (no copies are made)"""
+    blocks = []
+    arrays = {}
+    for name, (shm_name, shape, dtype) in array_specs.items():
+        block = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    _worker_state['blocks'] = blocks  # Keep the blocks alive for the worker's lifetime
+    _worker_state['arrays'] = arrays
+    _worker_state['settings'] = settings
+    _worker_state['buckets'] = FearGreedBuckets(arrays['fear_greed_values'])
+
+
+def _evaluate_chunk(chunk):
+    """Simulate a chunk of (multipliers, thresholds or None, objective) against the shared timeline"""
+    multipliers, thresholds, objective = chunk
+    arrays = _worker_state['arrays']
+    settings = _worker_state['settings']
+    category_codes = arrays['category_codes']
+    if thresholds is not None:
+        category_codes = _worker_state['buckets'].codes_batch(thresholds)
+    record_values = objective != 'final_value'
+    result = simulate_batch(arrays['prices'], category_codes, multipliers, record_values=record_values,
+                            period_weeks=arrays['period_weeks'], **settings)
+    if not record_values:
+        return result.fg_final_value, result.excess_return, result.fg_final_value
+    scores = objective_scores(result.fg_values, arrays['dates'], settings['weekly_budget'] * arrays['period_weeks'],
+                              objective, initial_cash=settings['initial_cash'])
+    return result.fg_final_value, result.excess_return, scores
+
+
+class SharedTimelinePool:
+    """
+    Process pool whose workers share one timeline's arrays through shared memory
+
+    The price and category arrays are copied into shared memory once, and every
+    worker maps them directly, so workers never re-fetch or copy the data.
+
+    Usage:
+        with SharedTimelinePool(timeline, settings, n_workers=4) as pool:
+            final_values, excess_returns, scores = pool.evaluate(multipliers)
+    """
+
+    def __init__(self, timeline, settings, n_workers=None):
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self._blocks = []
+        array_specs = {}
+        for name in ('dates', 'prices', 'category_codes', 'fear_greed_values', 'period_weeks'):
+            array = np.ascontiguousarray(getattr(timeline, name))
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            array_specs[name] = (block.name, array.shape, array.dtype.str)
+        self._executor = ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                             initargs=(array_specs, settings))
+
+    def evaluate(self, multipliers, thresholds=None, objective='final_value'):
+        """
+        Evaluate (N x 5) multiplier sets split across the workers
+
+        Args:
+            thresholds: Optional (N x 4) category thresholds paired with each multiplier set
+                (default: the timeline's own categories)
+            objective: Score to compute for each set, one of metrics.OBJECTIVES
+
+        Returns:
+            tuple: (fear/greed final values, excess returns vs DCA, objective scores), in input order
+        """
+        multipliers = np.atleast_2d(np.asarray(multipliers, dtype=float))
+        splits = np.array_split(np.arange(len(multipliers)), self.n_workers)
+        if thresholds is None:
+            chunks = [(multipliers[idx], None, objective) for idx in splits if len(idx) > 0]
+        else:
+            thresholds = np.atleast_2d(np.asarray(thresholds, dtype=float))
+            chunks = [(multipliers[idx], thresholds[idx], objective) for idx in splits if len(idx) > 0]
+        results = list(self._executor.map(_evaluate_chunk, chunks))
+        return tuple(np.concatenate([r[i] for r in results]) for i in range(3))
+
+    def close(self):
+        self._executor.shutdown()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()